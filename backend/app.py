@@ -20,6 +20,7 @@ from routes.flashcard_routes import flashcard_bp
 from routes.main_routes import main_bp
 from routes.pronunciation_routes import pronunciation_bp
 from utils.csv_utils import load_csv_data
+from utils.file_watcher import start_file_watcher
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -41,7 +42,8 @@ def create_app(test_config=None):
         app,
         resources={
             r"/*": {
-                "origins": os.getenv("CORS_ALLOWED_ORIGINS", "http://localhost:3000").split(",")
+                "origins": os.getenv("CORS_ALLOWED_ORIGINS", "http://localhost:3000").split(","),
+                "expose_headers": ["ETag", Config.SESSION_HEADER_NAME, Config.STUDY_LEARNER_HEADER_NAME],
             }
         }
     )
@@ -49,6 +51,9 @@ def create_app(test_config=None):
     # Load initial data
     initialize_app_data()
     
+    # Invalidate in-process caches when decks change on disk
+    start_file_watcher()
+    
     # Register blueprints
     app.register_blueprint(main_bp)
     app.register_blueprint(flashcard_bp)
@@ -73,6 +78,11 @@ def create_app(test_config=None):
 
 def initialize_app_data():
     """Initialize application data."""
+    # Keep the deck another worker already selected
+    if flashcard_state.get_current_file()["path"] is not None:
+        logger.info(f"Using shared selected deck: {flashcard_state.current_file['path']}")
+        return
+    
     # Load initial flashcard data
     if os.path.exists(Config.INITIAL_FILE_PATH):
         initial_data = load_csv_data(Config.INITIAL_FILE_PATH)
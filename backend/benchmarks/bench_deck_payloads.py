@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Report payload sizes and load latency of every deck for each content coding.
+
+Build times and sizes are reported at both sets of compression levels: the
+offline levels compile_deck stores in the payload sidecar, which is what
+clients receive, and the fast request levels used when a request finds no
+sidecar. Latency is that of serving the stored payload.
+
+Run from the backend directory:
+
+    python benchmarks/bench_deck_payloads.py
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import Flask  # noqa: E402
+
+from config import Config  # noqa: E402
+from models.deck_payload import DeckPayload, payload_cache  # noqa: E402
+from routes.flashcard_routes import flashcard_bp  # noqa: E402
+from utils.csv_utils import load_csv_data  # noqa: E402
+
+ENCODINGS = ["identity", "gzip", "br"]
+
+
+def time_request(client, url: str, encoding: str, repeat: int) -> Optional[float]:
+    """Return the median latency in milliseconds of a warm /load_cards request."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(url, headers={"Accept-Encoding": encoding})
+        timings.append((time.perf_counter() - start) * 1000)
+        served = response.headers.get("Content-Encoding", "identity")
+        if served != encoding:
+            return None
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Print a size and latency table for every deck in the data directories."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=25)
+    args = parser.parse_args(argv)
+
+    app = Flask(__name__)
+    app.register_blueprint(flashcard_bp)
+    client = app.test_client()
+
+    print(f"{'deck':<45} {'cards':>6} {'offline ms':>10} {'request ms':>10} "
+          + " ".join(f"{encoding + ' B':>11} {encoding + ' ms':>11}" for encoding in ENCODINGS)
+          + " " + " ".join(f"{'request ' + encoding + ' B':>16}" for encoding in ENCODINGS[1:]))
+
+    for directory, path in (("mmaforays", Config.SPECIES_DATA_DIR), ("uploads", Config.UPLOADS_DIR)):
+        for filename in sorted(f for f in os.listdir(path) if f.endswith(".csv")):
+            cards = load_csv_data(os.path.join(path, filename))
+            if cards is None:
+                continue
+
+            # Offline levels, as stored by compile_deck and served to clients
+            start = time.perf_counter()
+            payload = DeckPayload(cards, Config.PAYLOAD_GZIP_LEVEL, Config.PAYLOAD_BROTLI_QUALITY)
+            offline_ms = (time.perf_counter() - start) * 1000
+
+            # Request levels, used only when a request finds no stored payload
+            start = time.perf_counter()
+            request_payload = DeckPayload(cards)
+            request_ms = (time.perf_counter() - start) * 1000
+
+            payload_cache.clear()
+            url = f"/load_cards?filename={filename}&directory={directory}"
+            client.get(url)  # Warm the payload cache so only serving is timed
+
+            columns = []
+            for encoding in ENCODINGS:
+                size = len(payload.get_body(None if encoding == "identity" else encoding))
+                if encoding != "identity" and encoding not in payload.variants:
+                    columns.append(f"{'n/a':>11} {'n/a':>11}")
+                    continue
+                latency = time_request(client, url, encoding, args.repeat)
+                latency_text = f"{latency:.3f}" if latency is not None else "n/a"
+                columns.append(f"{size:>11} {latency_text:>11}")
+            for encoding in ENCODINGS[1:]:
+                size_text = (str(len(request_payload.get_body(encoding)))
+                             if encoding in request_payload.variants else "n/a")
+                columns.append(f"{size_text:>16}")
+
+            print(f"{directory + '/' + filename:<45} {payload.card_count:>6} {offline_ms:>10.2f} "
+                  f"{request_ms:>10.2f} " + " ".join(columns))
+
+
+if __name__ == "__main__":
+    main()
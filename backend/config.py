@@ -22,6 +22,76 @@ class Config:
 
     PRONUNCIATION_CACHE_FILE = os.path.join(BASE_DATA_DIR, "pronounce.csv")
     INITIAL_FILE_PATH = os.path.join(UPLOADS_DIR, "intro-obs-inat.csv")
+    SELECTED_DECK_STATE_FILE = os.path.join(BASE_DATA_DIR, ".selected_deck.json")
+
+    # Caching
+    DECK_CACHE_MAX_BYTES = int(os.getenv("DECK_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    PAYLOAD_CACHE_MAX_BYTES = int(os.getenv("PAYLOAD_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    # Compression of payload sidecars written when a deck is compiled, and of
+    # payloads that have to be built while serving a request
+    PAYLOAD_GZIP_LEVEL = int(os.getenv("PAYLOAD_GZIP_LEVEL", "9"))
+    PAYLOAD_BROTLI_QUALITY = int(os.getenv("PAYLOAD_BROTLI_QUALITY", "11"))
+    PAYLOAD_REQUEST_GZIP_LEVEL = int(os.getenv("PAYLOAD_REQUEST_GZIP_LEVEL", "6"))
+    PAYLOAD_REQUEST_BROTLI_QUALITY = int(os.getenv("PAYLOAD_REQUEST_BROTLI_QUALITY", "4"))
+    HINTS_CACHE_MAX_BYTES = int(os.getenv("HINTS_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+    # File watcher that invalidates caches when decks change on disk
+    FILE_WATCHER_ENABLED = os.getenv("FILE_WATCHER_ENABLED", "true").lower() == "true"
+    FILE_WATCHER_POLL_INTERVAL = float(os.getenv("FILE_WATCHER_POLL_INTERVAL", "2.0"))
+
+    # Per-session deck state, shared by workers
+    SESSION_DB = os.getenv("SESSION_DB", os.path.join(BASE_DATA_DIR, "sessions.sqlite3"))
+    SESSION_MAX_COUNT = int(os.getenv("SESSION_MAX_COUNT", "1000"))
+    SESSION_TTL_SECONDS = float(os.getenv("SESSION_TTL_SECONDS", str(4 * 60 * 60)))
+    SESSION_COOKIE_NAME = "mc_session"
+    SESSION_HEADER_NAME = "X-Session-Token"
+
+    # Tolerant answer grading
+    FUZZY_MAX_DISTANCE = int(os.getenv("FUZZY_MAX_DISTANCE", "2"))
+
+    MAX_BATCH_ANSWERS = int(os.getenv("MAX_BATCH_ANSWERS", "500"))
+
+    # Spaced-repetition study mode
+    STUDY_RELEARN_SECONDS = float(os.getenv("STUDY_RELEARN_SECONDS", "60"))
+    STUDY_MAX_INTERVAL_DAYS = float(os.getenv("STUDY_MAX_INTERVAL_DAYS", "180"))
+    # Schedules idle this long are purged; must exceed STUDY_MAX_INTERVAL_DAYS
+    STUDY_PURGE_TTL_SECONDS = float(os.getenv("STUDY_PURGE_TTL_SECONDS", str(52 * 7 * 24 * 60 * 60)))
+    # Schedules are keyed on a long-lived learner id, not the deck session token
+    STUDY_LEARNER_COOKIE_NAME = "mc_learner"
+    STUDY_LEARNER_HEADER_NAME = "X-Learner-Id"
+
+    # Write-behind log of graded answers
+    REVIEW_LOG_DB = os.getenv("REVIEW_LOG_DB", os.path.join(BASE_DATA_DIR, "reviews.sqlite3"))
+    REVIEW_LOG_BATCH_SIZE = int(os.getenv("REVIEW_LOG_BATCH_SIZE", "100"))
+    REVIEW_LOG_FLUSH_INTERVAL = float(os.getenv("REVIEW_LOG_FLUSH_INTERVAL", "1.0"))
+    REVIEW_LOG_MAX_QUEUE = int(os.getenv("REVIEW_LOG_MAX_QUEUE", "10000"))
+
+    # Concurrent iNaturalist lookups when completing uploaded decks
+    ENRICHMENT_WORKERS = int(os.getenv("ENRICHMENT_WORKERS", "8"))
+    # "threads" or "asyncio"; asyncio completes rows on one event loop
+    ENRICHMENT_MODE = os.getenv("ENRICHMENT_MODE", "threads")
+    ENRICHMENT_CONCURRENCY = int(os.getenv("ENRICHMENT_CONCURRENCY", "32"))
+
+    # Upstream HTTP calls (iNaturalist)
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+    HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+    HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))
+    HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "8"))
+    HTTP_BREAKER_THRESHOLD = int(os.getenv("HTTP_BREAKER_THRESHOLD", "5"))
+    HTTP_BREAKER_RESET = float(os.getenv("HTTP_BREAKER_RESET", "30"))
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+
+    # Persistent cache of iNaturalist lookups, shared by workers
+    API_CACHE_DB = os.getenv("API_CACHE_DB", os.path.join(BASE_DATA_DIR, "api_cache.sqlite3"))
+    TAXON_CACHE_TTL = float(os.getenv("TAXON_CACHE_TTL", str(30 * 24 * 60 * 60)))
+    TAXON_CACHE_NEGATIVE_TTL = float(os.getenv("TAXON_CACHE_NEGATIVE_TTL", str(24 * 60 * 60)))
+    OBSERVATION_CACHE_TTL = float(os.getenv("OBSERVATION_CACHE_TTL", str(7 * 24 * 60 * 60)))
+    OBSERVATION_CACHE_NEGATIVE_TTL = float(os.getenv("OBSERVATION_CACHE_NEGATIVE_TTL", str(24 * 60 * 60)))
+
+    # Paginated card loading
+    DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "100"))
+    MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
 
     @classmethod
     def init_directories(cls):
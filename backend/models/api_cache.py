@@ -0,0 +1,117 @@
+"""Model for persistent caches of upstream API lookups."""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class ApiCache:
+    """Key/value cache of API results in a SQLite table, with per-entry expiry.
+
+    Entries survive restarts and, through WAL mode, are shared by every worker
+    process. A result of None is a negative entry ("the API has no answer")
+    and expires after negative_ttl instead of ttl, so lookups that found
+    nothing are retried sooner. Values are stored as JSON.
+    """
+
+    def __init__(self, db_path: str, table: str, ttl: float, negative_ttl: float) -> None:
+        """Initialize a cache; the database is opened on first use.
+
+        Args:
+            db_path: Path of the SQLite database
+            table: Table holding this cache's entries
+            ttl: Seconds a found result stays valid
+            negative_ttl: Seconds a negative result stays valid
+        """
+        self.db_path = db_path
+        self.table = table
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self._local = threading.local()
+
+    def lookup(self, key: str) -> Tuple[bool, Any]:
+        """Return (True, value) for a live entry, where value may be None, else (False, None)."""
+        try:
+            row = self._connection().execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Error reading {self.table} cache: {str(e)}")
+            return False, None
+
+        if row is None or row[1] <= time.time():
+            self.misses += 1
+            return False, None
+        self.hits += 1
+        return True, json.loads(row[0])
+
+    def store(self, key: str, value: Any) -> bool:
+        """Store a result, or a negative result if value is None.
+
+        Returns:
+            True if the entry was written
+        """
+        ttl = self.negative_ttl if value is None else self.ttl
+        try:
+            connection = self._connection()
+            with connection:
+                connection.execute(
+                    f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value, separators=(",", ":")), time.time() + ttl))
+            return True
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Error writing {self.table} cache: {str(e)}")
+            return False
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed."""
+        connection = self._connection()
+        with connection:
+            cursor = connection.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),))
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        connection = self._connection()
+        with connection:
+            connection.execute(f"DELETE FROM {self.table}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit, miss and error counts of this process."""
+        return {"name": self.table, "hits": self.hits, "misses": self.misses, "errors": self.errors}
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it and creating the table if needed."""
+        connection: Optional[sqlite3.Connection] = getattr(self._local, "connection", None)
+        # A connection must not be used across fork, nor kept after db_path changes
+        if (connection is None or self._local.pid != os.getpid()
+                or self._local.db_path != self.db_path):
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+            self._local.db_path = self.db_path
+        return connection
+
+
+# Singleton instance
+taxon_id_cache = ApiCache(
+    Config.API_CACHE_DB, "taxon_ids", Config.TAXON_CACHE_TTL, Config.TAXON_CACHE_NEGATIVE_TTL)
+observation_cache = ApiCache(
+    Config.API_CACHE_DB, "observations", Config.OBSERVATION_CACHE_TTL, Config.OBSERVATION_CACHE_NEGATIVE_TTL)
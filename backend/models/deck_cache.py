@@ -0,0 +1,172 @@
+"""Model for the process-wide parsed deck cache."""
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Every cache instance registers itself here so a file change can be
+# invalidated everywhere with a single call.
+_registered_caches: List["DeckCache"] = []
+
+# Callbacks run after a file is invalidated, for state derived from decks
+# that does not live in a DeckCache
+_invalidation_listeners: List[Callable[[str], None]] = []
+
+
+def file_identity(file_path: str) -> Optional[Tuple[int, int]]:
+    """Return the (mtime_ns, size) identity of a file, or None if it is missing."""
+    try:
+        stat_result = os.stat(file_path)
+    except OSError:
+        return None
+    return stat_result.st_mtime_ns, stat_result.st_size
+
+
+def estimate_size(value: Any) -> int:
+    """Roughly estimate the memory footprint of a cached value in bytes."""
+    memory_usage = getattr(value, "memory_usage", None)
+    if callable(memory_usage):
+        try:
+            return int(memory_usage(deep=True).sum())
+        except Exception:
+            pass
+
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(estimate_size(item) for item in value)
+    return size
+
+
+class DeckCache:
+    """LRU cache of parsed decks keyed on file path and (mtime, size) identity."""
+
+    def __init__(self, name: str, max_bytes: int) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            name: Name used in log messages and stats
+            max_bytes: Memory budget for all cached entries combined
+        """
+        self.name = name
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        _registered_caches.append(self)
+
+    def get(self, file_path: str) -> Optional[Any]:
+        """Return the cached value for a file if its identity is unchanged."""
+        key = os.path.abspath(file_path)
+        identity = file_identity(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and identity is not None and entry[0] == identity:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def put(self, file_path: str, value: Any, identity: Optional[Tuple[int, int]] = None) -> None:
+        """Store a value for a file, evicting least recently used entries if needed.
+
+        Args:
+            file_path: Path of the file the value was built from
+            value: The parsed value to cache
+            identity: File identity captured before parsing (default: current identity)
+        """
+        key = os.path.abspath(file_path)
+        if identity is None:
+            identity = file_identity(key)
+        if identity is None:
+            return
+
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            logger.info(f"{self.name}: {file_path} ({size} bytes) exceeds cache budget, not caching")
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while self._entries and self.current_bytes + size > self.max_bytes:
+                evicted_key = next(iter(self._entries))
+                self._remove(evicted_key)
+                self.evictions += 1
+                logger.debug(f"{self.name}: evicted {evicted_key}")
+            self._entries[key] = (identity, value, size)
+            self.current_bytes += size
+
+    def invalidate(self, file_path: str) -> None:
+        """Drop any cached value for a file."""
+        key = os.path.abspath(file_path)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                logger.info(f"{self.name}: invalidated {file_path}")
+
+    def clear(self) -> None:
+        """Drop every cached value and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and memory usage of the cache."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _remove(self, key: str) -> None:
+        """Remove an entry; the caller must hold the lock."""
+        _, _, size = self._entries.pop(key)
+        self.current_bytes -= size
+
+
+def add_invalidation_listener(listener: Callable[[str], None]) -> None:
+    """Register a callback to run with the path of every invalidated file."""
+    _invalidation_listeners.append(listener)
+
+
+def invalidate_path(file_path: str) -> None:
+    """Invalidate a file in every registered cache and notify listeners."""
+    for cache in _registered_caches:
+        cache.invalidate(file_path)
+    for listener in _invalidation_listeners:
+        try:
+            listener(file_path)
+        except Exception as e:
+            logger.error(f"Error in invalidation listener for {file_path}: {str(e)}")
+
+
+def all_cache_stats() -> List[Dict[str, Any]]:
+    """Return the stats of every registered cache."""
+    return [cache.stats() for cache in _registered_caches]
+
+
+# Singleton instance
+deck_cache = DeckCache("deck_cache", Config.DECK_CACHE_MAX_BYTES)
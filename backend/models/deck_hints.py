@@ -0,0 +1,63 @@
+"""Model for precomputed deck hints."""
+import logging
+from typing import Any, Dict, List, Sequence
+
+from config import Config
+from models.deck_cache import DeckCache, estimate_size
+
+logger = logging.getLogger(__name__)
+
+
+def mask_name(scientific_name: str) -> str:
+    """Mask every letter except the genus initial, keeping spaces and punctuation.
+
+    Example: "Amanita bisporigera" -> "A______ ___________"
+    """
+    return "".join(c if i == 0 or not c.isalpha() else "_" for i, c in enumerate(scientific_name))
+
+
+class DeckHints:
+    """Hints for every card of a deck, computed once when the deck is loaded."""
+
+    def __init__(self, cards: Sequence[Dict[str, Any]]) -> None:
+        """Compute the deck's name list and per-card hints.
+
+        Args:
+            cards: The card dictionaries of the deck
+        """
+        scientific_names = [card["scientific_name"] for card in cards]
+        self.names: List[str] = sorted(set(scientific_names))
+
+        genera: Dict[str, List[str]] = {}
+        for name in self.names:
+            genus = name.split()[0] if name.split() else name
+            genera.setdefault(genus, []).append(name)
+
+        self.cards: List[Dict[str, Any]] = []
+        for name in scientific_names:
+            words = name.split()
+            genus = words[0] if words else name
+            self.cards.append({
+                "genus_initial": f"{genus[:1]}." if genus else "",
+                "letter_counts": [sum(c.isalpha() for c in word) for word in words],
+                "masked_name": mask_name(name),
+                "siblings": [other for other in genera.get(genus, []) if other != name],
+            })
+
+    def card_hints(self, card_id: int) -> Dict[str, Any]:
+        """Return the hints of one card.
+
+        Raises:
+            IndexError: If card_id is not a row of the deck
+        """
+        if card_id < 0:
+            raise IndexError(card_id)
+        return self.cards[card_id]
+
+    def __sizeof__(self) -> int:
+        """Report the hint lists as part of the object size for cache budgeting."""
+        return object.__sizeof__(self) + estimate_size(self.names) + estimate_size(self.cards)
+
+
+# Singleton instance
+hints_cache = DeckCache("hints_cache", Config.HINTS_CACHE_MAX_BYTES)
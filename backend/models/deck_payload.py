@@ -0,0 +1,159 @@
+"""Model for pre-serialized deck payloads."""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import sys
+import tempfile
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from config import Config
+from models.deck_cache import DeckCache
+from utils.deck_format import payload_path
+
+logger = logging.getLogger(__name__)
+
+# Try to import brotli, but continue with gzip only if it fails
+try:
+    import brotli
+except ImportError:
+    logger.warning("brotli package not installed, deck payloads will be gzip-compressed only")
+    brotli = None
+
+# Version of the payload sidecar layout
+PAYLOAD_VERSION = 1
+
+
+class DeckPayload:
+    """Serialized JSON body of a deck with its content hash and compressed variants."""
+
+    def __init__(self, cards: Sequence[Dict[str, Any]], gzip_level: Optional[int] = None,
+                 brotli_quality: Optional[int] = None) -> None:
+        """Serialize and compress a deck once so it can be sent without re-encoding.
+
+        The default levels are the fast ones used while serving a request;
+        compile_deck passes the slower, smaller offline levels.
+
+        Args:
+            cards: The card dictionaries of the deck
+            gzip_level: gzip level (default: Config.PAYLOAD_REQUEST_GZIP_LEVEL)
+            brotli_quality: brotli quality (default: Config.PAYLOAD_REQUEST_BROTLI_QUALITY)
+        """
+        if gzip_level is None:
+            gzip_level = Config.PAYLOAD_REQUEST_GZIP_LEVEL
+        if brotli_quality is None:
+            brotli_quality = Config.PAYLOAD_REQUEST_BROTLI_QUALITY
+
+        self.card_count = len(cards)
+        self.body = json.dumps(list(cards), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+
+        # mtime=0 keeps the gzip bytes deterministic across workers and restarts
+        self.variants: Dict[str, bytes] = {"gzip": gzip.compress(self.body, compresslevel=gzip_level, mtime=0)}
+        if brotli is not None:
+            self.variants["br"] = brotli.compress(self.body, quality=brotli_quality)
+
+    @classmethod
+    def from_bytes(cls, body: bytes, variants: Dict[str, bytes], card_count: int) -> "DeckPayload":
+        """Rebuild a payload from serialized bytes without compressing again."""
+        payload = cls.__new__(cls)
+        payload.card_count = card_count
+        payload.body = body
+        payload.etag = hashlib.sha256(body).hexdigest()[:32]
+        payload.variants = variants
+        return payload
+
+    def encodings(self) -> Sequence[str]:
+        """Return the available content codings, best compression first."""
+        return sorted(self.variants, key=lambda encoding: len(self.variants[encoding]))
+
+    def get_body(self, encoding: Optional[str]) -> bytes:
+        """Return the body for a content coding, or the identity body."""
+        return self.variants.get(encoding, self.body) if encoding else self.body
+
+    def get_etag(self, encoding: Optional[str]) -> str:
+        """Return a strong ETag that is distinct for every content coding."""
+        if encoding in self.variants:
+            return f"{self.etag}-{encoding}"
+        return self.etag
+
+    def __sizeof__(self) -> int:
+        """Report the serialized bodies as part of the object size for cache budgeting."""
+        return (object.__sizeof__(self) + sys.getsizeof(self.body)
+                + sum(sys.getsizeof(variant) for variant in self.variants.values()))
+
+
+def write_payload_sidecar(file_path: str, payload: DeckPayload, identity: Tuple[int, int]) -> bool:
+    """Store a deck's payload next to its compiled sidecar so every worker can reuse it.
+
+    The file is a JSON header line (version, source CSV identity, card count
+    and section lengths) followed by the identity body and each variant.
+
+    Args:
+        file_path: Path of the source CSV deck
+        payload: The deck's payload
+        identity: (mtime_ns, size) of the source CSV the payload was built from
+
+    Returns:
+        True if the sidecar was written
+    """
+    sections = [("identity", payload.body)] + sorted(payload.variants.items())
+    header = {
+        "version": PAYLOAD_VERSION,
+        "identity": list(identity),
+        "card_count": payload.card_count,
+        "sections": [[name, len(data)] for name, data in sections],
+    }
+    target = payload_path(file_path)
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(header).encode("utf-8") + b"\n")
+                for _, data in sections:
+                    f.write(data)
+            os.replace(temp_path, target)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except OSError as e:
+        logger.error(f"Error writing payload sidecar for {file_path}: {str(e)}")
+        return False
+    return True
+
+
+def read_payload_sidecar(file_path: str, identity: Optional[Tuple[int, int]]) -> Optional[DeckPayload]:
+    """Load a deck's stored payload if it was built from the current CSV.
+
+    Args:
+        file_path: Path of the source CSV deck
+        identity: Current (mtime_ns, size) of the source CSV
+
+    Returns:
+        The payload, or None if the sidecar is missing, stale or invalid
+    """
+    target = payload_path(file_path)
+    if identity is None or not os.path.exists(target):
+        return None
+
+    try:
+        with open(target, "rb") as f:
+            header = json.loads(f.readline())
+            if header.get("version") != PAYLOAD_VERSION or tuple(header.get("identity", ())) != tuple(identity):
+                return None
+            sections = {}
+            for name, length in header["sections"]:
+                sections[name] = f.read(length)
+                if len(sections[name]) != length:
+                    raise ValueError("truncated section")
+        body = sections.pop("identity")
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable payload sidecar {target}: {str(e)}")
+        return None
+    return DeckPayload.from_bytes(body, sections, header["card_count"])
+
+
+# Singleton instance
+payload_cache = DeckCache("payload_cache", Config.PAYLOAD_CACHE_MAX_BYTES)
@@ -1,38 +1,70 @@
 """Model for flashcard data."""
+import logging
 from typing import Dict, Any, Optional
 
+from config import Config
+from models.shared_deck_store import SharedDeckStore
+from utils.csv_utils import load_csv_data
+
+logger = logging.getLogger(__name__)
+
 
 class FlashcardState:
     """Global state management for flashcard data."""
-    
-    def __init__(self) -> None:
-        """Initialize flashcard state with empty current file data."""
+
+    def __init__(self, shared_store: Optional[SharedDeckStore] = None) -> None:
+        """Initialize flashcard state with empty current file data.
+
+        Args:
+            shared_store: Store that makes the selected deck visible to every
+                worker process (default: state is local to this process)
+        """
         self.current_file: Dict[str, Any] = {
             "path": None,
             "directory": None,
             "data": None,
         }
-    
+        self.shared_store = shared_store
+        self.version = 0
+
     def update_current_file(self, path: str, directory: str, data: Any) -> None:
         """Update the current file information.
-        
+
         Args:
             path: The file path of the current file
             directory: The directory name containing the file
             data: The loaded data from the file
         """
         self.current_file["path"] = path
-        self.current_file["directory"] = directory 
+        self.current_file["directory"] = directory
         self.current_file["data"] = data
-    
+
+        if self.shared_store is not None:
+            version = self.shared_store.publish(path, directory)
+            if version is not None:
+                self.version = version
+
     def get_current_file(self) -> Dict[str, Any]:
         """Get the current file information.
-        
+
+        If another worker selected a newer deck, it is loaded first.
+
         Returns:
             Dictionary containing path, directory and data
         """
+        if self.shared_store is not None:
+            record = self.shared_store.read()
+            if record is not None and record["version"] != self.version:
+                data = load_csv_data(record["path"])
+                if data is not None:
+                    self.current_file["path"] = record["path"]
+                    self.current_file["directory"] = record["directory"]
+                    self.current_file["data"] = data
+                    self.version = record["version"]
+                else:
+                    logger.warning(f"Failed to load deck selected by another worker: {record['path']}")
         return self.current_file
 
 
 # Singleton instance
-flashcard_state = FlashcardState()
\ No newline at end of file
+flashcard_state = FlashcardState(SharedDeckStore(Config.SELECTED_DECK_STATE_FILE))
@@ -16,6 +16,8 @@ class PronunciationCache:
     def __init__(self, cache_file_path="pronunciation_cache.csv"):
         self.cache_file_path = cache_file_path
         self.cache = self._load_cache()
+        # Bumped whenever the set of cached names may change
+        self.version = 0
 #        self.cache = {}
         self._initialize_cache_file()
 
@@ -73,6 +75,12 @@ class PronunciationCache:
             except Exception as e:
                 logger.error(f"Error initializing pronunciation cache file: {str(e)}")
     
+    def reload(self) -> None:
+        """Reload the cache from the CSV file, e.g. after another worker appended to it."""
+        self.cache = self._load_cache()
+        self.version += 1
+        logger.info(f"Reloaded {len(self.cache)} pronunciations from cache file")
+    
     def get(self, name: str) -> Optional[str]:
         """Get pronunciation from cache."""
         return self.cache.get(name)
@@ -80,6 +88,7 @@ class PronunciationCache:
     def add(self, name: str, pronunciation: str) -> None:
         """Add pronunciation to cache."""
         self.cache[name] = pronunciation
+        self.version += 1
 
     def save_single_pronunciation(self, scientific_name: str, pronunciation: str) -> bool:
         """
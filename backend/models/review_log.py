@@ -0,0 +1,288 @@
+"""Model for the persistent log of graded answers."""
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY,
+    answered_at REAL NOT NULL,
+    session TEXT,
+    directory TEXT,
+    filename TEXT,
+    scientific_name TEXT NOT NULL,
+    correct INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS reviews_deck ON reviews (directory, filename);
+CREATE INDEX IF NOT EXISTS reviews_species ON reviews (scientific_name);
+"""
+
+_INSERT = (
+    "INSERT INTO reviews (answered_at, session, directory, filename, scientific_name, correct) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+# Columns that accuracy() can group by
+_GROUPINGS = {
+    "deck": ("directory", "filename"),
+    "species": ("scientific_name",),
+}
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    """Open a connection to the log database in WAL mode."""
+    connection = sqlite3.connect(db_path, timeout=10)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # WAL keeps the database consistent without an fsync on every commit
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class ReviewLog:
+    """Write-behind log of graded answers in a SQLite database.
+
+    record() only appends to an in-memory queue, so answering never waits on
+    disk. A background thread writes queued answers in one transaction per
+    batch, once batch_size answers are queued or flush_interval seconds have
+    passed. WAL mode lets readers compute aggregates while a batch is written,
+    and lets several worker processes share one database.
+    """
+
+    def __init__(self, db_path: str, batch_size: int = 100, flush_interval: float = 1.0,
+                 max_queue: int = 10000) -> None:
+        """Initialize a log; the database and writer thread are created on first use.
+
+        Args:
+            db_path: Path of the SQLite database
+            batch_size: Number of queued answers that triggers a write
+            flush_interval: Maximum seconds an answer stays queued
+            max_queue: Answers queued beyond this are dropped rather than blocking
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def record(self, scientific_name: str, correct: bool, directory: Optional[str] = None,
+               filename: Optional[str] = None, session: Optional[str] = None,
+               answered_at: Optional[float] = None) -> bool:
+        """Queue a graded answer.
+
+        Args:
+            scientific_name: Scientific name of the card
+            correct: Whether the answer was correct
+            directory: Directory name of the card's deck, if known
+            filename: File name of the card's deck, if known
+            session: Session token of the user, if any
+            answered_at: Time of the answer in seconds since the epoch (default: now)
+
+        Returns:
+            True if the answer was queued, False if the queue was full
+        """
+        self._ensure_writer()
+        row = (answered_at or time.time(), session, directory, filename, scientific_name, int(bool(correct)))
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Review log queue is full, dropping answer")
+            return False
+
+    def record_many(self, answers: List[Dict[str, Any]], directory: Optional[str] = None,
+                    filename: Optional[str] = None, session: Optional[str] = None) -> bool:
+        """Queue several graded answers to be written in the same transaction.
+
+        Args:
+            answers: Dictionaries with scientific_name, correct and optionally answered_at
+            directory: Directory name of the answers' deck, if known
+            filename: File name of the answers' deck, if known
+            session: Session token of the user, if any
+
+        Returns:
+            True if the answers were queued, False if the queue was full
+        """
+        if not answers:
+            return True
+        self._ensure_writer()
+        now = time.time()
+        rows = [
+            (answer.get("answered_at") or now, session, directory, filename,
+             answer["scientific_name"], int(bool(answer["correct"])))
+            for answer in answers
+        ]
+        try:
+            self._queue.put_nowait(rows)
+            return True
+        except queue.Full:
+            self.dropped += len(rows)
+            logger.warning(f"Review log queue is full, dropping {len(rows)} answers")
+            return False
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every answer queued so far is written.
+
+        Returns:
+            True if the queue was flushed within the timeout
+        """
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        """Write the remaining answers and stop the writer thread."""
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put(None)
+            self._thread = None
+        thread.join(10)
+
+    def accuracy(self, group_by: str = "deck", directory: Optional[str] = None,
+                 filename: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Return answer counts and accuracy per deck or per species.
+
+        Args:
+            group_by: "deck" or "species"
+            directory: Only count answers from decks in this directory
+            filename: Only count answers from decks with this file name
+
+        Returns:
+            One dictionary per group with its key columns, attempts, correct and accuracy
+
+        Raises:
+            ValueError: If group_by is not supported
+        """
+        if group_by not in _GROUPINGS:
+            raise ValueError(f"group_by must be one of {', '.join(_GROUPINGS)}")
+        columns = _GROUPINGS[group_by]
+
+        conditions: List[str] = []
+        params: List[Any] = []
+        if directory is not None:
+            conditions.append("directory = ?")
+            params.append(directory)
+        if filename is not None:
+            conditions.append("filename = ?")
+            params.append(filename)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        key = ", ".join(columns)
+        sql = (f"SELECT {key}, COUNT(*), SUM(correct) FROM reviews {where} "
+               f"GROUP BY {key} ORDER BY {key}")
+
+        if not os.path.exists(self.db_path):
+            return []
+        connection = _connect(self.db_path)
+        try:
+            connection.executescript(_SCHEMA)
+            rows = connection.execute(sql, params).fetchall()
+        finally:
+            connection.close()
+
+        results = []
+        for row in rows:
+            attempts, correct = row[-2], row[-1]
+            entry = dict(zip(columns, row))
+            entry.update({"attempts": attempts, "correct": correct, "accuracy": correct / attempts})
+            results.append(entry)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the queue length and write counters."""
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+        }
+
+    def _ensure_writer(self) -> None:
+        """Start the writer thread if it is not running."""
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="review-log-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        """Collect queued answers and write them in batches."""
+        connection = None
+        try:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            connection = _connect(self.db_path)
+            connection.executescript(_SCHEMA)
+        except Exception as e:
+            logger.error(f"Error opening review log {self.db_path}: {str(e)}")
+
+        batch: List[Tuple[Any, ...]] = []
+        waiters: List[threading.Event] = []
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                if item is None:
+                    stopping = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                elif isinstance(item, list):
+                    batch.extend(item)
+                else:
+                    batch.append(item)
+            except queue.Empty:
+                pass
+
+            if stopping or waiters or len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                if batch:
+                    self._write(connection, batch)
+                    batch = []
+                for waiter in waiters:
+                    waiter.set()
+                waiters = []
+                deadline = time.monotonic() + self.flush_interval
+
+        if connection is not None:
+            connection.close()
+
+    def _write(self, connection: Optional[sqlite3.Connection], batch: List[Tuple[Any, ...]]) -> None:
+        """Write one batch of answers in a single transaction."""
+        if connection is None:
+            self.dropped += len(batch)
+            return
+        try:
+            with connection:
+                connection.executemany(_INSERT, batch)
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            self.dropped += len(batch)
+            logger.error(f"Error writing {len(batch)} answers to review log: {str(e)}")
+
+
+# Singleton instance
+review_log = ReviewLog(
+    Config.REVIEW_LOG_DB,
+    Config.REVIEW_LOG_BATCH_SIZE,
+    Config.REVIEW_LOG_FLUSH_INTERVAL,
+    Config.REVIEW_LOG_MAX_QUEUE,
+)
+atexit.register(review_log.close)
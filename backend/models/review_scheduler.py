@@ -0,0 +1,412 @@
+"""Model for spaced-repetition review scheduling."""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+# SM-2 constants
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+PASSING_QUALITY = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS study_decks (
+    learner TEXT NOT NULL,
+    deck INTEGER NOT NULL,
+    directory TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (learner, deck)
+);
+CREATE TABLE IF NOT EXISTS study_cards (
+    learner TEXT NOT NULL,
+    deck INTEGER NOT NULL,
+    card INTEGER NOT NULL,
+    ease REAL NOT NULL,
+    interval_days REAL NOT NULL,
+    repetitions INTEGER NOT NULL,
+    lapses INTEGER NOT NULL,
+    due REAL NOT NULL,
+    stamp INTEGER NOT NULL,
+    PRIMARY KEY (learner, deck, card)
+);
+CREATE INDEX IF NOT EXISTS study_cards_due ON study_cards (learner, due, stamp);
+"""
+
+_REVIEW_COLUMNS = "deck, card, ease, interval_days, repetitions, lapses, due, stamp"
+
+
+class CardReview:
+    """SM-2 review state of one card."""
+
+    __slots__ = ("ease", "interval_days", "repetitions", "lapses", "due", "stamp")
+
+    def __init__(self, due: float, stamp: int) -> None:
+        """Initialize the state of a card that was never reviewed."""
+        self.ease = INITIAL_EASE
+        self.interval_days = 0.0
+        self.repetitions = 0
+        self.lapses = 0
+        self.due = due
+        self.stamp = stamp
+
+    def apply(self, quality: int, now: float, relearn_seconds: float, max_interval_days: float) -> None:
+        """Update the state with an answer of the given quality following SM-2.
+
+        Intervals are capped at max_interval_days, so every card comes due
+        before its learner's schedule can be purged as idle.
+        """
+        quality = max(0, min(5, quality))
+
+        if quality < PASSING_QUALITY:
+            self.repetitions = 0
+            self.interval_days = 0.0
+            self.lapses += 1
+            self.due = now + relearn_seconds
+        else:
+            self.repetitions += 1
+            if self.repetitions == 1:
+                self.interval_days = 1.0
+            elif self.repetitions == 2:
+                self.interval_days = 6.0
+            else:
+                self.interval_days = round(self.interval_days * self.ease, 1)
+            self.interval_days = min(self.interval_days, max_interval_days)
+            self.due = now + self.interval_days * SECONDS_PER_DAY
+
+        self.ease = max(MIN_EASE, self.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the client-visible review state."""
+        return {
+            "ease": round(self.ease, 2),
+            "interval_days": self.interval_days,
+            "repetitions": self.repetitions,
+            "lapses": self.lapses,
+            "due": self.due,
+        }
+
+
+def _review_from_row(row: Any) -> Tuple[int, int, CardReview]:
+    """Build (deck, card, review) from a row selected with _REVIEW_COLUMNS."""
+    review = CardReview(row[6], row[7])
+    review.ease, review.interval_days, review.repetitions, review.lapses = row[2:6]
+    return row[0], row[1], review
+
+
+def quality_from_outcome(correct: bool) -> int:
+    """Map a check_answer outcome onto the SM-2 0-5 quality scale."""
+    return 4 if correct else 1
+
+
+class ReviewScheduler:
+    """SM-2 scheduler over the cards of one or more decks of one learner.
+
+    A view of one learner's rows in a ReviewStateStore, so every worker
+    process sees the same schedule. Cards are ordered by (due, stamp)
+    through an index, so retrieving the next due card and recording an
+    answer are both O(log n); a rescheduled card gets a new stamp, which
+    keeps cards due at the same time in the order they were last scheduled.
+    """
+
+    def __init__(self, store: "ReviewStateStore", learner: str) -> None:
+        """Initialize the scheduler of one learner.
+
+        Args:
+            store: Store holding the review state
+            learner: Long-lived id of the learner
+        """
+        self.store = store
+        self.learner = learner
+
+    def __len__(self) -> int:
+        """Return the number of scheduled cards."""
+        return self.store.count(self.learner)
+
+    @property
+    def decks(self) -> List[Tuple[str, str]]:
+        """Return the (directory, filename) of every scheduled deck, by deck number."""
+        return self.store.decks(self.learner)
+
+    def add_deck(self, directory: str, filename: str, order: Iterable[int], now: Optional[float] = None) -> int:
+        """Schedule every card of a deck that is not scheduled yet as due now.
+
+        Args:
+            directory: Directory name containing the deck
+            filename: Name of the deck file
+            order: Row indexes of the deck's cards in the order new cards are introduced
+            now: Current time in seconds since the epoch (default: time.time())
+
+        Returns:
+            The number of newly scheduled cards
+        """
+        now = time.time() if now is None else now
+        added = self.store.add_deck(self.learner, directory, filename, order, now)
+        self.store.purge_idle(now)
+        return added
+
+    def deck_number(self, directory: str, filename: str) -> Optional[int]:
+        """Return the number of a scheduled deck, or None if it was never added."""
+        return self.store.deck_number(self.learner, directory, filename)
+
+    def deck(self, deck: int) -> Optional[Tuple[str, str]]:
+        """Return the (directory, filename) of a deck number, or None if there is no such deck."""
+        return self.store.deck(self.learner, deck)
+
+    def get_review(self, deck: int, card: int) -> Optional[CardReview]:
+        """Return the review state of a card, or None if it is not scheduled."""
+        return self.store.get_review(self.learner, deck, card)
+
+    def discard(self, deck: int, card: int) -> None:
+        """Stop scheduling a card, e.g. because it was removed from its deck."""
+        self.store.discard(self.learner, deck, card)
+
+    def discard_deck(self, deck: int) -> None:
+        """Stop scheduling every card of a deck, e.g. because its file was deleted."""
+        self.store.discard_deck(self.learner, deck)
+
+    def peek(self) -> Optional[Tuple[int, int, CardReview]]:
+        """Return the (deck, card, review) with the earliest due date, or None if nothing is scheduled."""
+        return self.store.peek(self.learner)
+
+    def next_due(self, now: Optional[float] = None) -> Optional[Tuple[int, int, CardReview]]:
+        """Return the (deck, card, review) that is due soonest, if it is due by now."""
+        now = time.time() if now is None else now
+        entry = self.peek()
+        if entry is None or entry[2].due > now:
+            return None
+        return entry
+
+    def record(self, deck: int, card: int, quality: int, now: Optional[float] = None) -> CardReview:
+        """Record an answer and reschedule the card following SM-2.
+
+        Args:
+            deck: Deck number of the card
+            card: Row index of the card
+            quality: Recall quality from 0 (blackout) to 5 (perfect)
+            now: Current time in seconds since the epoch (default: time.time())
+
+        Returns:
+            The updated review state
+
+        Raises:
+            KeyError: If the card is not scheduled
+        """
+        now = time.time() if now is None else now
+        return self.store.record(self.learner, deck, card, quality, now)
+
+    def stats(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Return the number of scheduled, due, new and lapsed cards."""
+        now = time.time() if now is None else now
+        result: Dict[str, Any] = {
+            "decks": [{"directory": directory, "filename": filename} for directory, filename in self.decks],
+        }
+        result.update(self.store.counts(self.learner, now))
+        return result
+
+
+class ReviewStateStore:
+    """Review state of every learner's study schedule in a SQLite database.
+
+    WAL mode lets every worker process read and update the schedules. The
+    state of learners who have not added a deck or answered a card for
+    ttl_seconds is purged; ttl_seconds must exceed max_interval_days, so a
+    learner who comes back for their longest-scheduled card still has it.
+    """
+
+    def __init__(self, db_path: str, relearn_seconds: float = 60.0,
+                 max_interval_days: float = 180.0, ttl_seconds: float = 52 * 7 * SECONDS_PER_DAY) -> None:
+        """Initialize a store; the database is opened on first use.
+
+        Args:
+            db_path: Path of the SQLite database
+            relearn_seconds: Delay before a failed card is shown again
+            max_interval_days: Longest interval a card is scheduled for
+            ttl_seconds: Idle time after which a learner's schedule is purged
+
+        Raises:
+            ValueError: If ttl_seconds is not longer than max_interval_days
+        """
+        if ttl_seconds <= max_interval_days * SECONDS_PER_DAY:
+            raise ValueError("ttl_seconds must be longer than max_interval_days")
+        self.db_path = db_path
+        self.relearn_seconds = relearn_seconds
+        self.max_interval_days = max_interval_days
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+
+    def scheduler(self, learner: str) -> ReviewScheduler:
+        """Return the scheduler of one learner."""
+        return ReviewScheduler(self, learner)
+
+    def count(self, learner: str) -> int:
+        """Return the number of cards scheduled for a learner."""
+        (count,) = self._connection().execute(
+            "SELECT COUNT(*) FROM study_cards WHERE learner = ?", (learner,)).fetchone()
+        return count
+
+    def counts(self, learner: str, now: float) -> Dict[str, int]:
+        """Return a learner's number of scheduled, due, new and lapsed cards."""
+        cards, due, new, lapses = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(due <= ?), 0), COALESCE(SUM(repetitions = 0 AND lapses = 0), 0), "
+            "COALESCE(SUM(lapses), 0) FROM study_cards WHERE learner = ?", (now, learner)).fetchone()
+        return {"cards": cards, "due": due, "new": new, "lapses": lapses}
+
+    def decks(self, learner: str) -> List[Tuple[str, str]]:
+        """Return the (directory, filename) of every deck of a learner, by deck number."""
+        rows = self._connection().execute(
+            "SELECT directory, filename FROM study_decks WHERE learner = ? ORDER BY deck", (learner,))
+        return [tuple(row) for row in rows]
+
+    def add_deck(self, learner: str, directory: str, filename: str, order: Iterable[int], now: float) -> int:
+        """Schedule the cards of a deck that are not scheduled yet as due now, in the given order.
+
+        Returns:
+            The number of newly scheduled cards
+        """
+        connection = self._connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            deck = self._deck_number(connection, learner, directory, filename)
+            if deck is None:
+                (deck,) = connection.execute(
+                    "SELECT COALESCE(MAX(deck) + 1, 0) FROM study_decks WHERE learner = ?", (learner,)).fetchone()
+                connection.execute(
+                    "INSERT INTO study_decks (learner, deck, directory, filename, last_access) VALUES (?, ?, ?, ?, ?)",
+                    (learner, deck, directory, filename, now))
+            else:
+                connection.execute(
+                    "UPDATE study_decks SET last_access = ? WHERE learner = ? AND deck = ?", (now, learner, deck))
+            stamp = self._next_stamp(connection, learner)
+            cursor = connection.executemany(
+                "INSERT OR IGNORE INTO study_cards (learner, deck, card, ease, interval_days, repetitions, "
+                "lapses, due, stamp) VALUES (?, ?, ?, ?, 0.0, 0, 0, ?, ?)",
+                ((learner, deck, card, INITIAL_EASE, now, stamp + i) for i, card in enumerate(order)))
+            return cursor.rowcount
+
+    def deck_number(self, learner: str, directory: str, filename: str) -> Optional[int]:
+        """Return the number of a learner's deck, or None if it was never added."""
+        return self._deck_number(self._connection(), learner, directory, filename)
+
+    def deck(self, learner: str, deck: int) -> Optional[Tuple[str, str]]:
+        """Return the (directory, filename) of a learner's deck number, or None if there is no such deck."""
+        row = self._connection().execute(
+            "SELECT directory, filename FROM study_decks WHERE learner = ? AND deck = ?", (learner, deck)).fetchone()
+        return tuple(row) if row is not None else None
+
+    def get_review(self, learner: str, deck: int, card: int) -> Optional[CardReview]:
+        """Return the review state of a learner's card, or None if it is not scheduled."""
+        row = self._connection().execute(
+            f"SELECT {_REVIEW_COLUMNS} FROM study_cards WHERE learner = ? AND deck = ? AND card = ?",
+            (learner, deck, card)).fetchone()
+        return _review_from_row(row)[2] if row is not None else None
+
+    def discard(self, learner: str, deck: int, card: int) -> None:
+        """Stop scheduling one of a learner's cards."""
+        connection = self._connection()
+        with connection:
+            connection.execute(
+                "DELETE FROM study_cards WHERE learner = ? AND deck = ? AND card = ?", (learner, deck, card))
+
+    def discard_deck(self, learner: str, deck: int) -> None:
+        """Stop scheduling a learner's deck and all of its cards."""
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM study_cards WHERE learner = ? AND deck = ?", (learner, deck))
+            connection.execute("DELETE FROM study_decks WHERE learner = ? AND deck = ?", (learner, deck))
+
+    def peek(self, learner: str) -> Optional[Tuple[int, int, CardReview]]:
+        """Return a learner's (deck, card, review) with the earliest due date, or None if nothing is scheduled."""
+        row = self._connection().execute(
+            f"SELECT {_REVIEW_COLUMNS} FROM study_cards WHERE learner = ? ORDER BY due, stamp LIMIT 1",
+            (learner,)).fetchone()
+        return _review_from_row(row) if row is not None else None
+
+    def record(self, learner: str, deck: int, card: int, quality: int, now: float) -> CardReview:
+        """Record an answer to a learner's card and reschedule it following SM-2.
+
+        Raises:
+            KeyError: If the card is not scheduled
+        """
+        connection = self._connection()
+        with connection:
+            # Take the write lock first so concurrent answers to one card are applied in turn
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                f"SELECT {_REVIEW_COLUMNS} FROM study_cards WHERE learner = ? AND deck = ? AND card = ?",
+                (learner, deck, card)).fetchone()
+            if row is None:
+                raise KeyError((deck, card))
+            review = _review_from_row(row)[2]
+            review.apply(quality, now, self.relearn_seconds, self.max_interval_days)
+            review.stamp = self._next_stamp(connection, learner)
+            connection.execute(
+                "UPDATE study_cards SET ease = ?, interval_days = ?, repetitions = ?, lapses = ?, due = ?, "
+                "stamp = ? WHERE learner = ? AND deck = ? AND card = ?",
+                (review.ease, review.interval_days, review.repetitions, review.lapses, review.due,
+                 review.stamp, learner, deck, card))
+            connection.execute(
+                "UPDATE study_decks SET last_access = ? WHERE learner = ? AND deck = ?", (now, learner, deck))
+        return review
+
+    def purge_idle(self, now: Optional[float] = None) -> int:
+        """Delete the schedules of idle learners and return how many cards were removed."""
+        now = time.time() if now is None else now
+        idle_learners = "SELECT learner FROM study_decks GROUP BY learner HAVING MAX(last_access) < ?"
+        connection = self._connection()
+        with connection:
+            cursor = connection.execute(
+                f"DELETE FROM study_cards WHERE learner IN ({idle_learners})", (now - self.ttl_seconds,))
+            connection.execute(
+                f"DELETE FROM study_decks WHERE learner IN ({idle_learners})", (now - self.ttl_seconds,))
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        """Delete every schedule."""
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM study_cards")
+            connection.execute("DELETE FROM study_decks")
+
+    def _deck_number(self, connection: sqlite3.Connection, learner: str, directory: str,
+                     filename: str) -> Optional[int]:
+        """Return the number of a learner's deck using the given connection."""
+        row = connection.execute(
+            "SELECT deck FROM study_decks WHERE learner = ? AND directory = ? AND filename = ?",
+            (learner, directory, filename)).fetchone()
+        return row[0] if row is not None else None
+
+    def _next_stamp(self, connection: sqlite3.Connection, learner: str) -> int:
+        """Return a stamp later than every stamp of a learner's cards."""
+        (stamp,) = connection.execute(
+            "SELECT COALESCE(MAX(stamp) + 1, 0) FROM study_cards WHERE learner = ?", (learner,)).fetchone()
+        return stamp
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it and creating the tables if needed."""
+        connection: Optional[sqlite3.Connection] = getattr(self._local, "connection", None)
+        # A connection must not be used across fork, nor kept after db_path changes
+        if (connection is None or self._local.pid != os.getpid()
+                or self._local.db_path != self.db_path):
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+            self._local.db_path = self.db_path
+        return connection
+
+
+# Singleton instance
+review_states = ReviewStateStore(Config.REVIEW_LOG_DB, Config.STUDY_RELEARN_SECONDS,
+                                 Config.STUDY_MAX_INTERVAL_DAYS, Config.STUDY_PURGE_TTL_SECONDS)
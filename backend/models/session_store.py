@@ -0,0 +1,317 @@
+"""Model for per-session deck state."""
+import logging
+import os
+import random
+import secrets
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    token TEXT PRIMARY KEY,
+    directory TEXT,
+    filename TEXT,
+    seed INTEGER NOT NULL,
+    total INTEGER NOT NULL,
+    cursor INTEGER NOT NULL,
+    last_access REAL NOT NULL,
+    deck_order BLOB
+);
+CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access);
+"""
+
+_COLUMNS = "token, directory, filename, seed, total, cursor, last_access"
+
+# Bytes per entry of a stored order
+_ORDER_ITEM_SIZE = array("I").itemsize
+
+T = TypeVar("T")
+
+
+def shuffled_order(size: int, seed: int) -> array:
+    """Return a seeded permutation of range(size) as a compact unsigned int array."""
+    order = array("I", range(size))
+    rng = random.Random(seed)
+    # Fisher-Yates: swap each position with a random earlier (or same) one
+    for i in range(size - 1, 0, -1):
+        j = rng.randrange(i + 1)
+        order[i], order[j] = order[j], order[i]
+    return order
+
+
+class DeckSession:
+    """Selected deck, shuffled card order and cursor of one user.
+
+    The order is shuffled once per pass and stored as a compact unsigned int
+    array. A session loaded from a SessionStore does not hold the order in
+    memory; it reads only the entry at the cursor, so dealing a card is O(1)
+    on any worker.
+    """
+
+    __slots__ = ("token", "directory", "filename", "seed", "total", "cursor", "last_access",
+                 "_order", "_store")
+
+    def __init__(self, token: str) -> None:
+        """Initialize a session with no deck selected."""
+        self.token = token
+        self.directory: Optional[str] = None
+        self.filename: Optional[str] = None
+        self.seed = 0
+        self.total = 0
+        self.cursor = 0
+        self.last_access = time.time()
+        # Order shuffled by this process and not yet loaded from or written to the store
+        self._order: Optional[array] = None
+        self._store: Optional["SessionStore"] = None
+
+    @property
+    def order(self) -> array:
+        """Return the row indexes of the current pass in the order they are dealt."""
+        if self._order is None:
+            return self._store.order(self.token) if self._store is not None else array("I")
+        return self._order
+
+    def select_deck(self, directory: str, filename: str, card_count: int, seed: Optional[int] = None) -> None:
+        """Select a deck and start a new shuffled pass through it.
+
+        Args:
+            directory: Directory name containing the deck
+            filename: Name of the deck file
+            card_count: Number of cards in the deck
+            seed: Shuffle seed (default: a random seed)
+        """
+        self.directory = directory
+        self.filename = filename
+        self.reshuffle(card_count, seed)
+
+    def reshuffle(self, card_count: int, seed: Optional[int] = None) -> None:
+        """Start a new shuffled pass through the selected deck."""
+        self.seed = seed if seed is not None else secrets.randbits(32)
+        self.total = card_count
+        self.cursor = 0
+        self._order = shuffled_order(card_count, self.seed)
+
+    def next_index(self) -> Optional[int]:
+        """Advance the cursor and return the row index of the next card.
+
+        When the pass is complete a new one starts with a fresh seed.
+
+        Returns:
+            The row index, or None if no deck is selected or the deck is empty
+        """
+        if not self.total:
+            return None
+        if self.cursor >= self.total:
+            self.reshuffle(self.total)
+        index = self._index_at(self.cursor)
+        self.cursor += 1
+        return index
+
+    def current_index(self) -> Optional[int]:
+        """Return the row index of the card last returned by next_index, if any."""
+        if self.cursor == 0:
+            return None
+        return self._index_at(self.cursor - 1)
+
+    def _index_at(self, position: int) -> int:
+        """Return the row index at a position of the order."""
+        if self._order is None and self._store is not None:
+            return self._store.order_entry(self.token, position)
+        return self.order[position]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the client-visible session state."""
+        return {
+            "directory": self.directory,
+            "filename": self.filename,
+            "seed": self.seed,
+            "cursor": self.cursor,
+            "total": self.total,
+        }
+
+
+class SessionStore:
+    """Session store in a SQLite table, with TTL and least-recently-used eviction.
+
+    Each session is one row (deck, seed, size, cursor and the order as a
+    BLOB), and WAL mode lets every worker process read and update it, so a
+    token is valid on whichever worker it reaches.
+    """
+
+    def __init__(self, db_path: str, max_sessions: int, ttl_seconds: float) -> None:
+        """Initialize a store; the database is opened on first use.
+
+        Args:
+            db_path: Path of the SQLite database
+            max_sessions: Maximum number of sessions kept
+            ttl_seconds: Idle time after which a session expires
+        """
+        self.db_path = db_path
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self._local = threading.local()
+
+    def get(self, token: Optional[str]) -> Optional[DeckSession]:
+        """Return a live session and mark it as recently used."""
+        if not token:
+            return None
+        now = time.time()
+        connection = self._connection()
+        with connection:
+            row = connection.execute(f"SELECT {_COLUMNS} FROM sessions WHERE token = ?", (token,)).fetchone()
+            if row is None:
+                return None
+            if now - row[6] > self.ttl_seconds:
+                connection.execute("DELETE FROM sessions WHERE token = ?", (token,))
+                return None
+            connection.execute("UPDATE sessions SET last_access = ? WHERE token = ?", (now, token))
+
+        session = self._apply_row(DeckSession(token), row)
+        session.last_access = now
+        return session
+
+    def create(self) -> DeckSession:
+        """Create and store a new session with a random token."""
+        session = DeckSession(secrets.token_urlsafe(24))
+        session._store = self
+        connection = self._connection()
+        with connection:
+            self._insert(connection, session)
+            self._evict(connection, keep=session.token)
+        return session
+
+    def get_or_create(self, token: Optional[str]) -> DeckSession:
+        """Return the session for a token, creating a new one if it is unknown or expired."""
+        return self.get(token) or self.create()
+
+    def save(self, session: DeckSession) -> None:
+        """Write the session's deck and cursor back, e.g. after a deck was selected."""
+        session.last_access = time.time()
+        connection = self._connection()
+        with connection:
+            self._insert(connection, session)
+
+    def refresh(self, session: DeckSession) -> None:
+        """Reload the session's deck and cursor, which another worker may have changed."""
+        row = self._connection().execute(
+            f"SELECT {_COLUMNS} FROM sessions WHERE token = ?", (session.token,)).fetchone()
+        if row is not None:
+            self._apply_row(session, row)
+
+    def update(self, session: DeckSession, change: Callable[[DeckSession], T]) -> T:
+        """Apply a change to the latest stored state of a session and write it back atomically.
+
+        Concurrent requests of one user, even on different workers, see each
+        other's changes, e.g. two next-card requests never deal the same card.
+
+        Args:
+            session: The session to change
+            change: Function that modifies the session
+
+        Returns:
+            What change returned
+        """
+        connection = self._connection()
+        with connection:
+            # Take the write lock before reading so the read-modify-write is not interleaved
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                f"SELECT {_COLUMNS} FROM sessions WHERE token = ?", (session.token,)).fetchone()
+            if row is not None:
+                self._apply_row(session, row)
+            result = change(session)
+            session.last_access = time.time()
+            self._insert(connection, session)
+        return result
+
+    def order(self, token: str) -> array:
+        """Return the stored order of a session's current pass."""
+        row = self._connection().execute("SELECT deck_order FROM sessions WHERE token = ?", (token,)).fetchone()
+        return array("I", row[0] if row is not None and row[0] is not None else b"")
+
+    def order_entry(self, token: str, position: int) -> int:
+        """Return one entry of the stored order of a session's current pass, without reading the rest."""
+        (entry,) = self._connection().execute(
+            "SELECT substr(deck_order, ?, ?) FROM sessions WHERE token = ?",
+            (position * _ORDER_ITEM_SIZE + 1, _ORDER_ITEM_SIZE, token)).fetchone()
+        return array("I", entry)[0]
+
+    def delete(self, token: str) -> None:
+        """Remove a session."""
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM sessions WHERE token = ?", (token,))
+
+    def clear(self) -> None:
+        """Remove every session."""
+        connection = self._connection()
+        with connection:
+            connection.execute("DELETE FROM sessions")
+        self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of sessions and the eviction count."""
+        (sessions,) = self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()
+        return {
+            "sessions": sessions,
+            "max_sessions": self.max_sessions,
+            "evictions": self.evictions,
+        }
+
+    def _apply_row(self, session: DeckSession, row: Any) -> DeckSession:
+        """Copy a row of the sessions table into a session, which then reads its order from this store."""
+        session.directory, session.filename, session.seed, session.total, session.cursor, session.last_access = row[1:]
+        session._order = None
+        session._store = self
+        return session
+
+    def _insert(self, connection: sqlite3.Connection, session: DeckSession) -> None:
+        """Insert or update the row of a session, writing its order only if it was reshuffled."""
+        order = session._order.tobytes() if session._order is not None else None
+        connection.execute(
+            f"INSERT INTO sessions ({_COLUMNS}, deck_order) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (token) DO UPDATE SET directory = excluded.directory, filename = excluded.filename, "
+            "seed = excluded.seed, total = excluded.total, cursor = excluded.cursor, "
+            "last_access = excluded.last_access, deck_order = COALESCE(excluded.deck_order, deck_order)",
+            (session.token, session.directory, session.filename, session.seed, session.total,
+             session.cursor, session.last_access, order))
+        session._store = self
+
+    def _evict(self, connection: sqlite3.Connection, keep: str) -> None:
+        """Drop expired sessions, then least recently used ones over max_sessions."""
+        cursor = connection.execute(
+            "DELETE FROM sessions WHERE last_access < ? AND token != ?", (time.time() - self.ttl_seconds, keep))
+        evicted = cursor.rowcount
+        cursor = connection.execute(
+            "DELETE FROM sessions WHERE token IN (SELECT token FROM sessions WHERE token != ? "
+            "ORDER BY last_access DESC LIMIT -1 OFFSET ?)", (keep, self.max_sessions - 1))
+        evicted += cursor.rowcount
+        self.evictions += evicted
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it and creating the table if needed."""
+        connection: Optional[sqlite3.Connection] = getattr(self._local, "connection", None)
+        # A connection must not be used across fork, nor kept after db_path changes
+        if (connection is None or self._local.pid != os.getpid()
+                or self._local.db_path != self.db_path):
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+            self._local.db_path = self.db_path
+        return connection
+
+
+# Singleton instance
+session_store = SessionStore(Config.SESSION_DB, Config.SESSION_MAX_COUNT, Config.SESSION_TTL_SECONDS)
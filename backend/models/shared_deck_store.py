@@ -0,0 +1,72 @@
+"""Model for deck state shared by every worker process."""
+import fcntl
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SharedDeckStore:
+    """Versioned record of the selected deck shared across worker processes.
+
+    Writers serialize on an exclusive lock file, so there is a single writer
+    at a time, and publish each new version by atomically replacing the state
+    file. Readers therefore always see one complete version. The deck contents
+    themselves are shared through the memory-mapped compiled sidecars.
+    """
+
+    def __init__(self, state_path: str) -> None:
+        """Initialize a store backed by a state file.
+
+        Args:
+            state_path: Path of the JSON state file
+        """
+        self.state_path = state_path
+        self.lock_path = state_path + ".lock"
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Return the current record (version, path, directory), or None if unset."""
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                record = json.load(f)
+            if isinstance(record.get("version"), int):
+                return record
+            logger.warning(f"Ignoring malformed shared deck state in {self.state_path}")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Error reading shared deck state {self.state_path}: {str(e)}")
+        return None
+
+    def publish(self, path: str, directory: str) -> Optional[int]:
+        """Swap in a new selected deck.
+
+        Args:
+            path: The file path of the selected deck
+            directory: The directory name containing the deck
+
+        Returns:
+            The new version number, or None if the state could not be written
+        """
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            with open(self.lock_path, "a") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    current = self.read()
+                    version = (current["version"] if current else 0) + 1
+                    record = {"version": version, "path": path, "directory": directory}
+
+                    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.state_path), suffix=".tmp")
+                    with os.fdopen(fd, "w", encoding="utf-8") as f:
+                        json.dump(record, f)
+                    os.replace(temp_path, self.state_path)
+                    return version
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        except Exception as e:
+            logger.error(f"Error publishing shared deck state to {self.state_path}: {str(e)}")
+            return None
@@ -1,7 +1,10 @@
 """Routes for flashcard operations."""
 import csv
+import hashlib
+import json
 import logging
 import os
+import secrets
 import traceback
 from typing import Dict, List, Any, Tuple, Optional
 
@@ -9,9 +12,36 @@ from flask import Blueprint, jsonify, request, Response
 from werkzeug.utils import secure_filename
 
 from config import Config
+from models.api_cache import observation_cache, taxon_id_cache
+from models.deck_cache import all_cache_stats, invalidate_path
+from models.deck_payload import DeckPayload
 from models.flashcard import flashcard_state
-from services.flashcard_service import check_answer, load_cards, select_csv_file, process_csv_data
-from utils.csv_utils import list_csv_files, save_csv_data
+from models.review_log import review_log
+from models.review_scheduler import review_states
+from models.session_store import DeckSession, session_store
+from services.flashcard_service import (
+    check_answer,
+    check_answers,
+    compare_decks,
+    get_hints,
+    get_session_card,
+    load_cards_page,
+    load_cards_payload,
+    load_joined_payload,
+    next_session_card,
+    process_csv_data,
+    select_csv_file,
+    select_session_deck,
+    stream_cards,
+)
+from services.study_service import answer_study_card, next_study_card, start_study
+from utils.csv_utils import DATA_DIRECTORIES, get_directory_path, list_csv_files, save_csv_data
+from utils.deck_catalog import get_deck_catalog
+from utils.deck_format import remove_compiled_deck
+from utils.deck_join import list_joinable_decks
+from utils.http_client import all_upstream_stats
+from utils.name_index import autocompleter
+from utils.species_index import get_species_index
 
 # Configure module logger
 logger = logging.getLogger(__name__)
@@ -20,6 +50,82 @@ logger = logging.getLogger(__name__)
 flashcard_bp = Blueprint('flashcard', __name__)
 
 
+def _get_session(create: bool = True) -> Optional[DeckSession]:
+    """Return the caller's session from the session header or cookie.
+    
+    Args:
+        create: Whether to start a new session if the token is missing or expired
+        
+    Returns:
+        The session, or None if there is none and create is False
+    """
+    token = request.headers.get(Config.SESSION_HEADER_NAME) or request.cookies.get(Config.SESSION_COOKIE_NAME)
+    if create:
+        return session_store.get_or_create(token)
+    return session_store.get(token)
+
+
+def _session_response(result: Dict[str, Any], status_code: int, session: DeckSession) -> Tuple[Response, int]:
+    """Build a JSON response that hands the session token back to the client."""
+    response = jsonify(result)
+    response.headers[Config.SESSION_HEADER_NAME] = session.token
+    response.set_cookie(
+        Config.SESSION_COOKIE_NAME,
+        session.token,
+        max_age=int(Config.SESSION_TTL_SECONDS),
+        httponly=True,
+        samesite="Lax",
+    )
+    return response, status_code
+
+
+def _get_learner() -> str:
+    """Return the caller's long-lived learner id from the learner header or cookie, or a new one."""
+    learner = request.headers.get(Config.STUDY_LEARNER_HEADER_NAME) or request.cookies.get(
+        Config.STUDY_LEARNER_COOKIE_NAME)
+    if not learner or len(learner) > 64:
+        learner = secrets.token_urlsafe(24)
+    return learner
+
+
+def _learner_response(result: Dict[str, Any], status_code: int, learner: str) -> Tuple[Response, int]:
+    """Build a JSON response that hands the learner id back to the client.
+    
+    The cookie outlives the study schedule's purge TTL, so a learner who
+    returns for a card due months later still has their schedule.
+    """
+    response = jsonify(result)
+    response.headers[Config.STUDY_LEARNER_HEADER_NAME] = learner
+    response.set_cookie(
+        Config.STUDY_LEARNER_COOKIE_NAME,
+        learner,
+        max_age=int(Config.STUDY_PURGE_TTL_SECONDS),
+        httponly=True,
+        samesite="Lax",
+    )
+    return response, status_code
+
+
+def _log_answer(card: Dict[str, Any], correct: bool, payload: Dict[str, Any]) -> None:
+    """Queue a graded answer in the review log.
+    
+    The deck is taken from "filename"/"directory" in the request, else from
+    the caller's session, else from the globally selected deck.
+    """
+    session = _get_session(create=False)
+    filename = payload.get("filename")
+    directory = payload.get("directory")
+    if not filename and session is not None and session.filename:
+        filename, directory = session.filename, session.directory
+    if not filename:
+        current_file = flashcard_state.get_current_file()
+        if current_file["path"]:
+            filename = os.path.basename(current_file["path"])
+            directory = current_file["directory"]
+    review_log.record(card["scientific_name"], correct, directory, filename,
+                      session.token if session is not None else None)
+
+
 @flashcard_bp.route("/check_answer", methods=["POST"])
 def check_answer_route() -> Tuple[Response, int]:
     """Check if the user's answer is correct.
@@ -27,6 +133,7 @@ def check_answer_route() -> Tuple[Response, int]:
     Expects JSON with:
     - "answer": the user's provided answer
     - "card": dictionary containing "scientific_name" and optionally "common_name"
+    - "tolerant" (optional): true to accept spelling variants and report near misses as close
     
     Returns:
         JSON response with correct/incorrect status and HTTP status code
@@ -51,7 +158,9 @@ def check_answer_route() -> Tuple[Response, int]:
         
         # Process the answer check
         logger.debug(f"Checking answer: '{user_answer}' against card")
-        result, status_code = check_answer(user_answer, card)
+        result, status_code = check_answer(user_answer, card, payload.get("tolerant") is True)
+        if status_code == 200:
+            _log_answer(card, result["correct"], payload)
         return jsonify(result), status_code
         
     except Exception as e:
@@ -60,23 +169,172 @@ def check_answer_route() -> Tuple[Response, int]:
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
 
-@flashcard_bp.route("/load_cards", methods=["POST"])
-def load_cards_route():
-    """Load all cards from a CSV file."""
+@flashcard_bp.route("/check_answers", methods=["POST"])
+def check_answers_route() -> Tuple[Response, int]:
+    """Grade a batch of answers, e.g. ones given offline, in a single request.
+    
+    Expects JSON with:
+    - "answers": list of {"card_id", "answer", "answered_at"} items, where
+      card_id is the row index of the card and answered_at is in seconds since the epoch
+    - "filename"/"directory": the deck (default: the caller's session deck)
+    - "tolerant" (optional): see /check_answer
+    
+    Returns:
+        JSON with one result per item, in order, and HTTP status code
+    """
+    if not request.is_json:
+        return jsonify({"error": "Missing JSON in request"}), 400
+    
     payload = request.json
+    answers = payload.get("answers")
+    if not isinstance(answers, list):
+        return jsonify({"error": "answers must be a list"}), 400
+    
+    session = _get_session(create=False)
     filename = payload.get("filename")
     directory = payload.get("directory", "mmaforays")
+    if not filename and session is not None and session.filename:
+        filename, directory = session.filename, session.directory
+    if not filename:
+        return jsonify({"error": "Filename is required"}), 400
+    
+    result, status_code = check_answers(filename, directory, answers, payload.get("tolerant") is True)
+    if status_code != 200:
+        return jsonify(result), status_code
+    
+    # One queue entry, so the whole batch is written in one transaction
+    review_log.record_many(result["graded"], directory, filename, session.token if session is not None else None)
+    return jsonify({"results": result["results"]}), 200
+
+
+@flashcard_bp.route("/load_cards", methods=["GET", "POST"])
+def load_cards_route() -> Tuple[Response, int]:
+    """Load cards from a CSV file.
+    
+    GET takes "filename" and "directory" query parameters, POST the same keys
+    as JSON. By default the whole deck is returned as a JSON array: the
+    pre-compressed body matching Accept-Encoding is sent as is, responses carry
+    an ETag of the serialized deck, and a GET with a matching If-None-Match is
+    answered with 304 Not Modified.
+    
+    Optional parameters select the other modes:
+    - "offset"/"limit": return one page as {"cards", "offset", "limit", "total", "next_offset"}
+    - "format": "ndjson" (or Accept: application/x-ndjson): stream one card per line
+    """
+    params = request.args if request.method == "GET" else request.json
+    filename = params.get("filename")
+    directory = params.get("directory", "mmaforays")
+    
+    if not filename:
+        logger.warning("Request to load_cards missing filename")
+        return jsonify({"error": "Filename is required"}), 400
+    
+    if params.get("format") == "ndjson" or request.accept_mimetypes.best == "application/x-ndjson":
+        cards, status_code = stream_cards(filename, directory)
+        if status_code != 200:
+            return jsonify(cards), status_code
+        lines = (json.dumps(card, ensure_ascii=False) + "\n" for card in cards)
+        return Response(lines, mimetype="application/x-ndjson"), 200
+    
+    if "offset" in params or "limit" in params:
+        try:
+            offset = int(params.get("offset", 0))
+            limit = int(params.get("limit", Config.DEFAULT_PAGE_SIZE))
+        except (TypeError, ValueError):
+            return jsonify({"error": "offset and limit must be integers"}), 400
+        result, status_code = load_cards_page(filename, directory, offset, limit)
+        return jsonify(result), status_code
+    
+    result, status_code = load_cards_payload(filename, directory)
+    if status_code != 200:
+        return jsonify(result), status_code
+    return _payload_response(result)
+
+
+@flashcard_bp.route("/load_joined_cards", methods=["GET"])
+def load_joined_cards_route() -> Tuple[Response, int]:
+    """Load a foray's -inat and -myco decks joined on taxon id as one deck.
+    
+    Each card carries the usual fields plus "id" and an "images" list with
+    the image, attribution and taxa link of every source. Responses are
+    negotiated and cached like /load_cards.
+    
+    Query Parameters:
+        name: Foray name shared by the sibling decks, e.g. "2024-07-14-NorthYarmouth"
+        directory: The directory containing the decks (default: "mmaforays")
+    """
+    name = request.args.get("name")
+    if not name:
+        return jsonify({"error": "name is required"}), 400
+    
+    result, status_code = load_joined_payload(secure_filename(name), request.args.get("directory", "mmaforays"))
+    if status_code != 200:
+        return jsonify(result), status_code
+    return _payload_response(result)
+
+
+@flashcard_bp.route("/deck_sets", methods=["GET"])
+def deck_sets() -> Tuple[Response, int]:
+    """Compare decks by species with a set operation.
+    
+    The result can be loaded like any deck through /load_cards with the
+    returned "virtual_deck" directory and filename.
     
-    result, status_code = load_cards(filename, directory)
+    Query Parameters:
+        op: "union", "intersection" or "difference"
+        decks: Comma-separated "directory/filename" decks, e.g.
+            "mmaforays/2024-11-03-Freeport-inat.csv,mmaforays/2024-07-14-NorthYarmouth-inat.csv"
+    """
+    decks = [deck for deck in request.args.get("decks", "").split(",") if deck]
+    result, status_code = compare_decks(request.args.get("op", ""), decks)
     return jsonify(result), status_code
 
 
+@flashcard_bp.route("/list_joined_decks", methods=["GET"])
+def list_joined_decks() -> Tuple[Response, int]:
+    """List the foray names in a directory that have both -inat and -myco decks."""
+    directory = request.args.get("directory", "mmaforays")
+    if directory not in DATA_DIRECTORIES:
+        return jsonify({"error": f"Directory must be one of {', '.join(DATA_DIRECTORIES)}"}), 400
+    return jsonify(list_joinable_decks(get_directory_path(directory))), 200
+
+
+def _payload_response(payload: DeckPayload) -> Tuple[Response, int]:
+    """Send a deck payload in the best accepted encoding, honouring If-None-Match."""
+    encoding = request.accept_encodings.best_match(payload.encodings(), default=None)
+    response = Response(payload.get_body(encoding), mimetype="application/json")
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.headers["Vary"] = "Accept-Encoding"
+    response.set_etag(payload.get_etag(encoding))
+    response.headers["Cache-Control"] = "no-cache"
+    response = response.make_conditional(request)
+    return response, response.status_code
+
+
 @flashcard_bp.route("/list_csv_files", methods=["GET"])
-def list_csv_files_route():
-    """List CSV files in a directory in alphabetical order."""
+def list_csv_files_route() -> Tuple[Response, int]:
+    """List CSV files in a directory in alphabetical order.
+    
+    With "metadata" set, the response also has a "decks" list of catalog
+    entries (rows, species, bytes, mtime, hash). Responses carry an ETag and a
+    matching If-None-Match is answered with 304 Not Modified.
+    """
     directory = request.args.get("directory", "mmaforays")
-    csv_files = list_csv_files(directory)
-    return jsonify({"files": csv_files}), 200
+    result: Dict[str, Any] = {"files": list_csv_files(directory)}
+    
+    if request.args.get("metadata", "").lower() in ("1", "true", "yes"):
+        directory_path = get_directory_path(directory)
+        if os.path.exists(directory_path):
+            result["decks"] = get_deck_catalog(directory_path, refresh=False).entries()
+        else:
+            result["decks"] = []
+    
+    response = jsonify(result)
+    response.set_etag(hashlib.sha256(response.get_data()).hexdigest()[:32])
+    response.headers["Cache-Control"] = "no-cache"
+    response = response.make_conditional(request)
+    return response, response.status_code
 
 
 @flashcard_bp.route("/upload_csv", methods=["POST"])
@@ -107,6 +365,8 @@ def upload_csv():
             # Save the processed data to a CSV file
             fieldnames = ["scientific_name", "common_name", "image_url", "taxa_url", "attribution"]
             if save_csv_data(file_path, processed_rows, fieldnames):
+                # Serialize and compress the deck now so loading it costs nothing extra
+                load_cards_payload(filename, directory)
                 return jsonify({
                     "message": "File uploaded and modified successfully",
                     "filename": filename
@@ -166,9 +426,226 @@ def select_csv():
     directory = payload.get("directory", "mmaforays")
     
     result, status_code = select_csv_file(filename, directory)
+    if status_code != 200:
+        return jsonify(result), status_code
+    
+    # Also record the selection in the caller's own session so concurrent users do not collide
+    session = _get_session()
+    seed = payload.get("seed")
+    session_result, session_status = select_session_deck(
+        session, filename, directory, seed if isinstance(seed, int) else None)
+    if session_status == 200:
+        result["session"] = session_result
+    return _session_response(result, status_code, session)
+
+
+@flashcard_bp.route("/session", methods=["GET"])
+def get_session() -> Tuple[Response, int]:
+    """Return the caller's selected deck and progress, starting a session if needed."""
+    session = _get_session()
+    return _session_response(session.to_dict(), 200, session)
+
+
+@flashcard_bp.route("/next_card", methods=["GET"])
+def next_card() -> Tuple[Response, int]:
+    """Return the next card of the caller's shuffled pass through their deck.
+    
+    Query Parameters:
+        filename: Deck to select if it is not already the session's deck
+        directory: The directory containing the deck (default: "mmaforays")
+    """
+    session = _get_session()
+    result, status_code = next_session_card(session, request.args.get("filename"), request.args.get("directory"))
+    return _session_response(result, status_code, session)
+
+
+@flashcard_bp.route("/get_card", methods=["GET"])
+def get_card() -> Tuple[Response, int]:
+    """Return one card of the caller's deck without advancing the pass.
+    
+    Query Parameters:
+        card_id: Row index of the card (default: the card last returned by /next_card)
+        filename: Deck to select if it is not already the session's deck
+        directory: The directory containing the deck (default: "mmaforays")
+    """
+    card_id = request.args.get("card_id")
+    if card_id is not None:
+        try:
+            card_id = int(card_id)
+        except ValueError:
+            return jsonify({"error": "card_id must be an integer"}), 400
+    
+    session = _get_session()
+    result, status_code = get_session_card(
+        session, card_id, request.args.get("filename"), request.args.get("directory"))
+    return _session_response(result, status_code, session)
+
+
+@flashcard_bp.route("/get_hints", methods=["GET"])
+def get_hints_route() -> Tuple[Response, int]:
+    """Return precomputed hints for a deck or one of its cards.
+    
+    Query Parameters:
+        filename: The deck (default: the caller's session deck, else the selected deck)
+        directory: The directory containing the deck (default: "mmaforays")
+        card_id: Row index of a card; without it the deck's sorted scientific names are returned
+    """
+    card_id = request.args.get("card_id")
+    if card_id is not None:
+        try:
+            card_id = int(card_id)
+        except ValueError:
+            return jsonify({"error": "card_id must be an integer"}), 400
+    
+    filename = request.args.get("filename")
+    directory = request.args.get("directory", "mmaforays")
+    if not filename:
+        session = _get_session(create=False)
+        if session is not None and session.filename:
+            filename, directory = session.filename, session.directory
+        else:
+            current_file = flashcard_state.get_current_file()
+            if not current_file["path"]:
+                return jsonify({"error": "No deck selected"}), 400
+            filename = os.path.basename(current_file["path"])
+            directory = current_file["directory"]
+    
+    result, status_code = get_hints(filename, directory, card_id)
     return jsonify(result), status_code
 
 
+@flashcard_bp.route("/study/start", methods=["POST"])
+def study_start() -> Tuple[Response, int]:
+    """Add a deck to the caller's spaced-repetition schedule.
+    
+    Expects JSON with "filename", and optionally "directory" and "seed".
+    """
+    payload = request.json or {}
+    filename = payload.get("filename")
+    if not filename:
+        return jsonify({"error": "Filename is required"}), 400
+    seed = payload.get("seed")
+    
+    learner = _get_learner()
+    result, status_code = start_study(
+        learner, filename, payload.get("directory", "mmaforays"), seed if isinstance(seed, int) else None)
+    return _learner_response(result, status_code, learner)
+
+
+@flashcard_bp.route("/study/next", methods=["GET"])
+def study_next() -> Tuple[Response, int]:
+    """Return the caller's next due card in study mode."""
+    learner = _get_learner()
+    result, status_code = next_study_card(learner)
+    return _learner_response(result, status_code, learner)
+
+
+@flashcard_bp.route("/study/answer", methods=["POST"])
+def study_answer() -> Tuple[Response, int]:
+    """Check an answer in study mode and reschedule the card.
+    
+    Expects JSON with "answer", and the "deck" and "card_id" returned by /study/next,
+    and optionally "tolerant" (see /check_answer).
+    """
+    payload = request.json or {}
+    deck = payload.get("deck")
+    card_id = payload.get("card_id")
+    if not isinstance(deck, int) or not isinstance(card_id, int):
+        return jsonify({"error": "deck and card_id must be integers"}), 400
+    
+    user_answer = payload.get("answer", "")
+    if not isinstance(user_answer, str) or not user_answer.strip():
+        logger.warning("Empty answer provided to study_answer")
+        return jsonify({"error": "Answer is required"}), 400
+    
+    learner = _get_learner()
+    result, status_code = answer_study_card(
+        learner, user_answer, deck, card_id, tolerant=payload.get("tolerant") is True)
+    return _learner_response(result, status_code, learner)
+
+
+@flashcard_bp.route("/study/stats", methods=["GET"])
+def study_stats() -> Tuple[Response, int]:
+    """Return the caller's study schedule stats."""
+    learner = _get_learner()
+    return _learner_response(review_states.scheduler(learner).stats(), 200, learner)
+
+
+@flashcard_bp.route("/search", methods=["GET"])
+def search_species() -> Tuple[Response, int]:
+    """Search every deck for species by scientific name, genus or common name.
+    
+    Query Parameters:
+        q: Words to match as prefixes, e.g. "amanita bis"
+        limit: Maximum number of species to return (default: 20)
+    """
+    query = request.args.get("q", "")
+    if not query.strip():
+        return jsonify({"error": "Query is required"}), 400
+    try:
+        limit = int(request.args.get("limit", 20))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if not 0 < limit <= Config.MAX_PAGE_SIZE:
+        return jsonify({"error": f"limit must be between 1 and {Config.MAX_PAGE_SIZE}"}), 400
+    
+    try:
+        return jsonify(get_species_index().search(query, limit)), 200
+    except Exception as e:
+        logger.error(f"Error searching species for '{query}': {str(e)}")
+        logger.error(traceback.format_exc())
+        return jsonify({"error": f"Error searching species: {str(e)}"}), 500
+
+
+@flashcard_bp.route("/autocomplete", methods=["GET"])
+def autocomplete() -> Tuple[Response, int]:
+    """Suggest scientific names for the answer being typed.
+    
+    Query Parameters:
+        q: Text typed so far
+        limit: Maximum number of names to return (default: 10)
+    """
+    try:
+        limit = int(request.args.get("limit", 10))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    if not 0 < limit <= 100:
+        return jsonify({"error": "limit must be between 1 and 100"}), 400
+    
+    try:
+        response = jsonify(autocompleter.complete(request.args.get("q", ""), limit))
+        # Let browsers reuse suggestions while the user edits the same prefix
+        response.headers["Cache-Control"] = "public, max-age=60"
+        return response, 200
+    except Exception as e:
+        logger.error(f"Error in autocomplete: {str(e)}")
+        logger.error(traceback.format_exc())
+        return jsonify({"error": f"Error in autocomplete: {str(e)}"}), 500
+
+
+@flashcard_bp.route("/stats/accuracy", methods=["GET"])
+def accuracy_stats() -> Tuple[Response, int]:
+    """Return answer accuracy aggregated from the review log.
+    
+    Query Parameters:
+        by: "deck" (default) or "species"
+        directory: Only count answers from decks in this directory
+        filename: Only count answers from decks with this file name
+    """
+    try:
+        # Include answers still waiting in the write-behind queue
+        review_log.flush()
+        results = review_log.accuracy(
+            request.args.get("by", "deck"), request.args.get("directory"), request.args.get("filename"))
+        return jsonify(results), 200
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logger.error(f"Error reading accuracy stats: {str(e)}")
+        logger.error(traceback.format_exc())
+        return jsonify({"error": f"Error reading accuracy stats: {str(e)}"}), 500
+
+
 @flashcard_bp.route("/delete_csv/<filename>", methods=["DELETE"])
 def delete_csv(filename: str) -> Tuple[Response, int]:
     """Delete a CSV file.
@@ -206,6 +683,8 @@ def delete_csv(filename: str) -> Tuple[Response, int]:
     try:
         # Delete the file
         os.remove(file_path)
+        remove_compiled_deck(file_path)
+        invalidate_path(file_path)
         logger.info(f"Successfully deleted file: {file_path}")
         return jsonify({"message": "File deleted successfully"}), 200
     except PermissionError:
@@ -214,4 +693,17 @@ def delete_csv(filename: str) -> Tuple[Response, int]:
     except Exception as e:
         logger.error(f"Error deleting file {file_path}: {str(e)}")
         logger.error(traceback.format_exc())
-        return jsonify({"error": f"Failed to delete file: {str(e)}"}), 500
\ No newline at end of file
+        return jsonify({"error": f"Failed to delete file: {str(e)}"}), 500
+
+
+@flashcard_bp.route("/debug_cache", methods=["GET"])
+def debug_cache() -> Tuple[Response, int]:
+    """Report hit/miss counts and memory usage of the in-process caches, and upstream API counters."""
+    return jsonify({
+        "caches": all_cache_stats(),
+        "sessions": session_store.stats(),
+        "review_log": review_log.stats(),
+        "autocomplete": autocompleter.stats(),
+        "upstreams": all_upstream_stats(),
+        "api_caches": [taxon_id_cache.stats(), observation_cache.stats()],
+    }), 200
@@ -1,42 +1,215 @@
 """Service for flashcard operations."""
+import asyncio
+import inspect
+import itertools
 import logging
 import os
 import traceback
-from typing import Dict, List, Optional, Any, Tuple
-
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Any, Tuple, Union
 
 from config import Config
+from models.deck_cache import deck_cache, file_identity
+from models.deck_hints import DeckHints, hints_cache
+from models.deck_payload import DeckPayload, payload_cache, read_payload_sidecar, write_payload_sidecar
 from models.flashcard import flashcard_state
-from utils.csv_utils import load_csv_data
+from models.session_store import DeckSession, session_store
+from utils.csv_utils import (
+    DATA_DIRECTORIES,
+    DeckFormatError,
+    get_directory_path,
+    iter_csv_records,
+    load_csv_data,
+)
+from utils.deck_join import load_joined_deck
+from utils.deck_sets import VIRTUAL_DIRECTORY, load_virtual_deck, parse_virtual_deck_name, virtual_deck_name
+from utils.deck_format import open_compiled_deck
 from utils.api_utils import get_taxon_id, get_observation_details
+from utils.async_api_utils import AsyncINaturalistClient
+from utils.name_matching import bounded_levenshtein, card_normal_form, normal_form, precompute_normal_forms
 
 logger = logging.getLogger(__name__)
 
 
-def check_answer(user_answer: str, card: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+def directory_error(directory: Optional[str]) -> Optional[Tuple[Dict[str, Any], int]]:
+    """Return a 400 error response if a requested directory is not one of DATA_DIRECTORIES.
+    
+    Args:
+        directory: Directory name from the request
+        
+    Returns:
+        A tuple containing error info and HTTP status code, or None if the directory is known
+    """
+    if directory not in DATA_DIRECTORIES:
+        logger.warning(f"Unknown directory requested: {directory}")
+        return {"error": f"Directory must be one of {', '.join(DATA_DIRECTORIES)}"}, 400
+    return None
+
+
+def check_answer(user_answer: str, card: Dict[str, Any], tolerant: bool = False) -> Tuple[Dict[str, Any], int]:
     """Check if the user's answer is correct.
     
     Args:
         user_answer: The answer provided by the user
         card: The flashcard data containing the scientific name
+        tolerant: Ignore case, spacing, diacritics and authorities, and report
+            answers within Config.FUZZY_MAX_DISTANCE edits as close
         
     Returns:
         A tuple containing response data and HTTP status code
     """
-    user_answer = user_answer.strip().lower()
+    # Case is kept for normal_form, which tells an authority by its capital letter
+    user_answer = user_answer.strip()
     
     if "scientific_name" not in card:
         logger.warning("Invalid card data received - missing scientific_name")
         return {"correct": False, "message": "Invalid card data received."}, 400
     
-    if user_answer == card["scientific_name"].lower():
-        common_name = card.get("common_name", "")
+    common_name = card.get("common_name", "")
+    if user_answer.lower() == card["scientific_name"].lower():
         return {"correct": True, "message": f"Correct! ({common_name})"}, 200
     
+    if tolerant:
+        expected = card_normal_form(card["scientific_name"])
+        answer = normal_form(user_answer)
+        if answer == expected:
+            return {"correct": True, "message": f"Correct! ({common_name})"}, 200
+        
+        # Allow fewer edits for short names so that one genus is not accepted for another
+        max_distance = min(Config.FUZZY_MAX_DISTANCE, len(expected) // 8)
+        distance = bounded_levenshtein(answer, expected, max_distance) if max_distance else None
+        if distance is not None:
+            return {
+                "correct": False,
+                "close": True,
+                "distance": distance,
+                "message": f"Close! Check your spelling ({distance} letter{'s' if distance > 1 else ''} off).",
+            }, 200
+    
     return {"correct": False, "message": "Incorrect. Try again!"}, 200
 
 
+def check_answers(filename: str, directory: str, answers: List[Dict[str, Any]],
+                  tolerant: bool = False) -> Tuple[Dict[str, Any], int]:
+    """Grade a batch of answers against the server's copy of a deck.
+    
+    The deck is loaded once for the whole batch, and each item is graded
+    with check_answer.
+    
+    Args:
+        filename: Name of the CSV file the cards belong to
+        directory: Directory containing the file
+        answers: Items with "card_id", "answer" and optionally "answered_at"
+        tolerant: Use tolerant grading (see check_answer)
+        
+    Returns:
+        A tuple containing {"results": [...], "graded": [...]} or error info, and
+        HTTP status code. Each result holds the item's card_id and either the
+        check_answer response or an error; graded lists the scientific_name,
+        correct and answered_at of every graded item.
+    """
+    if len(answers) > Config.MAX_BATCH_ANSWERS:
+        return {"error": f"At most {Config.MAX_BATCH_ANSWERS} answers can be graded at once"}, 400
+    error = directory_error(directory)
+    if error:
+        return error
+    
+    try:
+        file_path = os.path.join(Config.BASE_DATA_DIR, directory, filename)
+        
+        if not os.path.exists(file_path):
+            logger.warning(f"File not found: {file_path}")
+            return {"error": "File not found"}, 404
+        
+        data = load_csv_data(file_path)
+        if data is None:
+            logger.error(f"Failed to load CSV file: {file_path}")
+            return {"error": "Failed to load CSV file"}, 500
+        
+        results: List[Dict[str, Any]] = []
+        graded: List[Dict[str, Any]] = []
+        for item in answers:
+            card_id = item.get("card_id") if isinstance(item, dict) else None
+            if not isinstance(card_id, int) or not 0 <= card_id < len(data):
+                results.append({"card_id": card_id, "error": "Card not found"})
+                continue
+            user_answer = item.get("answer")
+            if not isinstance(user_answer, str) or not user_answer.strip():
+                results.append({"card_id": card_id, "error": "Answer is required"})
+                continue
+            
+            card = data[card_id]
+            result, status_code = check_answer(user_answer, card, tolerant)
+            result["card_id"] = card_id
+            results.append(result)
+            if status_code == 200:
+                answered_at = item.get("answered_at")
+                graded.append({
+                    "scientific_name": card["scientific_name"],
+                    "correct": result["correct"],
+                    "answered_at": answered_at if isinstance(answered_at, (int, float)) else None,
+                })
+        
+        return {"results": results, "graded": graded}, 200
+    
+    except Exception as e:
+        logger.error(f"Error in check_answers for {filename}: {str(e)}")
+        logger.error(traceback.format_exc())
+        return {"error": f"Error checking answers: {str(e)}"}, 500
+
+
+def _load_virtual(filename: str) -> Tuple[Union[Tuple[List[Dict[str, Any]], DeckPayload], Dict[str, Any]], int]:
+    """Load the cards and payload of a virtual deck produced by a set operation.
+    
+    Returns:
+        A tuple containing either (cards, payload) or error info, and HTTP status code
+    """
+    try:
+        return load_virtual_deck(filename), 200
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    except FileNotFoundError as e:
+        logger.warning(f"Deck not found for virtual deck {filename}: {str(e)}")
+        return {"error": f"File not found: {str(e)}"}, 404
+    except Exception as e:
+        logger.error(f"Error computing virtual deck {filename}: {str(e)}")
+        logger.error(traceback.format_exc())
+        return {"error": f"Error loading cards: {str(e)}"}, 500
+
+
+def compare_decks(operation: str, decks: List[str]) -> Tuple[Dict[str, Any], int]:
+    """Compute a union, intersection or difference of decks by species.
+    
+    Args:
+        operation: "union", "intersection" or "difference"
+        decks: Decks as "directory/filename" strings; difference and intersection
+            are taken relative to the first deck
+        
+    Returns:
+        A tuple containing the resulting species and the virtual deck that
+        /load_cards serves them as, or error info, and HTTP status code
+    """
+    name = f"{operation}:" + ",".join(decks)
+    try:
+        operation, parsed_decks = parse_virtual_deck_name(name)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    
+    result, status_code = _load_virtual(virtual_deck_name(operation, parsed_decks))
+    if status_code != 200:
+        return result, status_code
+    
+    cards = result[0]
+    return {
+        "operation": operation,
+        "decks": [{"directory": directory, "filename": filename} for directory, filename in parsed_decks],
+        "virtual_deck": {"directory": VIRTUAL_DIRECTORY, "filename": virtual_deck_name(operation, parsed_decks)},
+        "total": len(cards),
+        "species": [{"scientific_name": card["scientific_name"], "common_name": card["common_name"]}
+                    for card in cards],
+    }, 200
+
+
 def load_cards(filename: str, directory: str = "mmaforays") -> Tuple[Dict[str, Any], int]:
     """Load all cards from a CSV file.
     
@@ -47,6 +220,13 @@ def load_cards(filename: str, directory: str = "mmaforays") -> Tuple[Dict[str, A
     Returns:
         A tuple containing either the cards data or error info, and HTTP status code
     """
+    if directory == VIRTUAL_DIRECTORY:
+        result, status_code = _load_virtual(filename)
+        return ([dict(card) for card in result[0]], 200) if status_code == 200 else (result, status_code)
+    error = directory_error(directory)
+    if error:
+        return error
+    
     try:
         file_path = os.path.join(Config.BASE_DATA_DIR, directory, filename)
         
@@ -59,8 +239,8 @@ def load_cards(filename: str, directory: str = "mmaforays") -> Tuple[Dict[str, A
             logger.error(f"Failed to load CSV file: {file_path}")
             return {"error": "Failed to load CSV file"}, 500
         
-        # Convert DataFrame to list of dictionaries
-        cards = data.to_dict('records')
+        # Copy the cards so callers cannot mutate the cached deck
+        cards = [dict(card) for card in data]
         logger.info(f"Successfully loaded {len(cards)} cards from {filename}")
         return cards, 200
     
@@ -70,6 +250,262 @@ def load_cards(filename: str, directory: str = "mmaforays") -> Tuple[Dict[str, A
         return {"error": f"Error loading cards: {str(e)}"}, 500
 
 
+def load_cards_payload(filename: str, directory: str = "mmaforays") -> Tuple[Union[DeckPayload, Dict[str, Any]], int]:
+    """Load the pre-serialized JSON payload of a deck.
+    
+    Payloads are cached per file, so repeat loads of an unchanged deck reuse
+    the same bytes and ETag without re-serializing. On a cache miss the
+    payload stored when the deck was compiled is read; only if it is missing
+    or stale is one built, at the fast request compression levels, and stored
+    for the other workers.
+    
+    Args:
+        filename: Name of the CSV file to load
+        directory: Directory containing the file (default: "mmaforays")
+        
+    Returns:
+        A tuple containing either the deck payload or error info, and HTTP status code
+    """
+    if directory == VIRTUAL_DIRECTORY:
+        result, status_code = _load_virtual(filename)
+        return (result[1], 200) if status_code == 200 else (result, status_code)
+    error = directory_error(directory)
+    if error:
+        return error
+    
+    file_path = os.path.join(Config.BASE_DATA_DIR, directory, filename)
+    
+    payload = payload_cache.get(file_path)
+    if payload is not None:
+        return payload, 200
+    
+    identity = file_identity(file_path)
+    cards, status_code = load_cards(filename, directory)
+    if status_code != 200:
+        return cards, status_code
+    
+    try:
+        payload = read_payload_sidecar(file_path, identity)
+        if payload is None:
+            payload = DeckPayload(cards)
+            if identity is not None:
+                write_payload_sidecar(file_path, payload, identity)
+        payload_cache.put(file_path, payload, identity)
+        precompute_normal_forms(cards)
+        return payload, 200
+    except Exception as e:
+        logger.error(f"Error serializing cards for {filename}: {str(e)}")
+        logger.error(traceback.format_exc())
+        return {"error": f"Error loading cards: {str(e)}"}, 500
+
+
+def load_joined_payload(name: str, directory: str = "mmaforays") -> Tuple[Union[DeckPayload, Dict[str, Any]], int]:
+    """Load the payload of a foray's sibling decks joined on taxon id.
+    
+    Args:
+        name: Foray name shared by the sibling decks, e.g. "2024-07-14-NorthYarmouth"
+        directory: Directory containing the decks (default: "mmaforays")
+        
+    Returns:
+        A tuple containing either the joined deck payload or error info, and HTTP status code
+    """
+    error = directory_error(directory)
+    if error:
+        return error
+    
+    try:
+        result = load_joined_deck(get_directory_path(directory), name)
+        if result is None:
+            logger.warning(f"Sibling decks not found for {name} in {directory}")
+            return {"error": "File not found"}, 404
+        return result[1], 200
+    
+    except DeckFormatError as e:
+        logger.error(f"Cannot join decks for {name}: {str(e)}")
+        return {"error": str(e)}, 400
+    except Exception as e:
+        logger.error(f"Error joining decks for {name}: {str(e)}")
+        logger.error(traceback.format_exc())
+        return {"error": f"Error loading cards: {str(e)}"}, 500
+
+
+def load_cards_page(filename: str, directory: str = "mmaforays", offset: int = 0,
+                    limit: int = Config.DEFAULT_PAGE_SIZE) -> Tuple[Dict[str, Any], int]:
+    """Load one page of cards from a CSV file.
+    
+    Compiled decks decode only the requested rows, so the memory used per
+    request is bounded by the page size rather than the deck size.
+    
+    Args:
+        filename: Name of the CSV file to load
+        directory: Directory containing the file (default: "mmaforays")
+        offset: Index of the first card to return
+        limit: Maximum number of cards to return
+        
+    Returns:
+        A tuple containing the page (cards, offset, limit, total, next_offset)
+        or error info, and HTTP status code
+    """
+    if offset < 0 or not 0 < limit <= Config.MAX_PAGE_SIZE:
+        return {"error": f"offset must be >= 0 and limit between 1 and {Config.MAX_PAGE_SIZE}"}, 400
+    
+    try:
+        if directory == VIRTUAL_DIRECTORY:
+            result, status_code = _load_virtual(filename)
+            if status_code != 200:
+                return result, status_code
+            data = result[0]
+        else:
+            error = directory_error(directory)
+            if error:
+                return error
+            file_path = os.path.join(Config.BASE_DATA_DIR, directory, filename)
+            
+            if not os.path.exists(file_path):
+                logger.warning(f"File not found: {file_path}")
+                return {"error": "File not found"}, 404
+            
+            data = load_csv_data(file_path)
+            if data is None:
+                logger.error(f"Failed to load CSV file: {file_path}")
+                return {"error": "Failed to load CSV file"}, 500
+        
+        total = len(data)
+        cards = list(data[offset:offset + limit])
+        next_offset = offset + len(cards)
+        return {
+            "cards": cards,
+            "offset": offset,
+            "limit": limit,
+            "total": total,
+            "next_offset": next_offset if next_offset < total else None,
+        }, 200
+    
+    except Exception as e:
+        logger.error(f"Error in load_cards_page for {filename}: {str(e)}")
+        logger.error(traceback.format_exc())
+        return {"error": f"Error loading cards: {str(e)}"}, 500
+
+
+def stream_cards(filename: str, directory: str = "mmaforays") -> Tuple[Union[Iterator[Dict[str, Any]], Dict[str, Any]], int]:
+    """Stream the cards of a CSV file one at a time.
+    
+    A cached or compiled deck is iterated directly; otherwise the CSV is read
+    incrementally, so the first card is available before the file is read.
+    
+    Args:
+        filename: Name of the CSV file to stream
+        directory: Directory containing the file (default: "mmaforays")
+        
+    Returns:
+        A tuple containing either an iterator of cards or error info, and HTTP status code
+    """
+    if directory == VIRTUAL_DIRECTORY:
+        result, status_code = _load_virtual(filename)
+        return (iter(result[0]), 200) if status_code == 200 else (result, status_code)
+    error = directory_error(directory)
+    if error:
+        return error
+    
+    try:
+        file_path = os.path.join(Config.BASE_DATA_DIR, directory, filename)
+        
+        if not os.path.exists(file_path):
+            logger.warning(f"File not found: {file_path}")
+            return {"error": "File not found"}, 404
+        
+        data = deck_cache.get(file_path)
+        if data is None:
+            data = open_compiled_deck(file_path, file_identity(file_path))
+        if data is not None:
+            return iter(data), 200
+        
+        # Read the first record now so format errors are reported before streaming starts
+        records = iter_csv_records(file_path)
+        first = next(records, None)
+        if first is None:
+            return iter(()), 200
+        return itertools.chain([first], records), 200
+    
+    except DeckFormatError as e:
+        logger.error(str(e))
+        return {"error": "Failed to load CSV file"}, 500
+    except Exception as e:
+        logger.error(f"Error in stream_cards for {filename}: {str(e)}")
+        logger.error(traceback.format_exc())
+        return {"error": f"Error loading cards: {str(e)}"}, 500
+
+
+def load_deck_hints(filename: str, directory: str = "mmaforays") -> Tuple[Union[DeckHints, Dict[str, Any]], int]:
+    """Load the precomputed hints of a deck.
+    
+    Hints are computed once per version of the file and cached, so serving
+    them is a lookup.
+    
+    Args:
+        filename: Name of the CSV file
+        directory: Directory containing the file (default: "mmaforays")
+        
+    Returns:
+        A tuple containing either the deck hints or error info, and HTTP status code
+    """
+    error = directory_error(directory)
+    if error:
+        return error
+    
+    file_path = os.path.join(Config.BASE_DATA_DIR, directory, filename)
+    
+    hints = hints_cache.get(file_path)
+    if hints is not None:
+        return hints, 200
+    
+    try:
+        if not os.path.exists(file_path):
+            logger.warning(f"File not found: {file_path}")
+            return {"error": "File not found"}, 404
+        
+        identity = file_identity(file_path)
+        data = load_csv_data(file_path)
+        if data is None:
+            logger.error(f"Failed to load CSV file: {file_path}")
+            return {"error": "Failed to load CSV file"}, 500
+        
+        hints = DeckHints(data)
+        hints_cache.put(file_path, hints, identity)
+        return hints, 200
+    
+    except Exception as e:
+        logger.error(f"Error computing hints for {filename}: {str(e)}")
+        logger.error(traceback.format_exc())
+        return {"error": f"Error loading hints: {str(e)}"}, 500
+
+
+def get_hints(filename: str, directory: str = "mmaforays",
+              card_id: Optional[int] = None) -> Tuple[Union[List[str], Dict[str, Any]], int]:
+    """Get the hints of a deck or of one of its cards.
+    
+    Args:
+        filename: Name of the CSV file
+        directory: Directory containing the file (default: "mmaforays")
+        card_id: Row index of a card (default: return the deck's name list)
+        
+    Returns:
+        A tuple containing the sorted scientific names of the deck, or the card's
+        genus_initial, letter_counts, masked_name and siblings, or error info,
+        and HTTP status code
+    """
+    hints, status_code = load_deck_hints(filename, directory)
+    if status_code != 200:
+        return hints, status_code
+    
+    if card_id is None:
+        return hints.names, 200
+    try:
+        return hints.card_hints(card_id), 200
+    except IndexError:
+        return {"error": "Card not found"}, 404
+
+
 def select_csv_file(filename: str, directory: str = "mmaforays") -> Tuple[Dict[str, Any], int]:
     """Select a CSV file for flashcards and update current file state.
     
@@ -80,6 +516,10 @@ def select_csv_file(filename: str, directory: str = "mmaforays") -> Tuple[Dict[s
     Returns:
         A tuple containing response data and HTTP status code
     """
+    error = directory_error(directory)
+    if error:
+        return error
+    
     try:
         file_path = os.path.join(Config.BASE_DATA_DIR, directory, filename)
         
@@ -97,7 +537,7 @@ def select_csv_file(filename: str, directory: str = "mmaforays") -> Tuple[Dict[s
         
         return {
             "message": "CSV file selected successfully",
-            "first_card": new_data.iloc[0].to_dict(),
+            "first_card": new_data[0] if new_data else None,
         }, 200
     
     except Exception as e:
@@ -106,63 +546,261 @@ def select_csv_file(filename: str, directory: str = "mmaforays") -> Tuple[Dict[s
         return {"error": f"Error selecting CSV file: {str(e)}"}, 500
 
 
+def select_session_deck(session: DeckSession, filename: str, directory: str = "mmaforays",
+                        seed: Optional[int] = None) -> Tuple[Dict[str, Any], int]:
+    """Select a deck for one user's session and start a shuffled pass through it.
+    
+    Args:
+        session: The user's session
+        filename: Name of the CSV file to select
+        directory: Directory containing the file (default: "mmaforays")
+        seed: Shuffle seed (default: a random seed)
+        
+    Returns:
+        A tuple containing the session state or error info, and HTTP status code
+    """
+    error = directory_error(directory)
+    if error:
+        return error
+    
+    try:
+        file_path = os.path.join(Config.BASE_DATA_DIR, directory, filename)
+        
+        if not os.path.exists(file_path):
+            logger.warning(f"File not found: {file_path}")
+            return {"error": "File not found"}, 404
+        
+        data = load_csv_data(file_path)
+        if data is None:
+            logger.error(f"Failed to load CSV file: {file_path}")
+            return {"error": "Failed to load CSV file"}, 500
+        
+        session.select_deck(directory, filename, len(data), seed)
+        session_store.save(session)
+        precompute_normal_forms(data)
+        load_deck_hints(filename, directory)
+        return session.to_dict(), 200
+    
+    except Exception as e:
+        logger.error(f"Error in select_session_deck for {filename}: {str(e)}")
+        logger.error(traceback.format_exc())
+        return {"error": f"Error selecting CSV file: {str(e)}"}, 500
+
+
+def _load_session_deck(session: DeckSession, filename: Optional[str] = None,
+                       directory: Optional[str] = None) -> Tuple[Any, int]:
+    """Return the cards of the session's deck, selecting a deck first if one is named.
+    
+    The session is reloaded from the shared store first, so the deck and
+    cursor are the latest ones written by any worker. Naming the deck on
+    every request lets a session that expired be rebuilt without a separate
+    selection call.
+    
+    Returns:
+        A tuple containing the cards or error info, and HTTP status code
+    """
+    session_store.refresh(session)
+    if filename and (filename != session.filename or (directory or "mmaforays") != session.directory):
+        result, status_code = select_session_deck(session, filename, directory or "mmaforays")
+        if status_code != 200:
+            return result, status_code
+    
+    if session.filename is None:
+        return {"error": "No deck selected"}, 400
+    
+    file_path = os.path.join(Config.BASE_DATA_DIR, session.directory, session.filename)
+    data = load_csv_data(file_path)
+    if data is None:
+        logger.error(f"Failed to load CSV file: {file_path}")
+        return {"error": "Failed to load CSV file"}, 500
+    
+    # The deck was edited since the pass started, so start over
+    if len(data) != session.total:
+        session_store.update(session, lambda current: current.reshuffle(len(data))
+                             if current.total != len(data) else None)
+    return data, 200
+
+
+def _session_card(session: DeckSession, data: Any, index: int) -> Dict[str, Any]:
+    """Build the response for one card of the session's deck."""
+    return {
+        "card": data[index],
+        "card_id": index,
+        "position": session.cursor,
+        "total": len(data),
+        "seed": session.seed,
+    }
+
+
+def next_session_card(session: DeckSession, filename: Optional[str] = None,
+                      directory: Optional[str] = None) -> Tuple[Dict[str, Any], int]:
+    """Return the next card of the session's shuffled pass through its deck.
+    
+    Only the requested row is decoded, so each call costs O(1) regardless of
+    the deck size. The cursor is advanced in the shared session record.
+    
+    Args:
+        session: The user's session
+        filename: Deck to select if it is not already the session's deck
+        directory: Directory containing the deck (default: "mmaforays")
+        
+    Returns:
+        A tuple containing the card (card, card_id, position, total, seed)
+        or error info, and HTTP status code
+    """
+    try:
+        data, status_code = _load_session_deck(session, filename, directory)
+        if status_code != 200:
+            return data, status_code
+        
+        index = session_store.update(session, DeckSession.next_index)
+        if index is None:
+            return {"error": "Deck is empty"}, 404
+        return _session_card(session, data, index), 200
+    
+    except Exception as e:
+        logger.error(f"Error in next_session_card: {str(e)}")
+        logger.error(traceback.format_exc())
+        return {"error": f"Error getting next card: {str(e)}"}, 500
+
+
+def get_session_card(session: DeckSession, card_id: Optional[int] = None, filename: Optional[str] = None,
+                     directory: Optional[str] = None) -> Tuple[Dict[str, Any], int]:
+    """Return one card of the session's deck without advancing the pass.
+    
+    Args:
+        session: The user's session
+        card_id: Row index of the card (default: the card last returned by next_session_card)
+        filename: Deck to select if it is not already the session's deck
+        directory: Directory containing the deck (default: "mmaforays")
+        
+    Returns:
+        A tuple containing the card (card, card_id, position, total, seed)
+        or error info, and HTTP status code
+    """
+    try:
+        data, status_code = _load_session_deck(session, filename, directory)
+        if status_code != 200:
+            return data, status_code
+        
+        index = session.current_index() if card_id is None else card_id
+        if index is None:
+            return {"error": "No current card"}, 404
+        if not 0 <= index < len(data):
+            return {"error": "Card not found"}, 404
+        return _session_card(session, data, index), 200
+    
+    except Exception as e:
+        logger.error(f"Error in get_session_card: {str(e)}")
+        logger.error(traceback.format_exc())
+        return {"error": f"Error getting card: {str(e)}"}, 500
+
+
+async def _complete_row(row: Dict[str, Any], lookup_taxon_id: Callable[[str], Any],
+                        lookup_observation: Callable[[str], Any]) -> Optional[Dict[str, Any]]:
+    """Complete one CSV row, looking up a missing taxa_url or attribution.
+    
+    Args:
+        row: Dictionary containing the row data from CSV
+        lookup_taxon_id: Returns the taxon id of a scientific name, or an awaitable of it
+        lookup_observation: Returns the details of an observation URL, or an awaitable of them
+        
+    Returns:
+        The row with only the required columns, or None if it has no scientific_name
+    """
+    scientific_name = row.get("scientific_name", "")
+    if not scientific_name:
+        logger.warning("Row missing scientific_name, skipping")
+        return None
+        
+    # Process taxa_url
+    taxa_url = row.get("taxa_url")
+    if not taxa_url or taxa_url == "N/A":
+        try:
+            # Fetch the taxon_id and construct the taxa_url if not present
+            taxon_id = lookup_taxon_id(scientific_name)
+            if inspect.isawaitable(taxon_id):
+                taxon_id = await taxon_id
+            taxa_url = f"https://www.inaturalist.org/taxa/{taxon_id}" if taxon_id else "N/A"
+        except Exception as e:
+            logger.error(f"Error fetching taxon_id for {scientific_name}: {str(e)}")
+            taxa_url = "N/A"
+    
+    # Process attribution
+    attribution = row.get("attribution")
+    if not attribution or attribution == "N/A":
+        try:
+            # Fetch observation details from iNaturalist API
+            observation_url = row.get("url", "")
+            observation_data = lookup_observation(observation_url) if observation_url else None
+            if inspect.isawaitable(observation_data):
+                observation_data = await observation_data
+            if observation_data and observation_data.get("photos"):
+                photo = observation_data["photos"][0]
+                attribution = photo.get('attribution', "N/A")
+            else:
+                attribution = "N/A"
+        except Exception as e:
+            logger.error(f"Error fetching attribution for {scientific_name}: {str(e)}")
+            attribution = "N/A"
+    
+    # Create a new row with only the required columns
+    return {
+        "scientific_name": scientific_name,
+        "common_name": row.get("common_name", "N/A"),
+        "image_url": row.get("image_url", "N/A"),
+        "taxa_url": taxa_url,
+        "attribution": attribution
+    }
+
+
+def _process_row(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Complete one CSV row with _complete_row, fetching from iNaturalist with blocking calls.
+    
+    The lookups never await, so the row is completed on a private event loop
+    that does nothing else.
+    
+    Args:
+        row: Dictionary containing the row data from CSV
+        
+    Returns:
+        The row with only the required columns, or None if it has no scientific_name
+    """
+    return asyncio.run(_complete_row(row, get_taxon_id, get_observation_details))
+
+
 def process_csv_data(file_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Process CSV data to add taxa_url and attribution if not present.
     
+    Rows are completed concurrently by up to Config.ENRICHMENT_WORKERS threads,
+    since each may wait on iNaturalist; the output keeps the input row order.
+    With Config.ENRICHMENT_MODE set to "asyncio", rows are completed on an
+    event loop by process_csv_data_async instead.
+    
     Args:
         file_data: List of dictionaries containing row data from CSV
         
     Returns:
         List of processed row dictionaries with complete data
     """
+    if Config.ENRICHMENT_MODE == "asyncio":
+        return asyncio.run(process_csv_data_async(file_data))
+
     processed_rows = []
     
     try:
-        for row in file_data:
-            scientific_name = row.get("scientific_name", "")
-            if not scientific_name:
-                logger.warning("Row missing scientific_name, skipping")
-                continue
-                
-            # Process taxa_url
-            taxa_url = row.get("taxa_url")
-            if not taxa_url or taxa_url == "N/A":
-                try:
-                    # Fetch the taxon_id and construct the taxa_url if not present
-                    taxon_id = get_taxon_id(scientific_name)
-                    taxa_url = f"https://www.inaturalist.org/taxa/{taxon_id}" if taxon_id else "N/A"
-                except Exception as e:
-                    logger.error(f"Error fetching taxon_id for {scientific_name}: {str(e)}")
-                    taxa_url = "N/A"
-            
-            # Process attribution
-            attribution = row.get("attribution")
-            if not attribution or attribution == "N/A":
-                try:
-                    # Fetch observation details from iNaturalist API
-                    observation_url = row.get("url", "")
-                    if observation_url:
-                        observation_data = get_observation_details(observation_url)
-                        if observation_data and observation_data.get("photos"):
-                            photo = observation_data["photos"][0]
-                            attribution = photo.get('attribution', "N/A")
-                        else:
-                            attribution = "N/A"
-                    else:
-                        attribution = "N/A"
-                except Exception as e:
-                    logger.error(f"Error fetching attribution for {scientific_name}: {str(e)}")
-                    attribution = "N/A"
-            
-            # Create a new row with only the required columns
-            new_row = {
-                "scientific_name": scientific_name,
-                "common_name": row.get("common_name", "N/A"),
-                "image_url": row.get("image_url", "N/A"),
-                "taxa_url": taxa_url,
-                "attribution": attribution
-            }
-            processed_rows.append(new_row)
+        workers = min(Config.ENRICHMENT_WORKERS, len(file_data))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="enrich") as executor:
+                # map yields results in input order
+                for new_row in executor.map(_process_row, file_data):
+                    if new_row is not None:
+                        processed_rows.append(new_row)
+        else:
+            for row in file_data:
+                new_row = _process_row(row)
+                if new_row is not None:
+                    processed_rows.append(new_row)
         
         logger.info(f"Successfully processed {len(processed_rows)} rows")
         return processed_rows
@@ -171,4 +809,42 @@ def process_csv_data(file_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         logger.error(f"Error in process_csv_data: {str(e)}")
         logger.error(traceback.format_exc())
         # Return what we have so far, rather than failing completely
-        return processed_rows
\ No newline at end of file
+        return processed_rows
+
+
+async def process_csv_data_async(file_data: List[Dict[str, Any]],
+                                 concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Process CSV data to add taxa_url and attribution if not present, on an event loop.
+    
+    Every row is started at once over one HTTP client, and a semaphore keeps
+    at most concurrency iNaturalist requests in flight, so a large upload
+    costs a coroutine per row rather than a thread.
+    
+    Args:
+        file_data: List of dictionaries containing row data from CSV
+        concurrency: Maximum requests in flight (default: Config.ENRICHMENT_CONCURRENCY)
+        
+    Returns:
+        List of processed row dictionaries with complete data, in input order
+    """
+    try:
+        async with AsyncINaturalistClient(concurrency or Config.ENRICHMENT_CONCURRENCY) as client:
+            # gather returns results in input order
+            results = await asyncio.gather(
+                *(_complete_row(row, client.get_taxon_id, client.get_observation_details) for row in file_data),
+                return_exceptions=True)
+    except Exception as e:
+        logger.error(f"Error in process_csv_data_async: {str(e)}")
+        logger.error(traceback.format_exc())
+        return []
+    
+    processed_rows = []
+    for new_row in results:
+        if isinstance(new_row, Exception):
+            logger.error(f"Error in process_csv_data_async: {str(new_row)}")
+            # Return the rows before the failure, like process_csv_data
+            return processed_rows
+        if new_row is not None:
+            processed_rows.append(new_row)
+    logger.info(f"Successfully processed {len(processed_rows)} rows")
+    return processed_rows
@@ -0,0 +1,176 @@
+"""Service for the spaced-repetition study mode."""
+import logging
+import os
+import secrets
+import traceback
+from typing import Any, Dict, Optional, Tuple
+
+from config import Config
+from models.review_log import review_log
+from models.review_scheduler import quality_from_outcome, review_states
+from models.session_store import shuffled_order
+from services.flashcard_service import check_answer, directory_error
+from utils.csv_utils import load_csv_data
+from utils.name_matching import precompute_normal_forms
+
+logger = logging.getLogger(__name__)
+
+
+def _load_deck(directory: str, filename: str) -> Tuple[Any, int]:
+    """Load the cards of a deck.
+
+    Returns:
+        A tuple containing the cards or error info, and HTTP status code
+    """
+    error = directory_error(directory)
+    if error:
+        return error
+
+    file_path = os.path.join(Config.BASE_DATA_DIR, directory, filename)
+
+    if not os.path.exists(file_path):
+        logger.warning(f"File not found: {file_path}")
+        return {"error": "File not found"}, 404
+
+    data = load_csv_data(file_path)
+    if data is None:
+        logger.error(f"Failed to load CSV file: {file_path}")
+        return {"error": "Failed to load CSV file"}, 500
+    return data, 200
+
+
+def start_study(learner: str, filename: str, directory: str = "mmaforays",
+                seed: Optional[int] = None) -> Tuple[Dict[str, Any], int]:
+    """Add a deck to a learner's study schedule.
+
+    Cards already scheduled keep their review state, so decks from several
+    forays can be studied together.
+
+    Args:
+        learner: Long-lived id of the learner
+        filename: Name of the CSV file to study
+        directory: Directory containing the file (default: "mmaforays")
+        seed: Seed of the order in which new cards are introduced (default: a random seed)
+
+    Returns:
+        A tuple containing the schedule stats and number of added cards or
+        error info, and HTTP status code
+    """
+    try:
+        data, status_code = _load_deck(directory, filename)
+        if status_code != 200:
+            return data, status_code
+
+        scheduler = review_states.scheduler(learner)
+        order = shuffled_order(len(data), seed if seed is not None else secrets.randbits(32))
+        added = scheduler.add_deck(directory, filename, order)
+        precompute_normal_forms(data)
+
+        result = scheduler.stats()
+        result["added"] = added
+        return result, 200
+
+    except Exception as e:
+        logger.error(f"Error in start_study for {filename}: {str(e)}")
+        logger.error(traceback.format_exc())
+        return {"error": f"Error starting study: {str(e)}"}, 500
+
+
+def next_study_card(learner: str, now: Optional[float] = None) -> Tuple[Dict[str, Any], int]:
+    """Return the scheduled card that is due soonest.
+
+    Cards of decks that were deleted since they were scheduled are dropped.
+
+    Args:
+        learner: Long-lived id of the learner
+        now: Current time in seconds since the epoch (default: time.time())
+
+    Returns:
+        A tuple containing the card (card, deck, card_id, directory, filename, review),
+        or {"card": None, "next_due": ...} if nothing is due yet, or error info,
+        and HTTP status code
+    """
+    try:
+        scheduler = review_states.scheduler(learner)
+        if not len(scheduler):
+            return {"error": "No deck is being studied"}, 400
+
+        while True:
+            entry = scheduler.next_due(now)
+            if entry is None:
+                upcoming = scheduler.peek()
+                return {"card": None, "next_due": upcoming[2].due if upcoming else None}, 200
+
+            deck, card_id, review = entry
+            directory, filename = scheduler.deck(deck)
+            data, status_code = _load_deck(directory, filename)
+            if status_code == 404:
+                # The deck was deleted or renamed since it was scheduled
+                scheduler.discard_deck(deck)
+                continue
+            if status_code != 200:
+                return data, status_code
+            if card_id < len(data):
+                break
+            # The deck shrank since it was scheduled
+            scheduler.discard(deck, card_id)
+
+        return {
+            "card": data[card_id],
+            "deck": deck,
+            "card_id": card_id,
+            "directory": directory,
+            "filename": filename,
+            "review": review.to_dict(),
+        }, 200
+
+    except Exception as e:
+        logger.error(f"Error in next_study_card: {str(e)}")
+        logger.error(traceback.format_exc())
+        return {"error": f"Error getting next study card: {str(e)}"}, 500
+
+
+def answer_study_card(learner: str, user_answer: str, deck: int, card_id: int,
+                      now: Optional[float] = None, tolerant: bool = False) -> Tuple[Dict[str, Any], int]:
+    """Grade an answer with check_answer, log it and reschedule the card.
+
+    Args:
+        learner: Long-lived id of the learner
+        user_answer: The answer provided by the user
+        deck: Deck number returned by next_study_card
+        card_id: Card index returned by next_study_card
+        now: Current time in seconds since the epoch (default: time.time())
+        tolerant: Use tolerant grading (see check_answer)
+
+    Returns:
+        A tuple containing the check_answer result with the updated review
+        state or error info, and HTTP status code
+    """
+    try:
+        scheduler = review_states.scheduler(learner)
+        if scheduler.get_review(deck, card_id) is None:
+            return {"error": "Card is not scheduled"}, 404
+
+        directory, filename = scheduler.deck(deck)
+        data, status_code = _load_deck(directory, filename)
+        if status_code == 404:
+            scheduler.discard_deck(deck)
+        if status_code != 200:
+            return data, status_code
+        if card_id >= len(data):
+            scheduler.discard(deck, card_id)
+            return {"error": "Card not found"}, 404
+
+        result, status_code = check_answer(user_answer, data[card_id], tolerant)
+        if status_code != 200:
+            return result, status_code
+
+        review = scheduler.record(deck, card_id, quality_from_outcome(result["correct"]), now)
+        review_log.record(data[card_id]["scientific_name"], result["correct"], directory, filename, learner)
+        result["review"] = review.to_dict()
+        return result, 200
+
+    except Exception as e:
+        logger.error(f"Error in answer_study_card: {str(e)}")
+        logger.error(traceback.format_exc())
+        return {"error": f"Error answering study card: {str(e)}"}, 500
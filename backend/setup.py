@@ -13,5 +13,7 @@ setup(
         "requests==2.32.3",
         "werkzeug==3.1.3",
         "gunicorn==23.0.0",
+        "brotli==1.1.0",
+        "aiohttp==3.9.5",
     ],
 )
\ No newline at end of file
@@ -1,12 +1,26 @@
 """Test fixtures and configuration for pytest."""
 import os
 import sys
+from typing import Any, Dict, List, Sequence, Union
+
 import pytest
 from flask import Flask
 
 # Add the parent directory to sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from config import Config
+from models.api_cache import observation_cache, taxon_id_cache
+from models.flashcard import flashcard_state
+from models.review_log import review_log
+from models.review_scheduler import review_states
+from models.session_store import session_store
+from models.shared_deck_store import SharedDeckStore
+from utils.csv_utils import save_csv_data
+
+# Columns of a complete deck
+FIELDNAMES = ["scientific_name", "common_name", "image_url", "taxa_url", "attribution"]
+
 # Create a simple mock app for testing
 # This avoids dependency issues when importing the real app
 
@@ -56,4 +70,82 @@ def client(app):
 @pytest.fixture
 def runner(app):
     """A test CLI runner for the app."""
-    return app.test_cli_runner()
\ No newline at end of file
+    return app.test_cli_runner()
+
+
+def make_card(scientific_name: str, index: int = 0, **fields: Any) -> Dict[str, Any]:
+    """Build a complete card record; keyword arguments override its columns."""
+    card = {
+        "scientific_name": scientific_name,
+        "common_name": f"Common {index}",
+        "image_url": f"https://example.com/{index}.jpg",
+        "taxa_url": f"https://example.com/taxa/{index}",
+        "attribution": "Photo by Test User",
+    }
+    card.update(fields)
+    return card
+
+
+def write_deck(path: str, cards: Sequence[Union[str, Dict[str, Any]]],
+               fieldnames: List[str] = FIELDNAMES) -> str:
+    """Write a deck of card records, or of scientific names completed by make_card.
+
+    Returns:
+        The path of the written deck
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    rows = [card if isinstance(card, dict) else make_card(card, i) for i, card in enumerate(cards)]
+    save_csv_data(path, rows, fieldnames)
+    return path
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Point Config.BASE_DATA_DIR and the directories under it at an empty temporary data directory."""
+    monkeypatch.setattr(Config, "BASE_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(Config, "SPECIES_DATA_DIR", str(tmp_path / "mmaforays"))
+    monkeypatch.setattr(Config, "UPLOADS_DIR", str(tmp_path / "uploads"))
+    return str(tmp_path)
+
+
+@pytest.fixture(autouse=True)
+def selected_deck_state(tmp_path, monkeypatch):
+    """Keep the selected deck state file out of the real data directory."""
+    state_path = str(tmp_path / ".selected_deck.json")
+    monkeypatch.setattr(Config, "SELECTED_DECK_STATE_FILE", state_path)
+    monkeypatch.setattr(flashcard_state, "shared_store", SharedDeckStore(state_path))
+    monkeypatch.setattr(flashcard_state, "current_file", {"path": None, "directory": None, "data": None})
+    monkeypatch.setattr(flashcard_state, "version", 0)
+    return state_path
+
+
+@pytest.fixture(autouse=True)
+def session_db(tmp_path, monkeypatch):
+    """Keep sessions in a temporary database."""
+    db_path = str(tmp_path / "sessions.sqlite3")
+    monkeypatch.setattr(Config, "SESSION_DB", db_path)
+    monkeypatch.setattr(session_store, "db_path", db_path)
+    return db_path
+
+
+@pytest.fixture(autouse=True)
+def review_log_db(tmp_path, monkeypatch):
+    """Keep logged answers and study schedules in a temporary database."""
+    db_path = str(tmp_path / "reviews.sqlite3")
+    # The writer thread keeps the database it was started with, so stop it first
+    review_log.close()
+    monkeypatch.setattr(Config, "REVIEW_LOG_DB", db_path)
+    monkeypatch.setattr(review_log, "db_path", db_path)
+    monkeypatch.setattr(review_states, "db_path", db_path)
+    yield db_path
+    review_log.close()
+
+
+@pytest.fixture(autouse=True)
+def api_cache_db(tmp_path, monkeypatch):
+    """Keep cached iNaturalist lookups in a temporary database."""
+    db_path = str(tmp_path / "api_cache.sqlite3")
+    monkeypatch.setattr(Config, "API_CACHE_DB", db_path)
+    monkeypatch.setattr(taxon_id_cache, "db_path", db_path)
+    monkeypatch.setattr(observation_cache, "db_path", db_path)
+    return db_path
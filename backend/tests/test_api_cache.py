@@ -0,0 +1,65 @@
+"""Tests for the persistent API result cache."""
+import os
+import shutil
+import tempfile
+import time
+from unittest.mock import patch
+
+from models.api_cache import ApiCache
+
+
+class TestApiCache:
+    """Test cases for ApiCache."""
+
+    def setup_method(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "api_cache.sqlite3")
+        self.cache = ApiCache(self.db_path, "taxon_ids", ttl=100, negative_ttl=10)
+
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_miss_then_hit(self):
+        """Test storing and looking up a value."""
+        assert self.cache.lookup("amanita muscaria") == (False, None)
+        assert self.cache.store("amanita muscaria", 48715)
+        assert self.cache.lookup("amanita muscaria") == (True, 48715)
+        assert self.cache.stats() == {"name": "taxon_ids", "hits": 1, "misses": 1, "errors": 0}
+
+    def test_negative_entry(self):
+        """Test that None is cached as a found negative result."""
+        self.cache.store("not a species", None)
+        assert self.cache.lookup("not a species") == (True, None)
+
+    def test_expiry(self):
+        """Test that positive and negative entries expire after their own TTLs."""
+        now = time.time()
+        self.cache.store("found", {"id": 1})
+        self.cache.store("missing", None)
+
+        with patch("models.api_cache.time.time", return_value=now + 50):
+            assert self.cache.lookup("found") == (True, {"id": 1})
+            assert self.cache.lookup("missing") == (False, None)
+            assert self.cache.purge_expired() == 1
+
+        with patch("models.api_cache.time.time", return_value=now + 200):
+            assert self.cache.lookup("found") == (False, None)
+
+    def test_shared_between_instances(self):
+        """Test that entries persist for another cache on the same database."""
+        self.cache.store("boletus edulis", 48701)
+
+        other = ApiCache(self.db_path, "taxon_ids", ttl=100, negative_ttl=10)
+        assert other.lookup("boletus edulis") == (True, 48701)
+
+        other.clear()
+        assert self.cache.lookup("boletus edulis") == (False, None)
+
+    def test_unwritable_database(self):
+        """Test that errors are counted rather than raised."""
+        cache = ApiCache(os.path.join(self.temp_dir, "missing", "\0bad.sqlite3"), "taxon_ids", 100, 10)
+        assert cache.lookup("x") == (False, None)
+        assert not cache.store("x", 1)
+        assert cache.stats()["errors"] == 2
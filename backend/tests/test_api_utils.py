@@ -2,13 +2,14 @@
 import pytest
 from unittest.mock import patch, MagicMock
 
-from utils.api_utils import get_taxon_id, get_observation_details, generate_pronunciation
+from models.api_cache import observation_cache
+from utils.api_utils import get_taxon_id, get_observation_details, generate_pronunciation, inaturalist
 
 
 class TestAPIUtils:
     """Test cases for API utility functions."""
     
-    @patch('utils.api_utils.requests.get')
+    @patch('utils.http_client.requests.Session.get')
     def test_get_taxon_id_success(self, mock_get):
         """Test getting a taxon ID successfully."""
         # Mock the API response
@@ -32,7 +33,7 @@ class TestAPIUtils:
         assert args[0] == "https://api.inaturalist.org/v1/taxa"
         assert kwargs["params"]["q"] == "Trametes versicolor"
     
-    @patch('utils.api_utils.requests.get')
+    @patch('utils.http_client.requests.Session.get')
     def test_get_taxon_id_no_results(self, mock_get):
         """Test getting a taxon ID with no results."""
         # Mock the API response
@@ -47,7 +48,7 @@ class TestAPIUtils:
         # Verify the result
         assert result is None
     
-    @patch('utils.api_utils.requests.get')
+    @patch('utils.http_client.requests.Session.get')
     def test_get_taxon_id_api_error(self, mock_get):
         """Test getting a taxon ID with API error."""
         # Mock the API response to raise an exception
@@ -59,7 +60,34 @@ class TestAPIUtils:
         # Verify the result
         assert result is None
     
-    @patch('utils.api_utils.requests.get')
+    @patch('utils.http_client.requests.Session.get')
+    def test_get_taxon_id_cached(self, mock_get):
+        """Test that found and not-found taxon ids are served from the cache."""
+        found = MagicMock(status_code=200)
+        found.json.return_value = {"results": [{"id": 12345}]}
+        missing = MagicMock(status_code=200)
+        missing.json.return_value = {"results": []}
+        mock_get.side_effect = [found, missing]
+        
+        assert get_taxon_id("Trametes versicolor") == 12345
+        assert get_taxon_id("Unknown species") is None
+        assert get_taxon_id("trametes  Versicolor") == 12345
+        assert get_taxon_id("Unknown species") is None
+        assert mock_get.call_count == 2
+    
+    @patch('utils.http_client.requests.Session.get')
+    def test_get_taxon_id_errors_not_cached(self, mock_get):
+        """Test that a failed request is retried on the next call."""
+        mock_get.side_effect = Exception("API Error")
+        assert get_taxon_id("Trametes versicolor") is None
+        
+        found = MagicMock(status_code=200)
+        found.json.return_value = {"results": [{"id": 12345}]}
+        mock_get.side_effect = None
+        mock_get.return_value = found
+        assert get_taxon_id("Trametes versicolor") == 12345
+    
+    @patch('utils.http_client.requests.Session.get')
     def test_get_observation_details_success(self, mock_get):
         """Test getting observation details successfully."""
         # Mock the API response
@@ -85,9 +113,10 @@ class TestAPIUtils:
         assert result["id"] == 12345
         assert result["photos"][0]["url"] == "https://example.com/photo.jpg"
         # Verify the API call
-        mock_get.assert_called_once_with("https://api.inaturalist.org/v1/observations/12345")
+        mock_get.assert_called_once_with("https://api.inaturalist.org/v1/observations/12345",
+                                         params=None, timeout=inaturalist.timeout)
     
-    @patch('utils.api_utils.requests.get')
+    @patch('utils.http_client.requests.Session.get')
     def test_get_observation_details_api_error(self, mock_get):
         """Test getting observation details with API error."""
         # Mock the API response to raise an exception
@@ -99,6 +128,46 @@ class TestAPIUtils:
         # Verify the result
         assert result is None
     
+    @patch('utils.http_client.requests.Session.get')
+    def test_get_observation_details_cached_compact(self, mock_get):
+        """Test that only the used fields are kept and repeat lookups are served from the cache."""
+        found = MagicMock(status_code=200)
+        found.json.return_value = {
+            "results": [{
+                "id": 12345,
+                "description": "A large observation body",
+                "taxon": {"id": 48715, "name": "Amanita muscaria"},
+                "photos": [{"id": 1, "url": "https://example.com/1.jpg", "attribution": "(c) A",
+                            "license_code": "cc-by", "original_dimensions": {"width": 2048}}],
+            }]
+        }
+        missing = MagicMock(status_code=404)
+        mock_get.side_effect = [found, missing]
+        
+        expected = {
+            "id": 12345,
+            "taxon_id": 48715,
+            "photos": [{"url": "https://example.com/1.jpg", "attribution": "(c) A"}],
+        }
+        assert get_observation_details("https://www.inaturalist.org/observations/12345") == expected
+        assert get_observation_details("https://www.inaturalist.org/observations/999") is None
+        assert get_observation_details("https://www.inaturalist.org/observations/12345") == expected
+        assert get_observation_details("https://www.inaturalist.org/observations/999") is None
+        assert mock_get.call_count == 2
+    
+    @patch('utils.http_client.requests.Session.get')
+    def test_get_observation_details_server_error_not_cached(self, mock_get):
+        """Test that a 5xx response is not cached."""
+        original_max_retries = inaturalist.max_retries
+        inaturalist.max_retries = 0
+        try:
+            mock_get.return_value = MagicMock(status_code=503, headers={})
+            assert get_observation_details("https://www.inaturalist.org/observations/12345") is None
+            assert observation_cache.lookup("12345") == (False, None)
+        finally:
+            inaturalist.max_retries = original_max_retries
+            inaturalist.reset()
+    
     @patch('utils.api_utils.model')
     def test_generate_pronunciation_success(self, mock_model):
         """Test generating pronunciation successfully."""
@@ -0,0 +1,283 @@
+"""Tests for the asynchronous iNaturalist client and async CSV enrichment."""
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from config import Config
+from services.flashcard_service import process_csv_data, process_csv_data_async
+from utils import api_utils, async_api_utils
+from utils.async_api_utils import AsyncINaturalistClient
+
+
+class FakeResponse:
+    """aiohttp response stub, usable as an async context manager."""
+
+    def __init__(self, status, body=None, headers=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+    async def json(self):
+        return self.body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeClientError(Exception):
+    """Stand-in for aiohttp.ClientError."""
+
+
+class FakeSession:
+    """aiohttp.ClientSession stub answering each URL with a fixed response."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+        self.closed = False
+
+    def get(self, url, params=None, **kwargs):
+        self.calls.append((url, params))
+        response = self.responses[url]
+        # A list holds the responses of successive calls
+        if isinstance(response, list):
+            response = response.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async def close(self):
+        self.closed = True
+
+
+def fake_aiohttp(session):
+    """Return a stand-in for the aiohttp module whose ClientSession is session."""
+    return SimpleNamespace(ClientSession=lambda **kwargs: session,
+                           ClientTimeout=lambda **kwargs: kwargs,
+                           TCPConnector=lambda **kwargs: kwargs,
+                           ClientError=FakeClientError)
+
+
+async def fake_taxon_id(client, scientific_name):
+    # Finish later rows first to check that order is kept
+    await asyncio.sleep(0.001 * (10 - len(scientific_name)))
+    return len(scientific_name)
+
+
+async def fake_details(client, observation_url):
+    if not observation_url:
+        return None
+    return {"photos": [{"attribution": f"(c) {observation_url}"}]}
+
+
+class TestAsyncINaturalistClient:
+    """Test cases for AsyncINaturalistClient."""
+
+    def test_thread_fallback_without_aiohttp(self):
+        """Test that calls run the blocking functions when aiohttp is missing."""
+        async def lookup():
+            async with AsyncINaturalistClient(concurrency=2) as client:
+                return (await client.get_taxon_id("Trametes versicolor"),
+                        await client.get_observation_details("https://www.inaturalist.org/observations/1"),
+                        await client.get_observation_details(""))
+
+        with patch.object(async_api_utils, "aiohttp", None), \
+             patch("utils.api_utils.get_taxon_id", return_value=12345), \
+             patch("utils.api_utils.get_observation_details", return_value={"id": 1}) as mock_details:
+            assert asyncio.run(lookup()) == (12345, {"id": 1}, None)
+        mock_details.assert_called_once_with("https://www.inaturalist.org/observations/1")
+
+    def test_semaphore_bounds_requests_in_flight(self):
+        """Test that no more than concurrency lookups run at once."""
+        in_flight = 0
+        peak = 0
+
+        def slow_lookup(name):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            time.sleep(0.02)
+            in_flight -= 1
+            return len(name)
+
+        async def lookup_all():
+            async with AsyncINaturalistClient(concurrency=3) as client:
+                return await asyncio.gather(*(client.get_taxon_id("x" * i) for i in range(10)))
+
+        with patch.object(async_api_utils, "aiohttp", None), \
+             patch("utils.api_utils.get_taxon_id", side_effect=slow_lookup):
+            assert asyncio.run(lookup_all()) == list(range(10))
+        assert peak <= 3
+
+
+class TestAsyncINaturalistClientWithSession:
+    """Test cases for AsyncINaturalistClient over a stubbed aiohttp session."""
+
+    TAXA_URL = f"{async_api_utils.INATURALIST_API_URL}/taxa"
+    OBSERVATION_URL = f"{async_api_utils.INATURALIST_API_URL}/observations"
+
+    @pytest.fixture(autouse=True)
+    def upstream(self):
+        """Reset the shared upstream client and skip its backoff delays."""
+        api_utils.inaturalist.reset()
+        with patch("utils.http_client.asyncio.sleep") as self.mock_sleep:
+            yield
+        api_utils.inaturalist.reset()
+
+    def run(self, session, lookups):
+        """Run lookups(client) against the stubbed session."""
+        async def main():
+            async with AsyncINaturalistClient(concurrency=2) as client:
+                return await lookups(client)
+
+        with patch.object(async_api_utils, "aiohttp", fake_aiohttp(session)):
+            return asyncio.run(main())
+
+    def test_taxon_id_is_fetched_then_cached(self):
+        """Test the first lookup calls the API and the second is served from the cache."""
+        session = FakeSession({self.TAXA_URL: FakeResponse(200, {"results": [{"id": 47347}]})})
+
+        async def lookups(client):
+            return [await client.get_taxon_id("Amanita muscaria"), await client.get_taxon_id("Amanita muscaria")]
+
+        assert self.run(session, lookups) == [47347, 47347]
+        assert session.calls == [(self.TAXA_URL, {"q": "Amanita muscaria", "rank": "species"})]
+        assert session.closed
+
+    def test_observation_details_are_compacted(self):
+        """Test observation details keep only the photo fields the app uses."""
+        observation = {"id": 1, "taxon": {"id": 2}, "user": {"login": "x"},
+                       "photos": [{"url": "https://example.com/square.jpg", "attribution": "(c) someone"}]}
+        session = FakeSession({f"{self.OBSERVATION_URL}/1": FakeResponse(200, {"results": [observation]}),
+                               f"{self.OBSERVATION_URL}/2": FakeResponse(404)})
+
+        async def lookups(client):
+            return await asyncio.gather(
+                client.get_observation_details("https://www.inaturalist.org/observations/1"),
+                client.get_observation_details("https://www.inaturalist.org/observations/2"))
+
+        details, missing = self.run(session, lookups)
+        assert details["taxon_id"] == 2
+        assert details["photos"][0]["attribution"] == "(c) someone"
+        assert "user" not in details
+        assert missing is None
+
+    def test_not_found_taxon(self):
+        """Test a 404 or empty result gives no taxon id."""
+        session = FakeSession({self.TAXA_URL: FakeResponse(200, {"results": []})})
+
+        async def lookups(client):
+            return await client.get_taxon_id("Nonexistent species")
+
+        assert self.run(session, lookups) is None
+
+    def test_transient_failures_are_retried_with_shared_policy(self):
+        """Test 5xx responses and connection errors are retried and counted on the shared client."""
+        session = FakeSession({self.TAXA_URL: [
+            FakeResponse(503, headers={"Retry-After": "0"}), FakeClientError("reset"),
+            FakeResponse(200, {"results": [{"id": 7}]})]})
+
+        async def lookups(client):
+            return await client.get_taxon_id("Boletus edulis")
+
+        assert self.run(session, lookups) == 7
+        assert self.mock_sleep.call_count == 2
+        stats = api_utils.inaturalist.stats()
+        assert stats["requests"] == 3
+        assert stats["retries"] == 2
+        assert stats["state"] == "closed"
+
+    def test_open_circuit_fails_fast(self):
+        """Test no request is sent while the shared circuit is open."""
+        for _ in range(api_utils.inaturalist.failure_threshold):
+            api_utils.inaturalist._after_call(success=False)
+        session = FakeSession({})
+
+        async def lookups(client):
+            return await client.get_taxon_id("Boletus edulis")
+
+        assert self.run(session, lookups) is None
+        assert session.calls == []
+        assert api_utils.inaturalist.stats()["short_circuited"] == 1
+
+    def test_session_uses_configured_timeouts(self):
+        """Test the session is created with the shared client's connect and read timeouts."""
+        created = {}
+        module = fake_aiohttp(FakeSession({}))
+        module.ClientSession = lambda **kwargs: created.update(kwargs) or FakeSession({})
+
+        async def main():
+            async with AsyncINaturalistClient():
+                pass
+
+        with patch.object(async_api_utils, "aiohttp", module):
+            asyncio.run(main())
+        connect_timeout, read_timeout = api_utils.inaturalist.timeout
+        assert created["timeout"] == {"sock_connect": connect_timeout, "sock_read": read_timeout}
+
+
+class TestProcessCsvDataAsync:
+    """Test cases for process_csv_data_async."""
+
+    def setup_method(self):
+        """Set up test environment."""
+        self.original_mode = Config.ENRICHMENT_MODE
+
+    def teardown_method(self):
+        """Clean up test environment."""
+        Config.ENRICHMENT_MODE = self.original_mode
+
+    def test_keeps_order_and_completes_rows(self):
+        """Test that rows are completed and returned in input order."""
+        rows = [{"scientific_name": "a" * i, "url": f"obs{i}"} for i in range(1, 8)]
+        rows.insert(3, {"common_name": "no name"})
+        rows.append({"scientific_name": "Known", "taxa_url": "t", "attribution": "a"})
+
+        with patch.object(AsyncINaturalistClient, "get_taxon_id", fake_taxon_id), \
+             patch.object(AsyncINaturalistClient, "get_observation_details", fake_details):
+            result = asyncio.run(process_csv_data_async(rows, concurrency=2))
+
+        assert [row["scientific_name"] for row in result] == ["a" * i for i in range(1, 8)] + ["Known"]
+        assert result[0]["taxa_url"] == "https://www.inaturalist.org/taxa/1"
+        assert result[0]["attribution"] == "(c) obs1"
+        assert result[-1]["taxa_url"] == "t"
+        assert result[-1]["attribution"] == "a"
+
+    def test_lookup_errors_become_na(self):
+        """Test that a failing lookup leaves N/A rather than dropping the row."""
+        async def failing(client, value):
+            raise RuntimeError("boom")
+
+        with patch.object(AsyncINaturalistClient, "get_taxon_id", failing), \
+             patch.object(AsyncINaturalistClient, "get_observation_details", failing):
+            result = asyncio.run(process_csv_data_async([{"scientific_name": "Amanita", "url": "u"}]))
+
+        assert result == [{"scientific_name": "Amanita", "common_name": "N/A", "image_url": "N/A",
+                           "taxa_url": "N/A", "attribution": "N/A"}]
+
+    def test_failing_row_keeps_earlier_rows_in_both_modes(self):
+        """Test that both enrichment modes return the rows before a row that fails."""
+        complete = {"scientific_name": "Known", "taxa_url": "t", "attribution": "a"}
+        rows = [complete, None, dict(complete, scientific_name="Later")]
+        expected = [{"scientific_name": "Known", "common_name": "N/A", "image_url": "N/A",
+                     "taxa_url": "t", "attribution": "a"}]
+
+        assert asyncio.run(process_csv_data_async(rows)) == expected
+        Config.ENRICHMENT_MODE = "threads"
+        assert process_csv_data(rows) == expected
+
+    def test_process_csv_data_asyncio_mode(self):
+        """Test that process_csv_data runs the async variant in asyncio mode."""
+        Config.ENRICHMENT_MODE = "asyncio"
+        with patch.object(AsyncINaturalistClient, "get_taxon_id", fake_taxon_id), \
+             patch.object(AsyncINaturalistClient, "get_observation_details", fake_details):
+            result = process_csv_data([{"scientific_name": "Boletus"}])
+
+        assert result[0]["taxa_url"] == "https://www.inaturalist.org/taxa/7"
+        assert result[0]["attribution"] == "N/A"
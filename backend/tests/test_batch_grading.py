@@ -0,0 +1,86 @@
+"""Tests for batch answer grading."""
+import json
+import os
+import sqlite3
+from unittest.mock import patch
+
+import pytest
+
+from config import Config
+from models.review_log import ReviewLog
+from services.flashcard_service import check_answers
+from tests.conftest import write_deck
+
+
+class TestBatchGrading:
+    """Test cases for check_answers and the /check_answers route."""
+
+    @pytest.fixture(autouse=True)
+    def deck(self, data_dir):
+        """Create a data directory with one deck and a review log."""
+        self.temp_dir = data_dir
+        write_deck(os.path.join(self.temp_dir, "uploads", "deck.csv"), ["Amanita muscaria", "Boletus edulis"])
+        self.db_path = os.path.join(self.temp_dir, "reviews.sqlite3")
+        self.log = ReviewLog(self.db_path, batch_size=1000, flush_interval=30)
+        yield
+        self.log.close()
+
+    def test_grades_each_item(self):
+        """Test per-item results in request order, including invalid items."""
+        result, status_code = check_answers("deck.csv", "uploads", [
+            {"card_id": 0, "answer": "amanita muscaria", "answered_at": 100.0},
+            {"card_id": 1, "answer": "Boletus eduli"},
+            {"card_id": 5, "answer": "x"},
+            {"card_id": 1, "answer": ""},
+            "not an item",
+        ], tolerant=True)
+        assert status_code == 200
+        results = result["results"]
+        assert results[0]["correct"] is True
+        assert results[1]["close"] is True
+        assert results[2] == {"card_id": 5, "error": "Card not found"}
+        assert results[3] == {"card_id": 1, "error": "Answer is required"}
+        assert results[4]["error"] == "Card not found"
+        assert result["graded"] == [
+            {"scientific_name": "Amanita muscaria", "correct": True, "answered_at": 100.0},
+            {"scientific_name": "Boletus edulis", "correct": False, "answered_at": None},
+        ]
+
+    def test_rejects_oversized_batches(self):
+        """Test the batch size limit."""
+        with patch.object(Config, "MAX_BATCH_ANSWERS", 1):
+            _, status_code = check_answers("deck.csv", "uploads", [{}, {}])
+        assert status_code == 400
+
+    def test_route_logs_batch_in_one_transaction(self, client):
+        """Test graded items reach the review log as a single batch."""
+        with patch("routes.flashcard_routes.review_log", self.log):
+            response = client.post('/check_answers', data=json.dumps({
+                "filename": "deck.csv",
+                "directory": "uploads",
+                "answers": [
+                    {"card_id": 0, "answer": "Amanita muscaria", "answered_at": 100.0},
+                    {"card_id": 1, "answer": "wrong", "answered_at": 101.0},
+                ],
+            }), content_type='application/json')
+            assert response.status_code == 200
+            assert [item["correct"] for item in json.loads(response.data)["results"]] == [True, False]
+
+            self.log.flush()
+            assert self.log.stats()["batches"] == 1
+            connection = sqlite3.connect(self.db_path)
+            try:
+                rows = connection.execute(
+                    "SELECT answered_at, filename, correct FROM reviews ORDER BY answered_at").fetchall()
+            finally:
+                connection.close()
+            assert rows == [(100.0, "deck.csv", 1), (101.0, "deck.csv", 0)]
+
+    def test_route_validation(self, client):
+        """Test malformed batch requests."""
+        response = client.post('/check_answers', data=json.dumps({"filename": "deck.csv"}),
+                               content_type='application/json')
+        assert response.status_code == 400
+        response = client.post('/check_answers', data=json.dumps({"answers": []}),
+                               content_type='application/json')
+        assert response.status_code == 400
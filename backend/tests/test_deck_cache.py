@@ -0,0 +1,77 @@
+"""Tests for the parsed deck cache."""
+import os
+
+import pytest
+
+from models.deck_cache import DeckCache, deck_cache, invalidate_path
+from tests.conftest import write_deck
+from utils.csv_utils import load_csv_data
+
+
+def species(count):
+    """Return count distinct scientific names."""
+    return [f"Species {i}" for i in range(count)]
+
+
+class TestDeckCache:
+    """Test cases for the DeckCache model."""
+
+    @pytest.fixture(autouse=True)
+    def deck(self, tmp_path):
+        """Create a temporary directory with a deck file."""
+        self.temp_dir = str(tmp_path)
+        self.file_path = write_deck(os.path.join(self.temp_dir, "deck.csv"), species(3))
+        deck_cache.clear()
+        yield
+        deck_cache.clear()
+
+    def test_get_and_put(self):
+        """Test a value is returned while the file is unchanged."""
+        cache = DeckCache("test", 1024 * 1024)
+        assert cache.get(self.file_path) is None
+        cache.put(self.file_path, ["value"])
+        assert cache.get(self.file_path) == ["value"]
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_stale_entry_is_dropped(self):
+        """Test a changed file identity causes a miss."""
+        cache = DeckCache("test", 1024 * 1024)
+        cache.put(self.file_path, ["value"])
+        with open(self.file_path, "a") as f:
+            f.write("Extra,Extra,x,y,z\n")
+        assert cache.get(self.file_path) is None
+        assert cache.stats()["entries"] == 0
+
+    def test_lru_eviction_respects_budget(self):
+        """Test least recently used entries are evicted to stay within budget."""
+        other_path = os.path.join(self.temp_dir, "other.csv")
+        write_deck(other_path, species(1))
+        value = "x" * 1000
+        cache = DeckCache("test", 1500)
+        cache.put(self.file_path, value)
+        cache.put(other_path, value)
+        assert cache.get(self.file_path) is None
+        assert cache.get(other_path) == value
+        assert cache.stats()["evictions"] == 1
+        assert cache.stats()["bytes"] <= 1500
+
+    def test_load_csv_data_uses_cache(self):
+        """Test repeat loads of an unchanged deck are served from the cache."""
+        first = load_csv_data(self.file_path)
+        second = load_csv_data(self.file_path)
+        assert first is second
+        assert deck_cache.stats()["hits"] == 1
+
+    def test_save_invalidates(self):
+        """Test rewriting a deck through save_csv_data invalidates the cache."""
+        load_csv_data(self.file_path)
+        write_deck(self.file_path, species(5))
+        assert deck_cache.stats()["entries"] == 0
+        assert len(load_csv_data(self.file_path)) == 5
+
+    def test_invalidate_path(self):
+        """Test invalidate_path drops the entry from the singleton cache."""
+        load_csv_data(self.file_path)
+        invalidate_path(self.file_path)
+        assert deck_cache.stats()["entries"] == 0
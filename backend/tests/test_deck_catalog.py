@@ -0,0 +1,106 @@
+"""Tests for the deck catalog."""
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from config import Config
+from models.deck_cache import invalidate_path
+from tests.conftest import write_deck
+from utils import deck_catalog
+from utils.deck_catalog import CATALOG_FILE_NAME, DeckCatalog, get_deck_catalog
+
+
+class TestDeckCatalog:
+    """Test cases for DeckCatalog."""
+
+    @pytest.fixture(autouse=True)
+    def decks(self, data_dir):
+        """Create a temporary data directory with two decks."""
+        self.temp_dir = os.path.join(data_dir, "uploads")
+        write_deck(os.path.join(self.temp_dir, "b.csv"), ["Species A", "Species A"])
+        write_deck(os.path.join(self.temp_dir, "A.csv"), ["Species B"])
+
+    def test_refresh_describes_decks(self):
+        """Test entries hold row, species, size and hash metadata."""
+        catalog = get_deck_catalog(self.temp_dir)
+        assert catalog.filenames() == ["A.csv", "b.csv"]
+        entry = catalog.entries()[1]
+        assert entry["rows"] == 2
+        assert entry["species"] == 1
+        assert entry["bytes"] == os.path.getsize(os.path.join(self.temp_dir, "b.csv"))
+        assert len(entry["hash"]) == 64
+        assert os.path.exists(os.path.join(self.temp_dir, CATALOG_FILE_NAME))
+
+    def test_rejects_unknown_directories(self, data_dir):
+        """Test a directory outside the allow-list is neither cataloged nor cached."""
+        other_dir = os.path.join(data_dir, "other")
+        write_deck(os.path.join(other_dir, "deck.csv"), ["Species A"])
+        for path in (other_dir, os.path.join(self.temp_dir, "..", "other")):
+            with pytest.raises(ValueError):
+                get_deck_catalog(path)
+        assert not os.path.exists(os.path.join(other_dir, CATALOG_FILE_NAME))
+        assert os.path.abspath(other_dir) not in deck_catalog._catalogs
+
+    def test_refresh_only_rescans_changed_files(self):
+        """Test unchanged files are not re-read on refresh."""
+        catalog = DeckCatalog(self.temp_dir)
+        catalog.refresh()
+        with open(os.path.join(self.temp_dir, "b.csv"), "a") as f:
+            f.write("Species C,Common,https://example.com/c.jpg,https://example.com/taxa/c,Photo\n")
+
+        with patch("utils.deck_catalog.describe_deck", wraps=deck_catalog.describe_deck) as mock_describe:
+            catalog.refresh()
+            assert [call.args[0] for call in mock_describe.call_args_list] == [
+                os.path.join(self.temp_dir, "b.csv")]
+        assert catalog.entries()[1]["rows"] == 3
+
+    def test_persisted_catalog_is_reused(self):
+        """Test a new catalog instance loads entries from disk."""
+        DeckCatalog(self.temp_dir).refresh()
+        with patch("utils.deck_catalog.describe_deck") as mock_describe:
+            DeckCatalog(self.temp_dir).refresh()
+            mock_describe.assert_not_called()
+
+    def test_incremental_update_on_write_and_delete(self):
+        """Test writes and deletions update a loaded catalog without a rescan."""
+        catalog = get_deck_catalog(self.temp_dir)
+        new_path = os.path.join(self.temp_dir, "c.csv")
+        write_deck(new_path, ["Species C"])
+        assert "c.csv" in catalog.filenames()
+
+        os.remove(new_path)
+        invalidate_path(new_path)
+        assert "c.csv" not in catalog.filenames()
+
+    def test_invalid_deck_has_no_counts(self):
+        """Test files that are not valid decks are cataloged without counts."""
+        with open(os.path.join(self.temp_dir, "bad.csv"), "w") as f:
+            f.write("name\nSpecies\n")
+        entry = [e for e in get_deck_catalog(self.temp_dir).entries() if e["filename"] == "bad.csv"][0]
+        assert entry["rows"] is None
+        assert entry["species"] is None
+
+
+class TestListCsvFilesRoute:
+    """Test cases for the catalog-backed /list_csv_files route."""
+
+    @pytest.fixture(autouse=True)
+    def uploads(self, tmp_path, monkeypatch):
+        """Point the uploads directory at a temporary directory."""
+        self.temp_dir = str(tmp_path)
+        monkeypatch.setattr(Config, "UPLOADS_DIR", self.temp_dir)
+        write_deck(os.path.join(self.temp_dir, "deck.csv"), ["Species A"])
+
+    def test_metadata_and_conditional_get(self, client):
+        """Test metadata is returned and a matching ETag yields 304."""
+        response = client.get('/list_csv_files?directory=uploads&metadata=1')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data["files"] == ["deck.csv"]
+        assert data["decks"][0]["rows"] == 1
+
+        response = client.get('/list_csv_files?directory=uploads&metadata=1',
+                              headers={"If-None-Match": response.headers["ETag"]})
+        assert response.status_code == 304
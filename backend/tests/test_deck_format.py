@@ -0,0 +1,88 @@
+"""Tests for the compiled binary deck format."""
+import os
+
+import pytest
+
+from models.deck_cache import deck_cache
+from tests.conftest import write_deck
+from utils.csv_utils import REQUIRED_COLUMNS, compile_deck, iter_csv_records, load_csv_data
+from utils.deck_format import CompiledDeck, compiled_path, open_compiled_deck, remove_compiled_deck
+
+ROWS = [
+    {
+        "scientific_name": "Amanita bisporigera",
+        "common_name": "Eastern Destroying Angel",
+        "image_url": "https://example.com/1.jpg",
+        "taxa_url": "https://example.com/taxa/1",
+        "attribution": "Photo by Test User",
+    },
+    {
+        "scientific_name": "Cortinarius violaceus",
+        "common_name": "Violet Webcap – Cortinaire violet",
+        "image_url": "https://example.com/2.jpg",
+        "taxa_url": "https://example.com/taxa/2",
+        "attribution": "Photo by Test User",
+    },
+]
+
+
+class TestDeckFormat:
+    """Test cases for compiling and memory-mapping decks."""
+
+    @pytest.fixture(autouse=True)
+    def deck(self, data_dir):
+        """Create a temporary deck in the uploads directory."""
+        self.temp_dir = os.path.join(data_dir, "uploads")
+        self.file_path = write_deck(os.path.join(self.temp_dir, "deck.csv"), ROWS)
+        deck_cache.clear()
+        yield
+        deck_cache.clear()
+
+    def test_save_compiles_sidecar(self):
+        """Test save_csv_data writes a sidecar that round-trips the records."""
+        assert os.path.exists(compiled_path(self.file_path))
+        stat_result = os.stat(self.file_path)
+        deck = open_compiled_deck(self.file_path, (stat_result.st_mtime_ns, stat_result.st_size))
+        assert isinstance(deck, CompiledDeck)
+        assert len(deck) == 2
+        assert deck == list(iter_csv_records(self.file_path))
+        assert deck[-1]["common_name"] == "Violet Webcap – Cortinaire violet"
+        assert deck[0:1] == [deck[0]]
+        assert list(deck[0].keys()) == REQUIRED_COLUMNS
+
+    def test_load_csv_data_prefers_sidecar(self):
+        """Test load_csv_data returns the memory-mapped deck when it is fresh."""
+        data = load_csv_data(self.file_path)
+        assert isinstance(data, CompiledDeck)
+        assert data[0]["scientific_name"] == "Amanita bisporigera"
+
+    def test_stale_sidecar_falls_back_to_csv(self):
+        """Test a CSV edited behind our back is re-parsed and recompiled."""
+        with open(self.file_path, "a", encoding="utf-8") as f:
+            f.write("Boletus edulis,King Bolete,https://example.com/3.jpg,https://example.com/taxa/3,Photo\n")
+        assert open_compiled_deck(self.file_path, (0, 0)) is None
+        data = load_csv_data(self.file_path)
+        assert len(data) == 3
+        assert data[2]["scientific_name"] == "Boletus edulis"
+
+    def test_missing_sidecar_is_rebuilt(self):
+        """Test loading a deck without a sidecar compiles one."""
+        remove_compiled_deck(self.file_path)
+        assert not os.path.exists(compiled_path(self.file_path))
+        assert len(load_csv_data(self.file_path)) == 2
+        assert os.path.exists(compiled_path(self.file_path))
+
+    def test_no_sidecar_outside_data_directories(self, tmp_path):
+        """Test loading a deck outside the data directories writes nothing next to it."""
+        other_dir = tmp_path / "elsewhere"
+        file_path = write_deck(str(other_dir / "deck.csv"), ROWS)
+        assert len(load_csv_data(file_path)) == 2
+        assert os.listdir(other_dir) == ["deck.csv"]
+
+    def test_compile_deck_rejects_invalid_csv(self):
+        """Test compiling a CSV without the required columns fails cleanly."""
+        bad_path = os.path.join(self.temp_dir, "bad.csv")
+        with open(bad_path, "w") as f:
+            f.write("scientific_name\nSpecies\n")
+        assert compile_deck(bad_path) is False
+        assert not os.path.exists(compiled_path(bad_path))
@@ -0,0 +1,70 @@
+"""Tests for precomputed deck hints."""
+import json
+import os
+
+import pytest
+
+from models.deck_hints import DeckHints, hints_cache, mask_name
+from models.flashcard import flashcard_state
+from tests.conftest import make_card, write_deck
+
+
+class TestDeckHints:
+    """Test cases for DeckHints and the /get_hints route."""
+
+    @pytest.fixture(autouse=True)
+    def deck(self, data_dir):
+        """Create a data directory with one deck."""
+        self.temp_dir = data_dir
+        self.deck_path = os.path.join(self.temp_dir, "uploads", "deck.csv")
+        self.cards = [make_card(name) for name in
+                      ["Amanita muscaria", "Boletus edulis", "Amanita bisporigera", "Amanita muscaria"]]
+        write_deck(self.deck_path, self.cards)
+        hints_cache.clear()
+        yield
+        hints_cache.clear()
+
+    def test_mask_name(self):
+        """Test only the genus initial and separators are shown."""
+        assert mask_name("Amanita bisporigera") == "A______ ___________"
+        assert mask_name("Hen-of-woods") == "H__-__-_____"
+
+    def test_card_hints(self):
+        """Test the hints computed for a card."""
+        hints = DeckHints(self.cards)
+        assert hints.names == ["Amanita bisporigera", "Amanita muscaria", "Boletus edulis"]
+        assert hints.card_hints(0) == {
+            "genus_initial": "A.",
+            "letter_counts": [7, 8],
+            "masked_name": "A______ ________",
+            "siblings": ["Amanita bisporigera"],
+        }
+        assert hints.card_hints(1)["siblings"] == []
+
+    def test_get_hints_route(self, client):
+        """Test deck and card hints are served from the cache."""
+        response = client.get('/get_hints?filename=deck.csv&directory=uploads')
+        assert json.loads(response.data) == ["Amanita bisporigera", "Amanita muscaria", "Boletus edulis"]
+
+        response = client.get('/get_hints?filename=deck.csv&directory=uploads&card_id=2')
+        assert json.loads(response.data)["siblings"] == ["Amanita muscaria"]
+        assert hints_cache.stats()["hits"] >= 1
+
+        assert client.get('/get_hints?filename=deck.csv&directory=uploads&card_id=9').status_code == 404
+        assert client.get('/get_hints?filename=deck.csv&directory=uploads&card_id=-1').status_code == 404
+        assert client.get('/get_hints?filename=missing.csv&directory=uploads').status_code == 404
+
+    def test_get_hints_for_session_deck(self, client):
+        """Test the session's deck is used when no filename is given."""
+        client.post('/select_csv', data=json.dumps({"filename": "deck.csv", "directory": "uploads"}),
+                    content_type='application/json')
+        response = client.get('/get_hints?card_id=1')
+        assert json.loads(response.data)["genus_initial"] == "B."
+
+    def test_get_hints_for_deck_selected_by_other_worker(self, client):
+        """Test the shared selected deck is used when there is no session deck."""
+        assert client.get('/get_hints').status_code == 400
+
+        flashcard_state.shared_store.publish(self.deck_path, "uploads")
+        response = client.get('/get_hints?card_id=1')
+        assert json.loads(response.data)["genus_initial"] == "B."
@@ -0,0 +1,83 @@
+"""Tests for joining sibling decks on taxon id."""
+import json
+import os
+
+import pytest
+
+from models.deck_cache import invalidate_path
+from tests.conftest import FIELDNAMES, make_card, write_deck
+from utils import deck_join
+from utils.deck_join import join_decks, list_joinable_decks, load_joined_deck
+
+
+def source_deck(path, source, ids):
+    """Write a deck whose rows are keyed by the given ids."""
+    write_deck(path, [make_card(f"Species {taxon_id}", id=taxon_id, common_name=f"Common {taxon_id}",
+                                image_url=f"https://{source}.example.com/{taxon_id}.jpg",
+                                attribution=f"Photo from {source}",
+                                taxa_url=f"https://{source}.example.com/taxa/{taxon_id}")
+                      for taxon_id in ids], ["id"] + FIELDNAMES)
+
+
+class TestDeckJoin:
+    """Test cases for the deck join and /load_joined_cards."""
+
+    @pytest.fixture(autouse=True)
+    def forays(self, data_dir):
+        """Create a foray with inat and myco decks."""
+        self.temp_dir = data_dir
+        self.directory_path = os.path.join(self.temp_dir, "mmaforays")
+        self.inat_path = os.path.join(self.directory_path, "foray-inat.csv")
+        self.myco_path = os.path.join(self.directory_path, "foray-myco.csv")
+        source_deck(self.inat_path, "inat", ["1", "2"])
+        source_deck(self.myco_path, "myco", ["2", "3"])
+        source_deck(os.path.join(self.directory_path, "lonely-inat.csv"), "inat", ["1"])
+        deck_join._joined.clear()
+        yield
+        deck_join._joined.clear()
+
+    def test_list_joinable_decks(self):
+        """Test only forays with every source are listed."""
+        assert list_joinable_decks(self.directory_path) == ["foray"]
+
+    def test_full_outer_join(self):
+        """Test shared ids get both images and unmatched ids are kept."""
+        cards = join_decks([self.inat_path, self.myco_path])
+        assert [card["id"] for card in cards] == ["1", "2", "3"]
+        assert cards[1]["image_url"] == "https://inat.example.com/2.jpg"
+        assert [image["source"] for image in cards[1]["images"]] == ["inat", "myco"]
+        assert cards[1]["images"][1] == {
+            "image_url": "https://myco.example.com/2.jpg",
+            "attribution": "Photo from myco",
+            "taxa_url": "https://myco.example.com/taxa/2",
+            "source": "myco",
+        }
+        assert [image["source"] for image in cards[2]["images"]] == ["myco"]
+
+    def test_join_is_cached_until_a_source_changes(self):
+        """Test the materialized join is reused and refreshed after a source is rewritten."""
+        cards, payload = load_joined_deck(self.directory_path, "foray")
+        assert load_joined_deck(self.directory_path, "foray")[1] is payload
+
+        source_deck(self.myco_path, "myco", ["2", "3", "4"])
+        invalidate_path(self.myco_path)
+        cards, _ = load_joined_deck(self.directory_path, "foray")
+        assert len(cards) == 4
+        assert load_joined_deck(self.directory_path, "lonely") is None
+
+    def test_load_joined_cards_route(self, client):
+        """Test the joined deck endpoint."""
+        response = client.get('/load_joined_cards?name=foray')
+        assert response.status_code == 200
+        assert len(json.loads(response.data)) == 3
+        assert client.get('/load_joined_cards?name=foray',
+                          headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+        assert client.get('/load_joined_cards?name=lonely').status_code == 404
+        assert client.get('/load_joined_cards').status_code == 400
+        assert json.loads(client.get('/list_joined_decks').data) == ["foray"]
+
+    def test_joined_routes_reject_unknown_directories(self, client):
+        """Test the joined deck routes refuse directories outside the data directories."""
+        assert client.get('/load_joined_cards?name=foray&directory=../..').status_code == 400
+        assert client.get('/list_joined_decks?directory=../..').status_code == 400
+        assert client.get('/list_joined_decks?directory=uploads').status_code == 200
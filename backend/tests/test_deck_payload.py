@@ -0,0 +1,75 @@
+"""Tests for deck payloads and their on-disk sidecars."""
+import gzip
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from models.deck_cache import file_identity
+from models.deck_payload import DeckPayload, payload_cache, read_payload_sidecar, write_payload_sidecar
+from services.flashcard_service import load_cards_payload
+from tests.conftest import write_deck
+from utils.deck_format import payload_path, remove_compiled_deck
+
+
+class TestDeckPayload:
+    """Test cases for DeckPayload sidecars."""
+
+    @pytest.fixture(autouse=True)
+    def deck(self, data_dir):
+        """Create a data directory with one compiled deck."""
+        self.file_path = write_deck(os.path.join(data_dir, "uploads", "deck.csv"),
+                                    ["Amanita muscaria", "Boletus edulis"])
+        payload_cache.clear()
+        yield
+        payload_cache.clear()
+
+    def test_variants_decompress_to_body(self):
+        """Test every variant encodes the identity body."""
+        payload = DeckPayload([{"scientific_name": "Amanita muscaria"}], gzip_level=1, brotli_quality=1)
+        assert json.loads(payload.body) == [{"scientific_name": "Amanita muscaria"}]
+        assert gzip.decompress(payload.variants["gzip"]) == payload.body
+
+    def test_compile_writes_sidecar(self):
+        """Test saving a deck stores its payload for every worker."""
+        assert os.path.exists(payload_path(self.file_path))
+        payload = read_payload_sidecar(self.file_path, file_identity(self.file_path))
+        assert payload.card_count == 2
+        assert [card["scientific_name"] for card in json.loads(payload.body)] == [
+            "Amanita muscaria", "Boletus edulis"]
+
+    def test_sidecar_round_trip_and_staleness(self):
+        """Test a stored payload is read back only for the identity it was built from."""
+        payload = DeckPayload([{"scientific_name": "x"}])
+        assert write_payload_sidecar(self.file_path, payload, (1, 2))
+        loaded = read_payload_sidecar(self.file_path, (1, 2))
+        assert loaded.body == payload.body
+        assert loaded.etag == payload.etag
+        assert loaded.variants == payload.variants
+        assert read_payload_sidecar(self.file_path, (1, 3)) is None
+
+    def test_truncated_sidecar_is_ignored(self):
+        """Test a damaged sidecar falls back to building the payload."""
+        identity = file_identity(self.file_path)
+        with open(payload_path(self.file_path), "r+b") as f:
+            f.truncate(os.path.getsize(payload_path(self.file_path)) - 1)
+        assert read_payload_sidecar(self.file_path, identity) is None
+
+    def test_request_uses_stored_payload(self):
+        """Test a cache miss reads the stored payload instead of compressing."""
+        with patch("services.flashcard_service.DeckPayload") as mock_payload:
+            payload, status_code = load_cards_payload("deck.csv", "uploads")
+        assert status_code == 200
+        mock_payload.assert_not_called()
+        assert payload.card_count == 2
+
+    def test_request_builds_and_stores_missing_payload(self):
+        """Test a missing sidecar is built once and stored for other workers."""
+        remove_compiled_deck(self.file_path)
+        assert not os.path.exists(payload_path(self.file_path))
+
+        payload, status_code = load_cards_payload("deck.csv", "uploads")
+        assert status_code == 200
+        stored = read_payload_sidecar(self.file_path, file_identity(self.file_path))
+        assert stored.etag == payload.etag
@@ -0,0 +1,91 @@
+"""Tests for deck set operations and virtual decks."""
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from tests.conftest import make_card, write_deck
+from utils import deck_sets
+from utils.deck_sets import combine_decks, load_virtual_deck, parse_virtual_deck_name
+
+
+def card(scientific_name):
+    """Build a complete card record named after its species."""
+    return make_card(scientific_name, common_name=f"Common {scientific_name}")
+
+
+class TestDeckSets:
+    """Test cases for set operations, virtual decks and /deck_sets."""
+
+    @pytest.fixture(autouse=True)
+    def forays(self, data_dir):
+        """Create a data directory with two forays."""
+        self.temp_dir = data_dir
+        self.freeport = os.path.join(self.temp_dir, "mmaforays", "freeport.csv")
+        self.yarmouth = os.path.join(self.temp_dir, "mmaforays", "yarmouth.csv")
+        write_deck(self.freeport, [card("Amanita muscaria"), card("Boletus edulis"), card("Fomes fomentarius")])
+        write_deck(self.yarmouth, [card("Fomes fomentarius (L.) Fr."), card("Trametes versicolor")])
+        deck_sets._results.clear()
+        yield
+        deck_sets._results.clear()
+
+    def names(self, cards):
+        """Return the scientific names of cards."""
+        return [c["scientific_name"] for c in cards]
+
+    def test_combine_decks(self):
+        """Test each operation compares normalized species names."""
+        a = [card("Amanita muscaria"), card("Boletus edulis"), card("Amanita muscaria")]
+        b = [card("boletus  edulis"), card("Fomes fomentarius")]
+        assert self.names(combine_decks("union", [a, b])) == ["Amanita muscaria", "Boletus edulis", "Fomes fomentarius"]
+        assert self.names(combine_decks("intersection", [a, b])) == ["Boletus edulis"]
+        assert self.names(combine_decks("difference", [a, b])) == ["Amanita muscaria"]
+
+    def test_parse_virtual_deck_name(self):
+        """Test malformed and unsafe virtual deck names are rejected."""
+        assert parse_virtual_deck_name("union:mmaforays/a.csv,uploads/b.csv") == (
+            "union", [("mmaforays", "a.csv"), ("uploads", "b.csv")])
+        for name in ["xor:mmaforays/a.csv,uploads/b.csv", "union:mmaforays/a.csv",
+                     "union:../a.csv,uploads/b.csv", "union:mmaforays/../../a.csv,uploads/b.csv",
+                     "union:mmaforays/a.csv,other/b.csv", "union:mmaforays/a.csv,./b.csv"]:
+            with pytest.raises(ValueError):
+                parse_virtual_deck_name(name)
+
+    def test_results_are_cached_by_content_hash(self):
+        """Test a result is reused until an input deck's content changes."""
+        name = "difference:mmaforays/freeport.csv,mmaforays/yarmouth.csv"
+        cards, payload = load_virtual_deck(name)
+        assert self.names(cards) == ["Amanita muscaria", "Boletus edulis"]
+
+        with patch("utils.deck_sets.combine_decks") as mock_combine:
+            assert load_virtual_deck(name)[1] is payload
+            mock_combine.assert_not_called()
+
+        write_deck(self.yarmouth, [card("Boletus edulis")])
+        cards, _ = load_virtual_deck(name)
+        assert self.names(cards) == ["Amanita muscaria", "Fomes fomentarius"]
+
+        with pytest.raises(FileNotFoundError):
+            load_virtual_deck("union:mmaforays/freeport.csv,mmaforays/missing.csv")
+
+    def test_deck_sets_route_and_virtual_load(self, client):
+        """Test a result is loadable through /load_cards."""
+        response = client.get('/deck_sets?op=intersection&decks=mmaforays/freeport.csv,mmaforays/yarmouth.csv')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert data["total"] == 1
+        assert data["species"] == [{"scientific_name": "Fomes fomentarius", "common_name": "Common Fomes fomentarius"}]
+
+        virtual = data["virtual_deck"]
+        response = client.get('/load_cards', query_string=virtual)
+        assert self.names(json.loads(response.data)) == ["Fomes fomentarius"]
+        response = client.get('/load_cards', query_string=dict(virtual, offset=0, limit=10))
+        assert json.loads(response.data)["total"] == 1
+
+        assert client.get('/deck_sets?op=xor&decks=mmaforays/freeport.csv,mmaforays/yarmouth.csv').status_code == 400
+        assert client.get('/deck_sets?op=union&decks=mmaforays/freeport.csv,other/yarmouth.csv').status_code == 400
+        assert client.get('/load_cards?directory=virtual&filename=union:mmaforays/freeport.csv,other/yarmouth.csv'
+                          ).status_code == 400
+        assert not os.path.exists(os.path.join(self.temp_dir, "other"))
+        assert client.get('/deck_sets?op=union&decks=mmaforays/freeport.csv,mmaforays/x.csv').status_code == 404
@@ -0,0 +1,64 @@
+"""Tests for the file watcher."""
+import os
+import shutil
+import tempfile
+import threading
+
+import pytest
+
+from utils.file_watcher import FileWatcher, _is_watched_file
+
+
+class TestFileWatcher:
+    """Test cases for FileWatcher backends."""
+
+    def setup_method(self):
+        """Create a temporary directory to watch."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.changes = []
+        self.changed = threading.Event()
+
+    def teardown_method(self):
+        """Remove the temporary directory."""
+        shutil.rmtree(self.temp_dir)
+
+    def record(self, path):
+        """Subscriber that records published paths."""
+        self.changes.append(path)
+        self.changed.set()
+
+    def start_watcher(self, backend):
+        """Start a watcher with a short interval on the temporary directory."""
+        watcher = FileWatcher([self.temp_dir], _is_watched_file, poll_interval=0.05, backend=backend)
+        watcher.subscribe(self.record)
+        watcher.start()
+        return watcher
+
+    @pytest.mark.parametrize("backend", ["poll", "inotify"])
+    def test_publishes_created_and_deleted_decks(self, backend):
+        """Test new and removed CSV files are published."""
+        watcher = self.start_watcher(backend)
+        if backend == "inotify" and watcher.backend != "inotify":
+            watcher.stop()
+            pytest.skip("inotify not available")
+        try:
+            deck_path = os.path.join(self.temp_dir, "deck.csv")
+            with open(deck_path, "w") as f:
+                f.write("scientific_name\n")
+            assert self.changed.wait(5)
+            assert deck_path in self.changes
+
+            self.changed.clear()
+            self.changes.clear()
+            os.remove(deck_path)
+            assert self.changed.wait(5)
+            assert deck_path in self.changes
+        finally:
+            watcher.stop()
+
+    def test_ignores_other_files(self):
+        """Test non-CSV and hidden files are not published."""
+        assert _is_watched_file("/data/uploads/deck.csv")
+        assert not _is_watched_file("/data/uploads/.catalog.json")
+        assert not _is_watched_file("/data/uploads/.hidden.csv")
+        assert not _is_watched_file("/data/uploads/notes.txt")
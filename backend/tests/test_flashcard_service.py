@@ -1,11 +1,14 @@
 """Tests for flashcard service."""
 import os
-import pandas as pd
+import threading
+import time
 import pytest
 from unittest.mock import patch, MagicMock
 
+from config import Config
 from models.flashcard import FlashcardState
 from services.flashcard_service import check_answer, load_cards, select_csv_file, process_csv_data
+from tests.conftest import write_deck
 
 
 class TestFlashcardService:
@@ -70,13 +73,16 @@ class TestFlashcardService:
     def test_load_cards_success(self, mock_load_csv):
         """Test loading cards successfully."""
         # Mock the CSV loading
-        mock_data = pd.DataFrame({
-            "scientific_name": ["Species 1", "Species 2"],
-            "common_name": ["Common 1", "Common 2"],
-            "image_url": ["https://example.com/1.jpg", "https://example.com/2.jpg"],
-            "attribution": ["Attribution 1", "Attribution 2"],
-            "taxa_url": ["https://example.com/taxa/1", "https://example.com/taxa/2"]
-        })
+        mock_data = [
+            {
+                "scientific_name": f"Species {i}",
+                "common_name": f"Common {i}",
+                "image_url": f"https://example.com/{i}.jpg",
+                "attribution": f"Attribution {i}",
+                "taxa_url": f"https://example.com/taxa/{i}"
+            }
+            for i in (1, 2)
+        ]
         mock_load_csv.return_value = mock_data
         
         # Mock the file existence check
@@ -90,6 +96,17 @@ class TestFlashcardService:
             assert result[0]["scientific_name"] == "Species 1"
             assert result[1]["common_name"] == "Common 2"
     
+    def test_load_cards_returns_copies(self, data_dir):
+        """Test mutating returned cards leaves the cached deck unchanged."""
+        write_deck(os.path.join(data_dir, "uploads", "deck.csv"), ["Species 1"])
+        
+        result, status = load_cards("deck.csv", "uploads")
+        assert status == 200
+        result[0]["common_name"] = "Changed"
+        
+        result, status = load_cards("deck.csv", "uploads")
+        assert result[0]["common_name"] == "Common 0"
+    
     @patch('services.flashcard_service.load_csv_data')
     def test_load_cards_file_not_found(self, mock_load_csv):
         """Test loading cards with file not found."""
@@ -121,13 +138,16 @@ class TestFlashcardService:
     def test_select_csv_file_success(self, mock_load_csv):
         """Test selecting a CSV file successfully."""
         # Mock the CSV loading
-        mock_data = pd.DataFrame({
-            "scientific_name": ["Species 1", "Species 2"],
-            "common_name": ["Common 1", "Common 2"],
-            "image_url": ["https://example.com/1.jpg", "https://example.com/2.jpg"],
-            "attribution": ["Attribution 1", "Attribution 2"],
-            "taxa_url": ["https://example.com/taxa/1", "https://example.com/taxa/2"]
-        })
+        mock_data = [
+            {
+                "scientific_name": f"Species {i}",
+                "common_name": f"Common {i}",
+                "image_url": f"https://example.com/{i}.jpg",
+                "attribution": f"Attribution {i}",
+                "taxa_url": f"https://example.com/taxa/{i}"
+            }
+            for i in (1, 2)
+        ]
         mock_load_csv.return_value = mock_data
         
         # Mock the file existence check
@@ -234,4 +254,37 @@ class TestFlashcardService:
         result = process_csv_data(file_data)
         
         # Verify the result
-        assert len(result) == 0  # Row should be skipped
\ No newline at end of file
+        assert len(result) == 0  # Row should be skipped
+    
+    @patch('services.flashcard_service.get_taxon_id')
+    def test_process_csv_data_concurrent_keeps_order(self, mock_get_taxon_id):
+        """Test rows are enriched concurrently and returned in input order."""
+        active = []
+        peak = []
+        lock = threading.Lock()
+        
+        def slow_taxon_id(scientific_name):
+            with lock:
+                active.append(scientific_name)
+                peak.append(len(active))
+            # Later rows finish first to check that order is preserved
+            time.sleep(0.05 - int(scientific_name.split()[-1]) * 0.002)
+            with lock:
+                active.remove(scientific_name)
+            if scientific_name == "Species 3":
+                raise ValueError("API down")
+            return int(scientific_name.split()[-1])
+        
+        mock_get_taxon_id.side_effect = slow_taxon_id
+        file_data = [
+            {"scientific_name": f"Species {i}", "common_name": "Common", "image_url": "x", "attribution": "y"}
+            for i in range(20)
+        ]
+        
+        with patch.object(Config, "ENRICHMENT_WORKERS", 4):
+            result = process_csv_data(file_data)
+        
+        assert [row["scientific_name"] for row in result] == [f"Species {i}" for i in range(20)]
+        assert result[5]["taxa_url"] == "https://www.inaturalist.org/taxa/5"
+        assert result[3]["taxa_url"] == "N/A"
+        assert 1 < max(peak) <= 4
@@ -0,0 +1,122 @@
+"""Tests for the pooled upstream HTTP client."""
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from utils.http_client import CircuitOpenError, UpstreamClient, all_upstream_stats
+
+
+def make_response(status_code, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+class TestUpstreamClient:
+    """Test cases for UpstreamClient."""
+
+    def setup_method(self):
+        """Set up test environment."""
+        self.client = UpstreamClient("test", connect_timeout=1, read_timeout=2, max_retries=2,
+                                     backoff_base=0.01, backoff_max=0.02,
+                                     failure_threshold=2, reset_timeout=60)
+        self.sleep_patcher = patch("utils.http_client.time.sleep")
+        self.mock_sleep = self.sleep_patcher.start()
+
+    def teardown_method(self):
+        """Clean up test environment."""
+        self.sleep_patcher.stop()
+
+    def test_session_is_reused(self):
+        """Test that calls share one pooled session."""
+        assert self.client.session is self.client.session
+
+    @patch("utils.http_client.requests.Session.get")
+    def test_passes_timeouts(self, mock_get):
+        """Test that connect and read timeouts are sent with every request."""
+        mock_get.return_value = make_response(200)
+
+        self.client.get("https://example.com", params={"q": "x"})
+
+        mock_get.assert_called_once_with("https://example.com", params={"q": "x"}, timeout=(1, 2))
+
+    @patch("utils.http_client.requests.Session.get")
+    def test_retries_transient_statuses(self, mock_get):
+        """Test that 5xx responses are retried until one succeeds."""
+        mock_get.side_effect = [make_response(503), make_response(502), make_response(200)]
+
+        response = self.client.get("https://example.com")
+
+        assert response.status_code == 200
+        assert mock_get.call_count == 3
+        assert self.mock_sleep.call_count == 2
+        stats = self.client.stats()
+        assert stats["requests"] == 3
+        assert stats["errors"] == 2
+        assert stats["retries"] == 2
+        assert stats["state"] == "closed"
+
+    @patch("utils.http_client.requests.Session.get")
+    def test_honors_retry_after(self, mock_get):
+        """Test that a 429 Retry-After header sets the delay, capped at backoff_max."""
+        mock_get.side_effect = [make_response(429, {"Retry-After": "5"}), make_response(200)]
+
+        self.client.get("https://example.com")
+
+        self.mock_sleep.assert_called_once_with(0.02)
+
+    @patch("utils.http_client.requests.Session.get")
+    def test_does_not_retry_client_errors(self, mock_get):
+        """Test that a 404 is returned without retrying."""
+        mock_get.return_value = make_response(404)
+
+        assert self.client.get("https://example.com").status_code == 404
+        assert mock_get.call_count == 1
+
+    @patch("utils.http_client.requests.Session.get")
+    def test_circuit_opens_and_fails_fast(self, mock_get):
+        """Test that consecutive failed calls open the circuit."""
+        mock_get.side_effect = requests.ConnectionError("down")
+
+        for _ in range(2):
+            with pytest.raises(requests.ConnectionError):
+                self.client.get("https://example.com")
+        assert mock_get.call_count == 6
+
+        with pytest.raises(CircuitOpenError):
+            self.client.get("https://example.com")
+        assert mock_get.call_count == 6
+        stats = self.client.stats()
+        assert stats["state"] == "open"
+        assert stats["short_circuited"] == 1
+
+    @patch("utils.http_client.requests.Session.get")
+    def test_half_open_trial_closes_circuit(self, mock_get):
+        """Test that a successful trial call after reset_timeout closes the circuit."""
+        mock_get.return_value = make_response(500)
+        for _ in range(2):
+            self.client.get("https://example.com")
+        assert self.client.stats()["state"] == "open"
+
+        self.client.reset_timeout = 0
+        assert self.client.stats()["state"] == "half_open"
+        mock_get.return_value = make_response(200)
+        assert self.client.get("https://example.com").status_code == 200
+        assert self.client.stats()["state"] == "closed"
+
+    @patch("utils.http_client.requests.Session.get")
+    def test_unexpected_errors_do_not_trip_circuit(self, mock_get):
+        """Test that errors other than upstream failures leave the circuit closed."""
+        mock_get.side_effect = ValueError("bad")
+
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                self.client.get("https://example.com")
+
+        assert self.client.stats()["state"] == "closed"
+
+    def test_all_upstream_stats(self):
+        """Test that every client reports its stats."""
+        assert "test" in [stats["name"] for stats in all_upstream_stats()]
@@ -0,0 +1,66 @@
+"""Tests for scientific name autocompletion."""
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from tests.conftest import write_deck
+from utils.name_index import Autocompleter, NameIndex
+
+
+class TestNameIndex:
+    """Test cases for NameIndex and Autocompleter."""
+
+    @pytest.fixture(autouse=True)
+    def deck(self, data_dir):
+        """Create a data directory with one deck."""
+        self.temp_dir = data_dir
+        self.deck_path = os.path.join(self.temp_dir, "uploads", "deck.csv")
+        self.write_deck(["Amanita bisporigera", "Amanita muscaria", "Boletus edulis"])
+
+    def write_deck(self, names):
+        """Write a deck with the given scientific names."""
+        write_deck(self.deck_path, names)
+
+    def test_prefix_matches(self):
+        """Test genus, binomial and epithet prefixes."""
+        index = NameIndex(["Amanita muscaria", "Amanita bisporigera", "Boletus edulis", "Agaricus campestris"])
+        assert index.complete("am") == ["Amanita bisporigera", "Amanita muscaria"]
+        assert index.complete("AMANITA  M") == ["Amanita muscaria"]
+        assert index.complete("edu") == ["Boletus edulis"]
+        assert index.complete("a", limit=2) == ["Agaricus campestris", "Amanita bisporigera"]
+        assert index.complete("") == []
+        assert index.complete("zz") == []
+
+    def test_binomial_matches_come_before_epithets(self):
+        """Test names starting with the prefix rank above epithet matches."""
+        index = NameIndex(["Boletus campestris", "Campanella sp"])
+        assert index.complete("camp") == ["Campanella sp", "Boletus campestris"]
+
+    def test_includes_pronunciations_and_caches_prefixes(self):
+        """Test pronunciation cache names are completed and repeat prefixes hit the cache."""
+        autocompleter = Autocompleter()
+        with patch("utils.name_index.pronunciation_cache") as mock_cache:
+            mock_cache.cache = {"Morchella americana": "mor-KEL-uh"}
+            mock_cache.version = 1
+            assert autocompleter.complete("mor") == ["Morchella americana"]
+            assert autocompleter.complete("Mor") == ["Morchella americana"]
+            assert autocompleter.stats()["hits"] == 1
+
+            # A reload that renames an entry keeps the count but bumps the version
+            mock_cache.cache = {"Morchella esculenta": "mor-KEL-uh"}
+            mock_cache.version = 2
+            assert autocompleter.complete("mor") == ["Morchella esculenta"]
+
+            self.write_deck(["Boletus edulis", "Boletus subvelutipes"])
+            assert autocompleter.complete("bol") == ["Boletus edulis", "Boletus subvelutipes"]
+            assert autocompleter.complete("aman") == []
+
+    def test_autocomplete_route(self, client):
+        """Test the /autocomplete endpoint."""
+        response = client.get('/autocomplete?q=amanita&limit=1')
+        assert response.status_code == 200
+        assert json.loads(response.data) == ["Amanita bisporigera"]
+        assert "max-age" in response.headers["Cache-Control"]
+        assert client.get('/autocomplete?q=a&limit=x').status_code == 400
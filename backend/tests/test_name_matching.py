@@ -0,0 +1,99 @@
+"""Tests for tolerant scientific name matching and grading."""
+import json
+import random
+
+from services.flashcard_service import check_answer
+from utils.name_matching import bounded_levenshtein, card_normal_form, normal_form
+
+
+class TestNameMatching:
+    """Test cases for normal forms, bounded edit distance and tolerant grading."""
+
+    def test_normal_form(self):
+        """Test case, spacing, diacritics and authorities are normalized away."""
+        assert normal_form("Amanita muscaria (L.) Lam.") == "amanita muscaria"
+        assert normal_form("  amanita   MUSCARIA ") == "amanita muscaria"
+        assert normal_form("Mycena galériculata Quél.") == "mycena galericulata"
+        assert normal_form("Trametes versicolor Pers. 1801") == "trametes versicolor"
+        assert normal_form("Amanita muscaria var. Guessowii Veselý") == "amanita muscaria var guessowii"
+        assert normal_form("Russula (Pers.) Gray") == "russula"
+
+    def test_bounded_levenshtein(self):
+        """Test distances within the bound and early exit beyond it."""
+        assert bounded_levenshtein("kitten", "sitting", 3) == 3
+        assert bounded_levenshtein("kitten", "sitting", 2) is None
+        assert bounded_levenshtein("amanita", "amanita", 0) == 0
+        assert bounded_levenshtein("abc", "abd", 0) is None
+        assert bounded_levenshtein("", "ab", 2) == 2
+        assert bounded_levenshtein("a" * 100, "b" * 100, 2) is None
+        assert bounded_levenshtein("ab", "", 2) == 2
+        assert bounded_levenshtein("abc", "", 2) is None
+        assert bounded_levenshtein("amanita muscaria", "amanita muscariaa", 1) == 1
+
+    def test_bounded_levenshtein_matches_full_distance(self):
+        """Test the banded distance agrees with the full dynamic program."""
+        def levenshtein(a, b):
+            previous = list(range(len(b) + 1))
+            for i in range(1, len(a) + 1):
+                current = [i] + [0] * len(b)
+                for j in range(1, len(b) + 1):
+                    current[j] = min(previous[j] + 1, current[j - 1] + 1,
+                                     previous[j - 1] + (a[i - 1] != b[j - 1]))
+                previous = current
+            return previous[-1]
+
+        rng = random.Random(5)
+        for _ in range(500):
+            a = "".join(rng.choice("abc") for _ in range(rng.randrange(8)))
+            b = "".join(rng.choice("abc") for _ in range(rng.randrange(8)))
+            for max_distance in range(4):
+                expected = levenshtein(a, b)
+                assert bounded_levenshtein(a, b, max_distance) == (
+                    expected if expected <= max_distance else None), (a, b, max_distance)
+
+    def test_tolerant_grading(self):
+        """Test normalized matches are correct and near misses are close."""
+        card = {"scientific_name": "Amanita bisporigera G.F. Atk.", "common_name": "Destroying Angel"}
+        result, _ = check_answer("amanita  bisporigera", card, tolerant=True)
+        assert result["correct"] is True
+
+        result, _ = check_answer("Amanita bisporiga", card, tolerant=True)
+        assert result == {
+            "correct": False, "close": True, "distance": 2,
+            "message": "Close! Check your spelling (2 letters off)."}
+
+        result, _ = check_answer("Amanita muscaria", card, tolerant=True)
+        assert result["correct"] is False
+        assert "close" not in result
+
+        result, _ = check_answer("Amanita bisporiga", card)
+        assert result == {"correct": False, "message": "Incorrect. Try again!"}
+
+    def test_answer_authority_is_ignored(self):
+        """Test an answer with an authority is graded like the bare name."""
+        card = {"scientific_name": "Amanita muscaria", "common_name": "Fly Agaric"}
+        for answer in ("Amanita muscaria Lam.", "Amanita muscaria L.", "Amanita muscaria (L.) Lam."):
+            result, _ = check_answer(answer, card, tolerant=True)
+            assert result["correct"] is True, answer
+
+    def test_answers_do_not_fill_deck_cache(self):
+        """Test user answers are not added to the cache of deck names."""
+        card_normal_form.cache_clear()
+        check_answer("Amanita muscariaa", {"scientific_name": "Amanita muscaria"}, tolerant=True)
+        assert card_normal_form.cache_info().currsize == 1
+
+    def test_short_names_need_exact_match(self):
+        """Test short names get no edit allowance."""
+        result, _ = check_answer("Inocybe", {"scientific_name": "Inocybe"}, tolerant=True)
+        assert result["correct"] is True
+        result, _ = check_answer("Incybe", {"scientific_name": "Inocybe"}, tolerant=True)
+        assert "close" not in result
+
+    def test_check_answer_route(self, client):
+        """Test the route passes the tolerant flag through."""
+        response = client.post('/check_answer', data=json.dumps({
+            "answer": "Amanita bisporigeraa",
+            "card": {"scientific_name": "Amanita bisporigera"},
+            "tolerant": True,
+        }), content_type='application/json')
+        assert json.loads(response.data)["distance"] == 1
@@ -0,0 +1,120 @@
+"""Tests for the write-behind review log."""
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from unittest.mock import patch
+
+import pytest
+
+from models.review_log import ReviewLog, review_log
+
+
+class TestReviewLog:
+    """Test cases for ReviewLog."""
+
+    def setup_method(self):
+        """Create a log in a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, "reviews.sqlite3")
+        self.log = ReviewLog(self.db_path, batch_size=3, flush_interval=30)
+
+    def teardown_method(self):
+        """Stop the writer and remove the temporary directory."""
+        self.log.close()
+        shutil.rmtree(self.temp_dir)
+
+    def count_rows(self):
+        """Return the number of answers on disk."""
+        connection = sqlite3.connect(self.db_path)
+        try:
+            return connection.execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
+        finally:
+            connection.close()
+
+    def test_writes_full_batches_without_waiting_for_interval(self):
+        """Test a full batch is written in one transaction before the interval elapses."""
+        for i in range(3):
+            self.log.record(f"Species {i}", True, "uploads", "deck.csv")
+        deadline = time.monotonic() + 5
+        while self.log.written < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert self.log.stats()["written"] == 3
+        assert self.log.stats()["batches"] == 1
+        assert self.count_rows() == 3
+
+    def test_flush_writes_partial_batch(self):
+        """Test flush writes answers below the batch size."""
+        self.log.record("Species 0", False)
+        assert self.log.flush()
+        assert self.count_rows() == 1
+
+    def test_database_uses_wal(self):
+        """Test the database is in WAL mode."""
+        self.log.record("Species 0", True)
+        self.log.flush()
+        connection = sqlite3.connect(self.db_path)
+        try:
+            assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        finally:
+            connection.close()
+
+    def test_accuracy_aggregates(self):
+        """Test accuracy per deck and per species."""
+        self.log.record("Amanita muscaria", True, "uploads", "a.csv")
+        self.log.record("Amanita muscaria", False, "uploads", "a.csv")
+        self.log.record("Amanita muscaria", True, "mmaforays", "b.csv")
+        self.log.record("Boletus edulis", True, "mmaforays", "b.csv")
+        self.log.flush()
+
+        by_deck = self.log.accuracy("deck")
+        assert by_deck == [
+            {"directory": "mmaforays", "filename": "b.csv", "attempts": 2, "correct": 2, "accuracy": 1.0},
+            {"directory": "uploads", "filename": "a.csv", "attempts": 2, "correct": 1, "accuracy": 0.5},
+        ]
+
+        by_species = self.log.accuracy("species", directory="uploads")
+        assert by_species == [{"scientific_name": "Amanita muscaria", "attempts": 2, "correct": 1, "accuracy": 0.5}]
+
+        with pytest.raises(ValueError):
+            self.log.accuracy("session")
+
+    def test_accuracy_without_database(self):
+        """Test aggregates are empty before anything was written."""
+        assert self.log.accuracy() == []
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        """Test record never blocks when the queue is full."""
+        log = ReviewLog(self.db_path, max_queue=1)
+        with patch.object(log, "_ensure_writer"):
+            assert log.record("Species 0", True)
+            assert not log.record("Species 1", True)
+        assert log.stats()["dropped"] == 1
+
+    def test_check_answer_is_logged(self, client):
+        """Test graded answers from check_answer reach the log."""
+        with patch("routes.flashcard_routes.review_log", self.log):
+            for answer in ["Amanita muscaria", "wrong"]:
+                response = client.post('/check_answer', data=json.dumps({
+                    "answer": answer,
+                    "card": {"scientific_name": "Amanita muscaria"},
+                    "filename": "deck.csv",
+                    "directory": "uploads",
+                }), content_type='application/json')
+                assert response.status_code == 200
+
+            response = client.get('/stats/accuracy?by=species')
+            assert json.loads(response.data) == [
+                {"scientific_name": "Amanita muscaria", "attempts": 2, "correct": 1, "accuracy": 0.5}]
+            assert client.get('/stats/accuracy?by=nothing').status_code == 400
+
+    def test_tests_log_to_temporary_database(self, client, review_log_db):
+        """Test the shared log writes to the database set up for the test, not the data directory."""
+        client.post('/check_answer', data=json.dumps({
+            "answer": "Amanita muscaria", "card": {"scientific_name": "Amanita muscaria"}}),
+            content_type='application/json')
+        assert review_log.flush()
+        assert review_log.db_path == review_log_db
+        assert review_log.accuracy(group_by="species")[0]["attempts"] == 1
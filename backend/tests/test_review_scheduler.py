@@ -0,0 +1,216 @@
+"""Tests for the spaced-repetition scheduler and study mode."""
+import json
+import os
+import time
+
+import pytest
+
+from config import Config
+from models.review_scheduler import MIN_EASE, SECONDS_PER_DAY, ReviewScheduler, ReviewStateStore, review_states
+from models.session_store import session_store
+from services.study_service import answer_study_card, next_study_card, start_study
+from tests.conftest import write_deck
+
+
+class TestReviewScheduler:
+    """Test cases for ReviewScheduler."""
+
+    @pytest.fixture(autouse=True)
+    def store(self, tmp_path):
+        """Create a review state store in a temporary database."""
+        self.db_path = str(tmp_path / "reviews.sqlite3")
+        self.store = ReviewStateStore(self.db_path, relearn_seconds=60)
+
+    def test_new_cards_follow_introduction_order(self):
+        """Test new cards are due immediately in the given order."""
+        scheduler = self.store.scheduler("token")
+        assert scheduler.add_deck("uploads", "deck.csv", [2, 0, 1], now=100.0) == 3
+        assert scheduler.add_deck("uploads", "deck.csv", [2, 0, 1], now=100.0) == 0
+
+        deck, card, review = scheduler.next_due(now=100.0)
+        assert (deck, card) == (0, 2)
+        assert review.repetitions == 0
+
+    def test_sm2_intervals(self):
+        """Test correct answers grow the interval and a lapse resets it."""
+        scheduler = self.store.scheduler("token")
+        scheduler.add_deck("uploads", "deck.csv", [0], now=0.0)
+
+        assert scheduler.record(0, 0, 4, now=0.0).interval_days == 1.0
+        assert scheduler.record(0, 0, 4, now=0.0).interval_days == 6.0
+        review = scheduler.record(0, 0, 4, now=0.0)
+        assert review.interval_days == 15.0
+        assert review.due == 15.0 * SECONDS_PER_DAY
+
+        review = scheduler.record(0, 0, 1, now=1000.0)
+        assert review.repetitions == 0
+        assert review.lapses == 1
+        assert review.due == 1060.0
+
+        for _ in range(10):
+            review = scheduler.record(0, 0, 0, now=1000.0)
+        assert review.ease == MIN_EASE
+
+    def test_next_due_skips_rescheduled_entries(self):
+        """Test a rescheduled card is not returned again until it is due."""
+        scheduler = self.store.scheduler("token")
+        scheduler.add_deck("uploads", "a.csv", [0, 1], now=0.0)
+        scheduler.add_deck("mmaforays", "b.csv", [0], now=0.0)
+
+        scheduler.record(0, 0, 5, now=0.0)
+        scheduler.record(0, 1, 1, now=0.0)
+        assert scheduler.next_due(now=0.0)[:2] == (1, 0)
+        scheduler.record(1, 0, 5, now=0.0)
+
+        assert scheduler.next_due(now=30.0) is None
+        assert scheduler.next_due(now=60.0)[:2] == (0, 1)
+        assert scheduler.peek()[2].due == 60.0
+        assert scheduler.stats(now=0.0)["cards"] == 3
+
+    def test_state_is_shared_between_stores(self):
+        """Test a schedule written through one store is seen by another on the same database."""
+        scheduler = self.store.scheduler("token")
+        scheduler.add_deck("uploads", "deck.csv", [1, 0], now=0.0)
+        scheduler.record(0, 1, 4, now=0.0)
+
+        other = ReviewStateStore(self.db_path).scheduler("token")
+        assert isinstance(other, ReviewScheduler)
+        assert other.deck(0) == ("uploads", "deck.csv")
+        assert other.get_review(0, 1).interval_days == 1.0
+        assert other.next_due(now=0.0)[:2] == (0, 0)
+        assert len(ReviewStateStore(self.db_path).scheduler("someone-else")) == 0
+
+    def test_idle_schedules_are_purged(self):
+        """Test the schedules of users idle past the TTL are removed."""
+        self.store.scheduler("old").add_deck("uploads", "deck.csv", range(3), now=0.0)
+        self.store.scheduler("new").add_deck("uploads", "deck.csv", range(3), now=self.store.ttl_seconds + 1)
+        assert len(self.store.scheduler("old")) == 0
+        assert len(self.store.scheduler("new")) == 3
+
+    def test_intervals_are_capped_below_the_purge_ttl(self):
+        """Test a card is never scheduled past the time its learner's schedule would be purged."""
+        store = ReviewStateStore(self.db_path, max_interval_days=10, ttl_seconds=20 * SECONDS_PER_DAY)
+        scheduler = store.scheduler("learner")
+        scheduler.add_deck("uploads", "deck.csv", [0], now=0.0)
+        for _ in range(5):
+            review = scheduler.record(0, 0, 5, now=0.0)
+        assert review.interval_days == 10
+        assert review.due < store.ttl_seconds
+
+        with pytest.raises(ValueError):
+            ReviewStateStore(self.db_path, max_interval_days=10, ttl_seconds=10 * SECONDS_PER_DAY)
+
+    def test_discard_deck(self):
+        """Test discarding a deck removes it and all of its cards."""
+        scheduler = self.store.scheduler("learner")
+        scheduler.add_deck("uploads", "a.csv", [0, 1], now=0.0)
+        scheduler.add_deck("uploads", "b.csv", [0], now=0.0)
+        scheduler.discard_deck(0)
+        assert len(scheduler) == 1
+        assert scheduler.deck(0) is None
+        assert scheduler.decks == [("uploads", "b.csv")]
+
+
+class TestStudyRoutes:
+    """Test cases for the study mode routes."""
+
+    @pytest.fixture(autouse=True)
+    def deck(self, data_dir):
+        """Create a temporary data directory with one deck."""
+        self.temp_dir = data_dir
+        write_deck(os.path.join(self.temp_dir, "uploads", "deck.csv"), [f"Species {i}" for i in range(3)])
+        session_store.clear()
+        yield
+        session_store.clear()
+
+    def test_study_session(self, client):
+        """Test studying a deck until no card is due."""
+        assert client.get('/study/next').status_code == 400
+
+        response = client.post('/study/start', data=json.dumps({"filename": "deck.csv", "directory": "uploads"}),
+                               content_type='application/json')
+        assert json.loads(response.data)["added"] == 3
+
+        seen = set()
+        for _ in range(3):
+            card = json.loads(client.get('/study/next').data)
+            seen.add(card["card_id"])
+            response = client.post('/study/answer', data=json.dumps({
+                "answer": card["card"]["scientific_name"], "deck": card["deck"], "card_id": card["card_id"]}),
+                content_type='application/json')
+            result = json.loads(response.data)
+            assert result["correct"] is True
+            assert result["review"]["interval_days"] == 1.0
+        assert seen == {0, 1, 2}
+
+        data = json.loads(client.get('/study/next').data)
+        assert data["card"] is None
+        assert data["next_due"] is not None
+
+        stats = json.loads(client.get('/study/stats').data)
+        assert stats["cards"] == 3
+        assert stats["due"] == 0
+
+    def test_reviewed_card_comes_back_when_due(self):
+        """Test a card answered correctly is due again a day later."""
+        start_study("learner", "deck.csv", "uploads")
+        now = time.time()
+        for _ in range(3):
+            card, status_code = next_study_card("learner", now=now)
+            result, status_code = answer_study_card(
+                "learner", card["card"]["scientific_name"], card["deck"], card["card_id"], now=now)
+            assert status_code == 200
+        assert next_study_card("learner", now=now)[0]["card"] is None
+
+        now += SECONDS_PER_DAY + 1
+        card, status_code = next_study_card("learner", now=now)
+        assert status_code == 200
+        assert card["card"] is not None
+        assert card["review"]["repetitions"] == 1
+
+    def test_deleted_deck_is_dropped(self):
+        """Test the cards of a deleted deck are dropped instead of blocking study mode."""
+        write_deck(os.path.join(self.temp_dir, "uploads", "gone.csv"), ["Gone species"])
+        start_study("learner", "gone.csv", "uploads", seed=1)
+        start_study("learner", "deck.csv", "uploads", seed=1)
+        os.remove(os.path.join(self.temp_dir, "uploads", "gone.csv"))
+
+        card, status_code = next_study_card("learner")
+        assert status_code == 200
+        assert card["filename"] == "deck.csv"
+        assert len(review_states.scheduler("learner")) == 3
+
+    def test_schedule_outlives_the_deck_session(self, client):
+        """Test the schedule follows the learner cookie, not the deck session token."""
+        response = client.post('/study/start', data=json.dumps({"filename": "deck.csv", "directory": "uploads"}),
+                               content_type='application/json')
+        learner = response.headers[Config.STUDY_LEARNER_HEADER_NAME]
+        cookie = next(c for c in response.headers.getlist("Set-Cookie")
+                      if c.startswith(Config.STUDY_LEARNER_COOKIE_NAME + "="))
+        assert f"Max-Age={int(Config.STUDY_PURGE_TTL_SECONDS)}" in cookie
+
+        session_store.clear()
+        response = client.get('/study/stats', headers={Config.STUDY_LEARNER_HEADER_NAME: learner})
+        assert json.loads(response.data)["cards"] == 3
+
+    def test_answer_unscheduled_card(self, client):
+        """Test answering a card that was never scheduled."""
+        response = client.post('/study/answer', data=json.dumps({"answer": "x", "deck": 0, "card_id": 0}),
+                               content_type='application/json')
+        assert response.status_code == 404
+        response = client.post('/study/answer', data=json.dumps({"answer": "x", "deck": "0"}),
+                               content_type='application/json')
+        assert response.status_code == 400
+
+    def test_empty_answer_is_rejected(self, client):
+        """Test an empty answer is refused rather than recorded as a lapse."""
+        client.post('/study/start', data=json.dumps({"filename": "deck.csv", "directory": "uploads"}),
+                    content_type='application/json')
+        card = json.loads(client.get('/study/next').data)
+        for answer in ("", "   ", None):
+            response = client.post('/study/answer', data=json.dumps({
+                "answer": answer, "deck": card["deck"], "card_id": card["card_id"]}),
+                content_type='application/json')
+            assert response.status_code == 400
+            assert "error" in json.loads(response.data)
+        assert json.loads(client.get('/study/stats').data)["lapses"] == 0
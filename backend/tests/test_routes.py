@@ -4,12 +4,10 @@ import os
 import pytest
 import pandas as pd
 from unittest.mock import patch, MagicMock
-import tempfile
-import shutil
 
-from config import Config
 from models.flashcard import flashcard_state
 from models.pronunciation import pronunciation_cache
+from tests.conftest import make_card, write_deck
 
 
 class TestMainRoutes:
@@ -40,7 +38,8 @@ class TestMainRoutes:
 class TestFlashcardRoutes:
     """Test cases for flashcard routes."""
 
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def setup_data_dir(self, data_dir):
         """Set up test data before each test."""
         # Reset flashcard state
         flashcard_state.current_file = {
@@ -48,14 +47,8 @@ class TestFlashcardRoutes:
             "directory": None,
             "data": None,
         }
-        # Create a temporary directory for uploads
-        self.temp_dir = tempfile.mkdtemp()
-        Config.BASE_DATA_DIR = self.temp_dir
-
-    def teardown_method(self):
-        """Clean up after each test."""
-        # Remove the temporary directory
-        shutil.rmtree(self.temp_dir)
+        # Use a temporary data directory for uploads
+        self.temp_dir = data_dir
 
 
     @patch('services.flashcard_service.load_cards')
@@ -75,7 +68,7 @@ class TestFlashcardRoutes:
         assert response.status_code == 200  # This just verifies that a route we know exists works
 
         # For the actual test, use a patch that mocks the service call
-        with patch('routes.flashcard_routes.load_cards') as mock_load:
+        with patch('services.flashcard_service.load_cards') as mock_load:
             mock_load.return_value = (mock_cards, 200)
             response = client.post('/load_cards',
                                    data=json.dumps({"filename": "test.csv", "directory": "uploads"}),
@@ -87,6 +80,118 @@ class TestFlashcardRoutes:
             assert len(data) == 2
             assert data[0]["scientific_name"] == "Species 1"
 
+    def write_deck(self, filename="deck.csv", directory="uploads"):
+        """Write a small deck into the temporary data directory."""
+        return write_deck(os.path.join(self.temp_dir, directory, filename),
+                          [make_card(f"Species {i}", i) for i in (1, 2)])
+
+    def test_load_cards_get_conditional(self, client):
+        """Test GET /load_cards sends an ETag and answers If-None-Match with 304."""
+        self.write_deck()
+
+        response = client.get('/load_cards?filename=deck.csv&directory=uploads')
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        assert etag
+        assert [card["scientific_name"] for card in json.loads(response.data)] == ["Species 1", "Species 2"]
+
+        response = client.get('/load_cards?filename=deck.csv&directory=uploads',
+                              headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.data == b""
+
+    def test_load_cards_etag_changes_with_deck(self, client):
+        """Test rewriting a deck produces a new ETag."""
+        file_path = self.write_deck()
+        first = client.get('/load_cards?filename=deck.csv&directory=uploads').headers["ETag"]
+
+        with open(file_path, 'a') as f:
+            f.write("Species 3,Common 3,http://example.com/image3.jpg,http://example.com/taxa3,Photo by User3\n")
+        response = client.get('/load_cards?filename=deck.csv&directory=uploads',
+                              headers={"If-None-Match": first})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != first
+        assert len(json.loads(response.data)) == 3
+
+    def test_load_cards_content_negotiation(self, client):
+        """Test /load_cards serves the pre-compressed variant the client accepts."""
+        import gzip
+        self.write_deck()
+        plain = client.get('/load_cards?filename=deck.csv&directory=uploads')
+        assert "Content-Encoding" not in plain.headers
+
+        response = client.get('/load_cards?filename=deck.csv&directory=uploads',
+                              headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert response.headers["ETag"] != plain.headers["ETag"]
+        assert gzip.decompress(response.data) == plain.data
+
+    def test_load_cards_brotli(self, client):
+        """Test /load_cards prefers brotli when it is available and accepted."""
+        brotli = pytest.importorskip("brotli")
+        self.write_deck()
+        response = client.get('/load_cards?filename=deck.csv&directory=uploads',
+                              headers={"Accept-Encoding": "gzip, deflate, br"})
+        assert response.headers["Content-Encoding"] in ("br", "gzip")
+        if response.headers["Content-Encoding"] == "br":
+            assert len(json.loads(brotli.decompress(response.data))) == 2
+
+    def test_load_cards_paginated(self, client):
+        """Test offset/limit return one page with paging metadata."""
+        self.write_deck()
+        response = client.get('/load_cards?filename=deck.csv&directory=uploads&offset=1&limit=5')
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert [card["scientific_name"] for card in data["cards"]] == ["Species 2"]
+        assert data["total"] == 2
+        assert data["next_offset"] is None
+
+        response = client.post('/load_cards',
+                               data=json.dumps({"filename": "deck.csv", "directory": "uploads", "limit": 1}),
+                               content_type='application/json')
+        data = json.loads(response.data)
+        assert len(data["cards"]) == 1
+        assert data["next_offset"] == 1
+
+    def test_load_cards_invalid_page(self, client):
+        """Test out-of-range or non-integer paging parameters are rejected."""
+        self.write_deck()
+        assert client.get('/load_cards?filename=deck.csv&directory=uploads&limit=0').status_code == 400
+        assert client.get('/load_cards?filename=deck.csv&directory=uploads&offset=x').status_code == 400
+
+    def test_load_cards_ndjson(self, client):
+        """Test format=ndjson streams one card per line."""
+        self.write_deck()
+        response = client.get('/load_cards?filename=deck.csv&directory=uploads&format=ndjson')
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        lines = response.data.decode("utf-8").splitlines()
+        assert [json.loads(line)["scientific_name"] for line in lines] == ["Species 1", "Species 2"]
+
+        response = client.get('/load_cards?filename=missing.csv&directory=uploads',
+                              headers={"Accept": "application/x-ndjson"})
+        assert response.status_code == 404
+
+    def test_load_cards_missing_filename(self, client):
+        """Test /load_cards rejects requests without a filename."""
+        response = client.get('/load_cards')
+        assert response.status_code == 400
+
+    def test_unknown_directory_is_rejected(self, client):
+        """Test deck routes refuse directories outside the data directories and write nothing there."""
+        outside = os.path.join(self.temp_dir, "outside")
+        write_deck(os.path.join(outside, "deck.csv"), ["Species 1"])
+        for url in ('/load_cards?filename=deck.csv&directory=outside',
+                    '/load_cards?filename=deck.csv&directory=outside&offset=0',
+                    '/get_hints?filename=deck.csv&directory=outside'):
+            assert client.get(url).status_code == 400
+        response = client.post('/select_csv', data=json.dumps({"filename": "deck.csv", "directory": "outside"}),
+                               content_type='application/json')
+        assert response.status_code == 400
+        assert os.listdir(outside) == ["deck.csv"]
+
 
     @patch('services.flashcard_service.check_answer')
     def test_check_answer(self, mock_check_answer, client):
@@ -0,0 +1,190 @@
+"""Tests for the per-session deck state store."""
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+
+from config import Config
+from models.session_store import DeckSession, SessionStore, session_store, shuffled_order
+from tests.conftest import write_deck
+
+
+class TestSessionStore:
+    """Test cases for SessionStore and DeckSession."""
+
+    def test_shuffled_order_is_seeded_permutation(self):
+        """Test the same seed gives the same permutation of every index."""
+        order = shuffled_order(50, 1234)
+        assert sorted(order) == list(range(50))
+        assert order == shuffled_order(50, 1234)
+        assert order != shuffled_order(50, 4321)
+        assert order.itemsize == 4
+
+    def test_select_deck(self):
+        """Test selecting a deck resets the cursor and builds the order."""
+        session = DeckSession("token")
+        session.cursor = 7
+        session.select_deck("uploads", "deck.csv", 10, seed=42)
+        assert session.to_dict() == {
+            "directory": "uploads", "filename": "deck.csv", "seed": 42, "cursor": 0, "total": 10}
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        """Return a store backed by a temporary database."""
+        return SessionStore(str(tmp_path / "sessions.sqlite3"), 10, 60)
+
+    def test_get_or_create(self, store):
+        """Test an unknown token yields a new session and a known one is reused."""
+        session = store.get_or_create("unknown")
+        assert session.token != "unknown"
+        assert store.get_or_create(session.token).token == session.token
+
+    def test_state_is_shared_between_stores(self, store):
+        """Test a session saved through one store is seen by another on the same database."""
+        session = store.create()
+        session.select_deck("uploads", "deck.csv", 10, seed=42)
+        session.next_index()
+        store.save(session)
+
+        other = SessionStore(store.db_path, 10, 60).get(session.token)
+        assert other.to_dict() == session.to_dict()
+        assert other.order == shuffled_order(10, 42)
+        assert other.current_index() == session.current_index()
+
+    def test_update_continues_from_shared_cursor(self, store):
+        """Test two workers advancing one session deal each card once."""
+        session = store.create()
+        session.select_deck("uploads", "deck.csv", 10, seed=42)
+        store.save(session)
+        other_store = SessionStore(store.db_path, 10, 60)
+        other = other_store.get(session.token)
+
+        dealt = [store.update(session, DeckSession.next_index),
+                 other_store.update(other, DeckSession.next_index),
+                 store.update(session, DeckSession.next_index)]
+        assert dealt == list(shuffled_order(10, 42)[:3])
+        other_store.refresh(other)
+        assert other.cursor == 3
+        assert other.current_index() == dealt[-1]
+
+    def test_order_is_stored_not_rebuilt(self, store):
+        """Test dealing from a stored session reads the stored order instead of reshuffling."""
+        session = store.create()
+        session.select_deck("uploads", "deck.csv", 10, seed=42)
+        store.save(session)
+
+        other_store = SessionStore(store.db_path, 10, 60)
+        other = other_store.get(session.token)
+        with patch("models.session_store.shuffled_order", side_effect=AssertionError("reshuffled")):
+            dealt = [other_store.update(other, DeckSession.next_index) for _ in range(10)]
+        assert dealt == list(shuffled_order(10, 42))
+        assert other_store.order(session.token) == shuffled_order(10, 42)
+
+    def test_ttl_eviction(self, store):
+        """Test idle sessions expire."""
+        with patch("models.session_store.time.time", return_value=1000.0):
+            session = store.create()
+        with patch("models.session_store.time.time", return_value=1061.0):
+            assert store.get(session.token) is None
+
+    def test_lru_eviction_by_count(self, tmp_path):
+        """Test the least recently used session is evicted past max_sessions."""
+        store = SessionStore(str(tmp_path / "sessions.sqlite3"), 2, 60)
+        with patch("models.session_store.time.time", return_value=1.0):
+            first = store.create()
+        with patch("models.session_store.time.time", return_value=2.0):
+            second = store.create()
+        with patch("models.session_store.time.time", return_value=3.0):
+            store.get(first.token)
+        with patch("models.session_store.time.time", return_value=4.0):
+            third = store.create()
+        with patch("models.session_store.time.time", return_value=5.0):
+            assert store.get(second.token) is None
+            assert store.get(first.token) is not None
+            assert store.get(third.token) is not None
+        assert store.stats()["sessions"] == 2
+
+    def test_next_index_covers_deck_then_reshuffles(self):
+        """Test one pass visits every card once and the next pass uses a new seed."""
+        session = DeckSession("token")
+        session.select_deck("uploads", "deck.csv", 20, seed=7)
+        first_pass = [session.next_index() for _ in range(20)]
+        assert sorted(first_pass) == list(range(20))
+        assert session.current_index() == first_pass[-1]
+
+        session.next_index()
+        assert session.cursor == 1
+        assert session.seed != 7
+
+    def test_next_index_without_deck(self):
+        """Test no index is returned before a deck is selected."""
+        session = DeckSession("token")
+        assert session.next_index() is None
+        assert session.current_index() is None
+
+
+class TestSessionRoutes:
+    """Test cases for session-aware routes."""
+
+    @pytest.fixture(autouse=True)
+    def deck(self, data_dir):
+        """Create a temporary data directory with one deck."""
+        self.temp_dir = data_dir
+        write_deck(os.path.join(self.temp_dir, "uploads", "deck.csv"), [f"Species {i}" for i in range(5)])
+        session_store.clear()
+        yield
+        session_store.clear()
+
+    def test_select_csv_is_per_session(self, client):
+        """Test each client gets its own session token and selection."""
+        response = client.post('/select_csv', data=json.dumps({"filename": "deck.csv", "directory": "uploads"}),
+                               content_type='application/json')
+        assert response.status_code == 200
+        token = response.headers[Config.SESSION_HEADER_NAME]
+        assert json.loads(response.data)["session"]["total"] == 5
+
+        response = client.get('/session', headers={Config.SESSION_HEADER_NAME: token})
+        data = json.loads(response.data)
+        assert data["filename"] == "deck.csv"
+        assert response.headers[Config.SESSION_HEADER_NAME] == token
+
+        response = client.get('/session', headers={Config.SESSION_HEADER_NAME: "someone-else"})
+        assert json.loads(response.data)["filename"] is None
+
+    def test_next_card_and_get_card(self, client):
+        """Test cards are dealt one at a time in seeded order."""
+        response = client.post('/select_csv', data=json.dumps({"filename": "deck.csv", "directory": "uploads", "seed": 3}),
+                               content_type='application/json')
+        headers = {Config.SESSION_HEADER_NAME: response.headers[Config.SESSION_HEADER_NAME]}
+        expected = list(shuffled_order(5, 3))
+
+        dealt = []
+        for position in range(1, 6):
+            data = json.loads(client.get('/next_card', headers=headers).data)
+            assert data["position"] == position
+            assert data["total"] == 5
+            assert data["card"]["scientific_name"] == f"Species {data['card_id']}"
+            dealt.append(data["card_id"])
+        assert dealt == expected
+
+        data = json.loads(client.get('/get_card', headers=headers).data)
+        assert data["card_id"] == dealt[-1]
+        assert data["position"] == 5
+
+        data = json.loads(client.get('/get_card?card_id=2', headers=headers).data)
+        assert data["card"]["common_name"] == "Common 2"
+        assert client.get('/get_card?card_id=9', headers=headers).status_code == 404
+        assert client.get('/get_card?card_id=x', headers=headers).status_code == 400
+
+    def test_next_card_selects_named_deck(self, client):
+        """Test a request naming the deck works without a prior selection."""
+        response = client.get('/next_card')
+        assert response.status_code == 400
+
+        response = client.get('/next_card?filename=deck.csv&directory=uploads')
+        assert response.status_code == 200
+        assert json.loads(response.data)["position"] == 1
+
+        response = client.get('/next_card?filename=missing.csv&directory=uploads')
+        assert response.status_code == 404
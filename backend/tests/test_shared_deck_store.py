@@ -0,0 +1,61 @@
+"""Tests for the cross-worker shared deck store."""
+import multiprocessing
+import os
+
+import pytest
+
+from models.flashcard import FlashcardState
+from models.shared_deck_store import SharedDeckStore
+from tests.conftest import make_card, write_deck
+
+def publish_many(state_path, count):
+    """Publish a deck repeatedly from a separate process."""
+    store = SharedDeckStore(state_path)
+    for i in range(count):
+        store.publish(f"/decks/{os.getpid()}-{i}.csv", "uploads")
+
+
+class TestSharedDeckStore:
+    """Test cases for SharedDeckStore and shared FlashcardState."""
+
+    @pytest.fixture(autouse=True)
+    def deck(self, tmp_path):
+        """Create a temporary state directory and deck."""
+        self.temp_dir = str(tmp_path)
+        self.state_path = os.path.join(self.temp_dir, ".selected_deck.json")
+        self.deck_path = write_deck(os.path.join(self.temp_dir, "deck.csv"),
+                                    [make_card("Trametes versicolor", common_name="Turkey Tail")])
+
+    def test_read_unset(self):
+        """Test reading before anything was published."""
+        assert SharedDeckStore(self.state_path).read() is None
+
+    def test_publish_increments_version(self):
+        """Test each publish swaps in a new version."""
+        store = SharedDeckStore(self.state_path)
+        assert store.publish("/a.csv", "uploads") == 1
+        assert store.publish("/b.csv", "mmaforays") == 2
+        assert store.read() == {"version": 2, "path": "/b.csv", "directory": "mmaforays"}
+
+    def test_selection_is_visible_to_other_workers(self):
+        """Test a deck selected in one state object is loaded by another."""
+        worker_a = FlashcardState(SharedDeckStore(self.state_path))
+        worker_b = FlashcardState(SharedDeckStore(self.state_path))
+
+        worker_a.update_current_file(self.deck_path, "uploads", ["local data"])
+        current = worker_b.get_current_file()
+        assert current["path"] == self.deck_path
+        assert current["directory"] == "uploads"
+        assert current["data"][0]["scientific_name"] == "Trametes versicolor"
+
+        # The writer keeps its own data without reloading
+        assert worker_a.get_current_file()["data"] == ["local data"]
+
+    def test_concurrent_writers_never_lose_versions(self):
+        """Test publishes from several processes are serialized."""
+        processes = [multiprocessing.Process(target=publish_many, args=(self.state_path, 20)) for _ in range(3)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        assert SharedDeckStore(self.state_path).read()["version"] == 60
@@ -0,0 +1,78 @@
+"""Tests for the cross-deck species search index."""
+import json
+import os
+
+import pytest
+
+from tests.conftest import make_card, write_deck
+from utils.species_index import SpeciesIndex, get_species_index, tokenize
+
+
+class TestSpeciesIndex:
+    """Test cases for SpeciesIndex and the /search route."""
+
+    @pytest.fixture(autouse=True)
+    def decks(self, data_dir):
+        """Create a data directory with decks in two subdirectories."""
+        self.temp_dir = data_dir
+        write_deck(os.path.join(self.temp_dir, "mmaforays", "inat.csv"), [
+            make_card("Amanita bisporigera", common_name="Eastern Destroying Angel"),
+            make_card("Boletus edulis", common_name="King Bolete"),
+        ])
+        write_deck(os.path.join(self.temp_dir, "uploads", "myco.csv"), [
+            make_card("Trametes versicolor", common_name="Turkey Tail"),
+            make_card("Amanita bisporigera", common_name="Eastern Destroying Angel"),
+            make_card("Amanita muscaria", common_name="Fly Agaric"),
+        ])
+
+    def test_tokenize(self):
+        """Test names are split into lowercase words."""
+        assert tokenize("Amanita sect. Phalloideae") == ["amanita", "sect", "phalloideae"]
+        assert tokenize("Hen-of-the-Woods") == ["hen", "of", "the", "woods"]
+
+    def test_search_across_decks(self):
+        """Test a species is found in every deck and row it appears in."""
+        index = SpeciesIndex(self.temp_dir)
+        index.build()
+        result = index.search("Amanita bis")
+        assert result["total"] == 1
+        assert result["results"][0]["decks"] == [
+            {"directory": "mmaforays", "filename": "inat.csv", "row": 0},
+            {"directory": "uploads", "filename": "myco.csv", "row": 1},
+        ]
+
+        assert [entry["scientific_name"] for entry in index.search("amanita")["results"]] == [
+            "Amanita bisporigera", "Amanita muscaria"]
+        assert index.search("turkey")["results"][0]["scientific_name"] == "Trametes versicolor"
+        assert index.search("amanita turkey")["total"] == 0
+        assert index.search("")["total"] == 0
+        assert index.search("a", limit=1)["total"] == 2
+        assert len(index.search("a", limit=1)["results"]) == 1
+
+    def test_incremental_updates(self):
+        """Test writing and deleting decks updates the built index."""
+        index = get_species_index()
+        assert index.search("morchella")["total"] == 0
+
+        new_deck = os.path.join(self.temp_dir, "uploads", "spring.csv")
+        write_deck(new_deck, [make_card("Morchella americana", common_name="Yellow Morel")])
+        assert index.search("morel")["results"][0]["decks"] == [
+            {"directory": "uploads", "filename": "spring.csv", "row": 0}]
+
+        write_deck(os.path.join(self.temp_dir, "mmaforays", "inat.csv"),
+                   [make_card("Boletus edulis", common_name="King Bolete")])
+        assert index.search("amanita bis")["results"][0]["decks"] == [
+            {"directory": "uploads", "filename": "myco.csv", "row": 1}]
+
+        os.remove(new_deck)
+        index.update_deck("uploads", "spring.csv")
+        assert index.search("morel")["total"] == 0
+        assert index.stats() == {"decks": 2, "rows": 4, "tokens": 16}
+
+    def test_search_route(self, client):
+        """Test the /search endpoint."""
+        response = client.get('/search?q=king')
+        assert response.status_code == 200
+        assert json.loads(response.data)["results"][0]["scientific_name"] == "Boletus edulis"
+        assert client.get('/search').status_code == 400
+        assert client.get('/search?q=a&limit=0').status_code == 400
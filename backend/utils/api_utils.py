@@ -3,7 +3,9 @@ import logging
 import os
 from typing import Optional, Dict, Any
 
-import requests
+from config import Config
+from models.api_cache import observation_cache, taxon_id_cache
+from utils.http_client import UpstreamClient
 
 logger = logging.getLogger(__name__)
 
@@ -23,17 +25,33 @@ except ImportError:
     model = None
 
 
+def taxon_cache_key(scientific_name: str) -> str:
+    """Return the taxon_id cache key of a name: lowercased, with whitespace collapsed."""
+    return " ".join(scientific_name.split()).lower()
+
+
 def get_taxon_id(scientific_name: str) -> Optional[int]:
-    """Fetch the taxon_id for a given scientific name from iNaturalist."""
+    """Fetch the taxon_id for a given scientific name from iNaturalist.
+    
+    Results, including "not found", are cached in taxon_id_cache; failed
+    requests are not.
+    """
+    key = taxon_cache_key(scientific_name)
+    found, taxon_id = taxon_id_cache.lookup(key)
+    if found:
+        return taxon_id
+
     url = "https://api.inaturalist.org/v1/taxa"
     params = {"q": scientific_name, "rank": "species"}
     try:
-        response = requests.get(url, params=params)
+        response = inaturalist.get(url, params=params)
         
         if response.status_code == 200:
             results = response.json().get("results", [])
-            if results:
-                return results[0].get("id")
+            taxon_id = results[0].get("id") if results else None
+            taxon_id_cache.store(key, taxon_id)
+            if taxon_id:
+                return taxon_id
         
         logger.info(f"No taxon_id found for {scientific_name}.")
         return None
@@ -42,20 +60,51 @@ def get_taxon_id(scientific_name: str) -> Optional[int]:
         return None
 
 
+def observation_id_from_url(observation_url: str) -> str:
+    """Return the observation id at the end of an iNaturalist observation URL."""
+    return observation_url.split("/")[-1]
+
+
+def compact_observation(observation: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the observation fields the app uses: id, taxon id and photo URLs and attributions."""
+    return {
+        "id": observation.get("id"),
+        "taxon_id": (observation.get("taxon") or {}).get("id"),
+        "photos": [
+            {"url": photo.get("url"), "attribution": photo.get("attribution")}
+            for photo in observation.get("photos") or []
+        ],
+    }
+
+
 def get_observation_details(observation_url: str) -> Optional[Dict[str, Any]]:
-    """Fetch observation details from iNaturalist API."""
+    """Fetch observation details from iNaturalist API.
+    
+    Returns the compact_observation fields. Results, including "not found",
+    are cached in observation_cache by observation id; failed requests are not.
+    """
     if not observation_url:
         return None
     
+    observation_id = observation_id_from_url(observation_url)
+    found, observation = observation_cache.lookup(observation_id)
+    if found:
+        return observation
+
     try:
-        observation_id = observation_url.split("/")[-1]
-        observation_response = requests.get(
+        observation_response = inaturalist.get(
             f"https://api.inaturalist.org/v1/observations/{observation_id}")
         
         if observation_response.status_code == 200:
-            return observation_response.json().get("results", [{}])[0]
+            results = observation_response.json().get("results", [])
+            observation = compact_observation(results[0]) if results else None
+        elif observation_response.status_code == 404:
+            observation = None
+        else:
+            return None
         
-        return None
+        observation_cache.store(observation_id, observation)
+        return observation
     except Exception as e:
         logger.error(f"Error fetching observation details: {str(e)}")
         return None
@@ -73,4 +122,18 @@ def generate_pronunciation(scientific_name: str) -> Optional[str]:
         return response.text
     except Exception as e:
         logger.error(f"Error generating pronunciation: {str(e)}")
-        return None
\ No newline at end of file
+        return None
+
+
+# Singleton instance
+inaturalist = UpstreamClient(
+    "inaturalist",
+    connect_timeout=Config.HTTP_CONNECT_TIMEOUT,
+    read_timeout=Config.HTTP_READ_TIMEOUT,
+    max_retries=Config.HTTP_MAX_RETRIES,
+    backoff_base=Config.HTTP_BACKOFF_BASE,
+    backoff_max=Config.HTTP_BACKOFF_MAX,
+    failure_threshold=Config.HTTP_BREAKER_THRESHOLD,
+    reset_timeout=Config.HTTP_BREAKER_RESET,
+    pool_size=Config.HTTP_POOL_SIZE,
+)
@@ -0,0 +1,113 @@
+"""Asynchronous utilities for iNaturalist API interactions."""
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from models.api_cache import observation_cache, taxon_id_cache
+from utils import api_utils
+
+logger = logging.getLogger(__name__)
+
+# Try to import aiohttp, but fall back to running the blocking client in threads if it fails
+try:
+    import aiohttp
+except ImportError:
+    logger.warning("aiohttp package not installed, async iNaturalist client will use worker threads")
+    aiohttp = None
+
+INATURALIST_API_URL = "https://api.inaturalist.org/v1"
+
+
+class AsyncINaturalistClient:
+    """iNaturalist client sharing one HTTP session, with a cap on in-flight requests.
+
+    Requests go through the policy of utils.api_utils.inaturalist: its
+    connect and read timeouts, retries with backoff, circuit breaker and
+    stats are shared with the blocking client. Use as an async context
+    manager. Without aiohttp, each call runs the blocking function from
+    utils.api_utils in a worker thread instead.
+    """
+
+    def __init__(self, concurrency: int = 32) -> None:
+        """Initialize the client.
+
+        Args:
+            concurrency: Maximum number of requests in flight at once
+        """
+        self.concurrency = concurrency
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._session = None
+
+    async def __aenter__(self) -> "AsyncINaturalistClient":
+        """Open the shared HTTP session."""
+        if aiohttp is not None:
+            connect_timeout, read_timeout = api_utils.inaturalist.timeout
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout),
+                connector=aiohttp.TCPConnector(limit=self.concurrency),
+            )
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Close the shared HTTP session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _get_json(self, url: str, params: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+        """GET a URL and return its JSON body, no results if it is not found, or None on other errors."""
+        status, body = await api_utils.inaturalist.get_json_async(
+            self._session, url, params, (aiohttp.ClientError, asyncio.TimeoutError))
+        if status == 404:
+            return {"results": []}
+        return body
+
+    async def get_taxon_id(self, scientific_name: str) -> Optional[int]:
+        """Fetch the taxon_id for a given scientific name from iNaturalist, consulting taxon_id_cache first."""
+        async with self._semaphore:
+            if self._session is None:
+                return await asyncio.to_thread(api_utils.get_taxon_id, scientific_name)
+            key = api_utils.taxon_cache_key(scientific_name)
+            # The caches block on SQLite, so they are used from a worker thread
+            found, taxon_id = await asyncio.to_thread(taxon_id_cache.lookup, key)
+            if found:
+                return taxon_id
+            try:
+                data = await self._get_json(
+                    f"{INATURALIST_API_URL}/taxa", {"q": scientific_name, "rank": "species"})
+                if data is not None:
+                    results = data.get("results", [])
+                    taxon_id = results[0].get("id") if results else None
+                    await asyncio.to_thread(taxon_id_cache.store, key, taxon_id)
+                    if taxon_id:
+                        return taxon_id
+
+                logger.info(f"No taxon_id found for {scientific_name}.")
+                return None
+            except Exception as e:
+                logger.error(f"Error fetching taxon_id: {str(e)}")
+                return None
+
+    async def get_observation_details(self, observation_url: str) -> Optional[Dict[str, Any]]:
+        """Fetch compact observation details from iNaturalist API, consulting observation_cache first."""
+        if not observation_url:
+            return None
+
+        async with self._semaphore:
+            if self._session is None:
+                return await asyncio.to_thread(api_utils.get_observation_details, observation_url)
+            observation_id = api_utils.observation_id_from_url(observation_url)
+            found, observation = await asyncio.to_thread(observation_cache.lookup, observation_id)
+            if found:
+                return observation
+            try:
+                data = await self._get_json(f"{INATURALIST_API_URL}/observations/{observation_id}")
+                if data is None:
+                    return None
+                results = data.get("results", [])
+                observation = api_utils.compact_observation(results[0]) if results else None
+                await asyncio.to_thread(observation_cache.store, observation_id, observation)
+                return observation
+            except Exception as e:
+                logger.error(f"Error fetching observation details: {str(e)}")
+                return None
@@ -3,49 +3,126 @@ import csv
 import logging
 import os
 import traceback
-from typing import Dict, List, Optional, Any
-
-import pandas as pd
+from typing import Any, Dict, Iterator, List, Optional, Sequence
 
 from config import Config
+from models.deck_cache import deck_cache, file_identity, invalidate_path
+from models.deck_payload import DeckPayload, write_payload_sidecar
+from utils.deck_format import open_compiled_deck, write_compiled_deck
 
 logger = logging.getLogger(__name__)
 
 
-def load_csv_data(file_path: str) -> Optional[pd.DataFrame]:
-    """Load CSV data and return DataFrame.
+# Columns every deck must provide, in the order cards are built
+REQUIRED_COLUMNS = ["image_url", "scientific_name", "common_name", "taxa_url", "attribution"]
+
+# Cell values treated as missing, matching the pandas.read_csv defaults of the
+# pandas version in requirements.txt that the loader previously relied on
+# (note that "N/A" from process_csv_data counts)
+NA_VALUES = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "n/a",
+    "nan", "null",
+})
+
+# Data directory names the API accepts
+DATA_DIRECTORIES = ("mmaforays", "uploads")
+
+
+class DeckFormatError(ValueError):
+    """Raised when a CSV file cannot be read as a flashcard deck."""
+
+
+def iter_csv_records(file_path: str, columns: Sequence[str] = REQUIRED_COLUMNS,
+                     share_values: bool = False) -> Iterator[Dict[str, str]]:
+    """Stream complete card records from a CSV file.
+    
+    Rows with a missing value in any of the requested columns are skipped.
+    
+    Args:
+        file_path: Absolute path to the CSV file to read
+        columns: Columns to validate and include in each record
+        share_values: Reuse one string object for repeated cell values, which
+            saves memory when the records are kept but grows with the file
+        
+    Yields:
+        One dictionary per complete row, keyed by column name
+        
+    Raises:
+        DeckFormatError: If the file is empty or missing a requested column
+    """
+    with open(file_path, mode="r", newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            raise DeckFormatError(f"CSV file {file_path} is empty")
+        
+        missing_columns = [col for col in columns if col not in header]
+        if missing_columns:
+            raise DeckFormatError(
+                f"CSV file {file_path} missing required columns: {', '.join(missing_columns)}")
+        
+        indexes = [header.index(col) for col in columns]
+        shared: Dict[str, str] = {}
+        for row in reader:
+            values = [row[i] if i < len(row) else "" for i in indexes]
+            if any(value in NA_VALUES for value in values):
+                continue
+            if share_values:
+                values = [shared.setdefault(value, value) for value in values]
+            yield dict(zip(columns, values))
+
+
+def load_csv_data(file_path: str) -> Optional[Sequence[Dict[str, str]]]:
+    """Load CSV data and return the complete card records.
+    
+    For decks in one of the data directories, a fresh compiled sidecar is
+    memory-mapped instead of parsing the CSV; when it is missing or stale the
+    CSV is parsed and the sidecar rewritten. Loaded decks
+    are kept in the process-wide deck cache, so repeat loads of an unchanged
+    file skip both steps.
     
     Args:
         file_path: Absolute path to the CSV file to load
         
     Returns:
-        DataFrame containing the CSV data or None if loading failed
+        Sequence of card dictionaries or None if loading failed
     """
     if not os.path.exists(file_path):
         logger.error(f"CSV file not found: {file_path}")
         return None
+    
+    cached_data = deck_cache.get(file_path)
+    if cached_data is not None:
+        logger.debug(f"Deck cache hit for {file_path}")
+        return cached_data
         
     try:
-        # Read the CSV file
-        df = pd.read_csv(file_path)
+        # Capture the file identity before reading so a concurrent rewrite is not cached
+        identity = file_identity(file_path)
+        # Sidecars are only read or written inside the data directories
+        use_sidecars = is_data_directory(os.path.dirname(file_path))
         
-        # Check for required columns
-        required_columns = ["image_url", "scientific_name", "common_name", "taxa_url", "attribution"]
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        data = open_compiled_deck(file_path, identity) if use_sidecars else None
+        if data is not None:
+            logger.info(f"Loaded {len(data)} rows from compiled deck for {file_path}")
+        else:
+            records = list(iter_csv_records(file_path, share_values=True))
+            logger.info(f"Successfully loaded {len(records)} rows from {file_path}")
+            # Map the freshly written sidecar so this worker shares its pages too
+            data = None
+            if use_sidecars and write_compiled_deck(file_path, REQUIRED_COLUMNS, records, identity):
+                data = open_compiled_deck(file_path, identity)
+            if data is None:
+                data = records
         
-        if missing_columns:
-            logger.error(f"CSV file {file_path} missing required columns: {', '.join(missing_columns)}")
-            return None
-            
-        # Filter to required columns and remove rows with missing values
-        data = df[required_columns].dropna()
-        logger.info(f"Successfully loaded {len(data)} rows from {file_path}")
+        deck_cache.put(file_path, data, identity)
         return data
         
-    except pd.errors.EmptyDataError:
-        logger.error(f"CSV file {file_path} is empty")
+    except DeckFormatError as e:
+        logger.error(str(e))
         return None
-    except pd.errors.ParserError as e:
+    except csv.Error as e:
         logger.error(f"Error parsing CSV file {file_path}: {str(e)}")
         return None
     except Exception as e:
@@ -54,34 +131,97 @@ def load_csv_data(file_path: str) -> Optional[pd.DataFrame]:
         return None
 
 
+def compile_deck(file_path: str) -> bool:
+    """Compile a CSV deck into its memory-mappable binary sidecar.
+    
+    Also stores the deck's serialized and compressed payload, at the offline
+    compression levels, so no request has to build it.
+    
+    Args:
+        file_path: Absolute path to the CSV file to compile
+        
+    Returns:
+        True if the sidecar was written, False otherwise
+    """
+    try:
+        identity = file_identity(file_path)
+        if identity is None:
+            logger.error(f"CSV file not found: {file_path}")
+            return False
+        records = iter_csv_records(file_path, share_values=True)
+        if write_compiled_deck(file_path, REQUIRED_COLUMNS, records, identity) is None:
+            return False
+        
+        deck = open_compiled_deck(file_path, identity)
+        if deck is not None:
+            payload = DeckPayload([dict(card) for card in deck], Config.PAYLOAD_GZIP_LEVEL,
+                                  Config.PAYLOAD_BROTLI_QUALITY)
+            write_payload_sidecar(file_path, payload, identity)
+        return True
+    except (DeckFormatError, csv.Error) as e:
+        logger.warning(f"Not compiling {file_path}: {str(e)}")
+        return False
+    except Exception as e:
+        logger.error(f"Error compiling deck {file_path}: {str(e)}")
+        logger.error(traceback.format_exc())
+        return False
+
+
+def get_directory_path(directory: str) -> str:
+    """Map a directory name used by the API to its absolute path.
+    
+    Args:
+        directory: Directory name ("mmaforays" or "uploads")
+        
+    Returns:
+        Absolute path of the data directory
+    """
+    if directory == "mmaforays":
+        return Config.SPECIES_DATA_DIR
+    return Config.UPLOADS_DIR
+
+
+def is_data_directory(directory_path: str) -> bool:
+    """Check whether a path is one of the known data directories.
+    
+    Args:
+        directory_path: Path to check
+        
+    Returns:
+        True if the path is the species or uploads directory, or one of
+        DATA_DIRECTORIES under BASE_DATA_DIR
+    """
+    known_paths = {Config.SPECIES_DATA_DIR, Config.UPLOADS_DIR}
+    known_paths.update(os.path.join(Config.BASE_DATA_DIR, name) for name in DATA_DIRECTORIES)
+    return os.path.abspath(directory_path) in {os.path.abspath(path) for path in known_paths}
+
+
 def list_csv_files(directory: str = "mmaforays") -> List[str]:
     """List CSV files in a directory in alphabetical order.
     
+    Filenames come from the directory's deck catalog, which only re-reads
+    files whose mtime or size changed since the last call.
+    
     Args:
         directory: Directory name to list files from (default: "mmaforays")
         
     Returns:
         List of CSV filenames sorted alphabetically
     """
-    # Determine directory path based on directory name
-    if directory == "mmaforays":
-        directory_path = Config.SPECIES_DATA_DIR
-    else:
-        directory_path = Config.UPLOADS_DIR
+    # Imported here because the catalog builds on this module's loader
+    from utils.deck_catalog import get_deck_catalog
+    
+    directory_path = get_directory_path(directory)
     
     # Check if directory exists
     if not os.path.exists(directory_path):
         logger.error(f"Directory not found: {directory_path}")
         return []
     
-    # Get CSV files and sort them alphabetically
     try:
-        csv_files = sorted([f for f in os.listdir(directory_path) if f.endswith(".csv")], key=str.lower)
+        csv_files = get_deck_catalog(directory_path).filenames()
         logger.info(f"Found {len(csv_files)} CSV files in {directory}")
         return csv_files
-    except PermissionError:
-        logger.error(f"Permission denied accessing directory: {directory_path}")
-        return []
     except Exception as e:
         logger.error(f"Error listing CSV files in {directory_path}: {str(e)}")
         logger.error(traceback.format_exc())
@@ -116,7 +256,10 @@ def save_csv_data(file_path: str, rows: List[Dict[str, Any]], fieldnames: List[s
             writer.writeheader()
             writer.writerows(rows)
         
+        invalidate_path(file_path)
         logger.info(f"Successfully saved {len(rows)} rows to {file_path}")
+        if is_data_directory(os.path.dirname(file_path)):
+            compile_deck(file_path)
         return True
     except PermissionError:
         logger.error(f"Permission denied writing to file: {file_path}")
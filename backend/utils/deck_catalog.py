@@ -0,0 +1,191 @@
+"""Utilities for the per-directory deck catalog."""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import traceback
+from typing import Any, Dict, List, Optional
+
+from models.deck_cache import add_invalidation_listener
+from utils.csv_utils import DeckFormatError, is_data_directory, iter_csv_records
+
+logger = logging.getLogger(__name__)
+
+CATALOG_FILE_NAME = ".catalog.json"
+
+# Catalogs by absolute directory path
+_catalogs: Dict[str, "DeckCatalog"] = {}
+_catalogs_lock = threading.Lock()
+
+
+def describe_deck(file_path: str) -> Dict[str, Any]:
+    """Compute the catalog entry of a single deck file.
+
+    Args:
+        file_path: Absolute path to the CSV deck
+
+    Returns:
+        Dictionary with filename, rows, species, bytes, mtime, mtime_ns and hash.
+        rows and species are None when the file is not a valid deck.
+    """
+    stat_result = os.stat(file_path)
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+
+    try:
+        rows = 0
+        species = set()
+        for record in iter_csv_records(file_path):
+            rows += 1
+            species.add(record["scientific_name"])
+        row_count: Optional[int] = rows
+        species_count: Optional[int] = len(species)
+    except (DeckFormatError, UnicodeDecodeError, ValueError) as e:
+        logger.warning(f"Catalog entry for invalid deck {file_path}: {str(e)}")
+        row_count = None
+        species_count = None
+
+    return {
+        "filename": os.path.basename(file_path),
+        "rows": row_count,
+        "species": species_count,
+        "bytes": stat_result.st_size,
+        "mtime": stat_result.st_mtime,
+        "mtime_ns": stat_result.st_mtime_ns,
+        "hash": digest.hexdigest(),
+    }
+
+
+class DeckCatalog:
+    """Metadata of every deck in one data directory, persisted alongside the decks."""
+
+    def __init__(self, directory_path: str) -> None:
+        """Initialize a catalog, loading any previously persisted entries.
+
+        Args:
+            directory_path: Absolute path of the data directory
+        """
+        self.directory_path = directory_path
+        self.catalog_path = os.path.join(directory_path, CATALOG_FILE_NAME)
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Load persisted catalog entries, ignoring a missing or corrupt file."""
+        if not os.path.exists(self.catalog_path):
+            return {}
+        try:
+            with open(self.catalog_path, "r", encoding="utf-8") as f:
+                return {entry["filename"]: entry for entry in json.load(f)["decks"]}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable deck catalog {self.catalog_path}: {str(e)}")
+            return {}
+
+    def _save(self) -> None:
+        """Persist the catalog atomically; the caller must hold the lock."""
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.directory_path, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"decks": list(self._entries.values())}, f)
+            os.replace(temp_path, self.catalog_path)
+        except Exception as e:
+            logger.error(f"Error saving deck catalog {self.catalog_path}: {str(e)}")
+
+    def refresh(self) -> None:
+        """Bring the catalog up to date, re-describing only files whose mtime or size changed."""
+        try:
+            filenames = [f for f in os.listdir(self.directory_path) if f.endswith(".csv")]
+        except OSError as e:
+            logger.error(f"Error listing deck directory {self.directory_path}: {str(e)}")
+            return
+
+        with self._lock:
+            changed = False
+            for filename in set(self._entries) - set(filenames):
+                del self._entries[filename]
+                changed = True
+
+            for filename in filenames:
+                file_path = os.path.join(self.directory_path, filename)
+                try:
+                    stat_result = os.stat(file_path)
+                    entry = self._entries.get(filename)
+                    if (entry is not None and entry["mtime_ns"] == stat_result.st_mtime_ns
+                            and entry["bytes"] == stat_result.st_size):
+                        continue
+                    self._entries[filename] = describe_deck(file_path)
+                    changed = True
+                except FileNotFoundError:
+                    self._entries.pop(filename, None)
+                    changed = True
+                except Exception as e:
+                    logger.error(f"Error cataloging {file_path}: {str(e)}")
+                    logger.error(traceback.format_exc())
+
+            if changed:
+                self._save()
+
+    def update(self, filename: str) -> None:
+        """Re-describe one deck after it was written, or drop it if it is gone."""
+        file_path = os.path.join(self.directory_path, filename)
+        with self._lock:
+            try:
+                self._entries[filename] = describe_deck(file_path)
+            except FileNotFoundError:
+                if self._entries.pop(filename, None) is None:
+                    return
+            except Exception as e:
+                logger.error(f"Error cataloging {file_path}: {str(e)}")
+                return
+            self._save()
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Return catalog entries sorted case-insensitively by filename."""
+        with self._lock:
+            return [dict(self._entries[name]) for name in sorted(self._entries, key=str.lower)]
+
+    def filenames(self) -> List[str]:
+        """Return deck filenames sorted case-insensitively."""
+        with self._lock:
+            return sorted(self._entries, key=str.lower)
+
+
+def get_deck_catalog(directory_path: str, refresh: bool = True) -> DeckCatalog:
+    """Return the catalog of a data directory, creating it on first use.
+
+    Args:
+        directory_path: Path of the data directory
+        refresh: Whether to rescan the directory for changed files first
+
+    Returns:
+        The directory's DeckCatalog
+        
+    Raises:
+        ValueError: If the path is not a known data directory
+    """
+    # Checked before anything is cached or written for the directory
+    if not is_data_directory(directory_path):
+        raise ValueError(f"Not a data directory: {directory_path}")
+    key = os.path.abspath(directory_path)
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = _catalogs[key] = DeckCatalog(key)
+    if refresh:
+        catalog.refresh()
+    return catalog
+
+
+def _on_deck_invalidated(file_path: str) -> None:
+    """Update the catalog entry of a written or deleted deck, if its directory is cataloged."""
+    directory_path, filename = os.path.split(os.path.abspath(file_path))
+    catalog = _catalogs.get(directory_path)
+    if catalog is not None and filename.endswith(".csv"):
+        catalog.update(filename)
+
+
+add_invalidation_listener(_on_deck_invalidated)
@@ -0,0 +1,224 @@
+"""Utilities for the compiled binary deck format.
+
+A compiled deck is a sidecar file written next to a CSV deck under a hidden
+``.compiled`` directory. Its layout (all integers little-endian) is:
+
+    header    magic, version, field count, row count, source CSV mtime_ns
+              and size, byte offset of the string table
+    records   (row count + 1) records of field count x (offset, length)
+              uint32 pairs; record 0 holds the field names
+    strings   deduplicated UTF-8 string table
+
+Decks are memory-mapped and rows decoded on access, so every worker process
+reading the same deck shares the same page-cache pages.
+"""
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MCDK"
+VERSION = 1
+COMPILED_DIR_NAME = ".compiled"
+COMPILED_SUFFIX = ".deck"
+PAYLOAD_SUFFIX = ".payload"
+
+_HEADER = struct.Struct("<4sHHIqQQ")
+_SLOT = struct.Struct("<II")
+
+
+def compiled_path(file_path: str) -> str:
+    """Return the sidecar path for a CSV deck."""
+    directory, filename = os.path.split(os.path.abspath(file_path))
+    return os.path.join(directory, COMPILED_DIR_NAME, filename + COMPILED_SUFFIX)
+
+
+def payload_path(file_path: str) -> str:
+    """Return the path of the serialized payload sidecar for a CSV deck."""
+    directory, filename = os.path.split(os.path.abspath(file_path))
+    return os.path.join(directory, COMPILED_DIR_NAME, filename + PAYLOAD_SUFFIX)
+
+
+class CompiledDeck(Sequence):
+    """Read-only sequence of card dictionaries backed by a memory-mapped sidecar."""
+
+    def __init__(self, buffer: mmap.mmap) -> None:
+        """Validate the header of a mapped sidecar and index its records.
+
+        Args:
+            buffer: Memory map of a compiled deck file
+
+        Raises:
+            ValueError: If the buffer is not a compiled deck of this version
+        """
+        if len(buffer) < _HEADER.size:
+            raise ValueError("Compiled deck is truncated")
+        (magic, version, field_count, row_count,
+         mtime_ns, size, strings_offset) = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not a compiled deck of a supported version")
+        if strings_offset != _HEADER.size + (row_count + 1) * field_count * _SLOT.size:
+            raise ValueError("Compiled deck has an inconsistent layout")
+
+        self._buffer = buffer
+        self._field_count = field_count
+        self._row_count = row_count
+        self._strings_offset = strings_offset
+        self.source_identity: Tuple[int, int] = (mtime_ns, size)
+        self.fields = self._decode_record(0)
+
+    def __len__(self) -> int:
+        """Return the number of cards in the deck."""
+        return self._row_count
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        """Decode one card, or a list of cards for a slice."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._row_count))]
+        if index < 0:
+            index += self._row_count
+        if not 0 <= index < self._row_count:
+            raise IndexError("CompiledDeck index out of range")
+        return dict(zip(self.fields, self._decode_record(index + 1)))
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        """Decode cards in order."""
+        for index in range(self._row_count):
+            yield self[index]
+
+    def __eq__(self, other: object) -> bool:
+        """Compare equal to any sequence holding the same cards."""
+        if isinstance(other, (CompiledDeck, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def _decode_record(self, record: int) -> List[str]:
+        """Decode the strings of one record slot row."""
+        base = _HEADER.size + record * self._field_count * _SLOT.size
+        values = []
+        for field in range(self._field_count):
+            offset, length = _SLOT.unpack_from(self._buffer, base + field * _SLOT.size)
+            start = self._strings_offset + offset
+            values.append(self._buffer[start:start + length].decode("utf-8"))
+        return values
+
+
+def write_compiled_deck(file_path: str, fields: Sequence[str],
+                        records: Iterable[Dict[str, str]], identity: Tuple[int, int]) -> Optional[str]:
+    """Write the compiled sidecar for a CSV deck atomically.
+
+    Args:
+        file_path: Path of the source CSV deck
+        fields: Field names, in the order values are stored
+        records: Card dictionaries to compile
+        identity: (mtime_ns, size) of the source CSV the records were read from
+
+    Returns:
+        The sidecar path, or None if it could not be written
+    """
+    strings: Dict[str, Tuple[int, int]] = {}
+    string_table = bytearray()
+
+    def slot(value: str) -> Tuple[int, int]:
+        if value not in strings:
+            encoded = value.encode("utf-8")
+            strings[value] = (len(string_table), len(encoded))
+            string_table.extend(encoded)
+        return strings[value]
+
+    slots = bytearray()
+    for field in fields:
+        slots.extend(_SLOT.pack(*slot(field)))
+    row_count = 0
+    for record in records:
+        for field in fields:
+            slots.extend(_SLOT.pack(*slot(record[field])))
+        row_count += 1
+
+    header = _HEADER.pack(MAGIC, VERSION, len(fields), row_count, identity[0], identity[1],
+                          _HEADER.size + len(slots))
+    target = compiled_path(file_path)
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(header)
+                f.write(slots)
+                f.write(string_table)
+            os.replace(temp_path, target)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    except OSError as e:
+        logger.error(f"Error writing compiled deck for {file_path}: {str(e)}")
+        return None
+
+    logger.info(f"Compiled {row_count} cards from {file_path} into {target}")
+    return target
+
+
+def open_compiled_deck(file_path: str, identity: Optional[Tuple[int, int]]) -> Optional[CompiledDeck]:
+    """Memory-map the sidecar of a CSV deck if it matches the CSV identity.
+
+    Args:
+        file_path: Path of the source CSV deck
+        identity: Current (mtime_ns, size) of the source CSV
+
+    Returns:
+        The compiled deck, or None if the sidecar is missing, stale or invalid
+    """
+    target = compiled_path(file_path)
+    if identity is None or not os.path.exists(target):
+        return None
+
+    try:
+        with open(target, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        deck = CompiledDeck(buffer)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable compiled deck {target}: {str(e)}")
+        return None
+
+    if deck.source_identity != identity:
+        logger.info(f"Compiled deck {target} is stale, falling back to CSV")
+        return None
+    return deck
+
+
+def remove_compiled_deck(file_path: str) -> None:
+    """Delete the sidecars of a CSV deck if they exist."""
+    for target in (compiled_path(file_path), payload_path(file_path)):
+        try:
+            os.remove(target)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error(f"Error removing compiled deck {target}: {str(e)}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Compile the given CSV decks, or every deck in the data directories."""
+    import sys
+
+    from config import Config
+    from utils.csv_utils import compile_deck
+
+    paths = argv if argv is not None else sys.argv[1:]
+    if not paths:
+        for directory in (Config.SPECIES_DATA_DIR, Config.UPLOADS_DIR):
+            if os.path.isdir(directory):
+                paths.extend(os.path.join(directory, f) for f in sorted(os.listdir(directory))
+                             if f.endswith(".csv"))
+
+    for path in paths:
+        result = compile_deck(path)
+        print(f"{'compiled' if result else 'FAILED  '} {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Utilities for joining sibling decks of the same foray on taxon id."""
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.deck_cache import add_invalidation_listener, file_identity
+from models.deck_payload import DeckPayload
+from utils.csv_utils import REQUIRED_COLUMNS, iter_csv_records
+
+logger = logging.getLogger(__name__)
+
+# Sibling deck suffixes in the order their images are listed; the first source
+# that has a taxon supplies the card's top-level fields
+JOIN_SOURCES = ("inat", "myco")
+
+# Per-source columns collected into each joined card's "images" list
+IMAGE_COLUMNS = ("image_url", "attribution", "taxa_url")
+
+# Materialized joins by (directory path, foray name): (source identities, cards, payload)
+_joined: Dict[Tuple[str, str], Tuple[Tuple[Any, ...], List[Dict[str, Any]], DeckPayload]] = {}
+_joined_lock = threading.Lock()
+
+
+def source_paths(directory_path: str, name: str) -> List[str]:
+    """Return the paths of a foray's sibling decks, e.g. "<name>-inat.csv"."""
+    return [os.path.join(directory_path, f"{name}-{source}.csv") for source in JOIN_SOURCES]
+
+
+def list_joinable_decks(directory_path: str) -> List[str]:
+    """Return the foray names in a directory that have a deck for every source."""
+    try:
+        filenames = set(os.listdir(directory_path))
+    except OSError as e:
+        logger.error(f"Error listing deck directory {directory_path}: {str(e)}")
+        return []
+    suffix = f"-{JOIN_SOURCES[0]}.csv"
+    names = [filename[:-len(suffix)] for filename in filenames if filename.endswith(suffix)]
+    return sorted(
+        name for name in names
+        if all(f"{name}-{source}.csv" in filenames for source in JOIN_SOURCES[1:]))
+
+
+def join_decks(paths: List[str]) -> List[Dict[str, Any]]:
+    """Full outer hash join of sibling decks on their "id" column.
+
+    Each source is hashed by id in one pass; the joined cards follow the order
+    of the first source, followed by ids found only in later sources.
+
+    Args:
+        paths: Deck paths in JOIN_SOURCES order
+
+    Returns:
+        Cards with the usual columns from the first source having the taxon,
+        plus "id" and an "images" list with one entry per source
+
+    Raises:
+        DeckFormatError: If a deck is empty or has no id column
+    """
+    columns = ("id",) + tuple(REQUIRED_COLUMNS)
+    cards: Dict[str, Dict[str, Any]] = {}
+    for source, path in zip(JOIN_SOURCES, paths):
+        for record in iter_csv_records(path, columns):
+            card = cards.get(record["id"])
+            if card is None:
+                card = dict(record)
+                card["images"] = []
+                cards[record["id"]] = card
+            image = {column: record[column] for column in IMAGE_COLUMNS}
+            image["source"] = source
+            card["images"].append(image)
+    return list(cards.values())
+
+
+def load_joined_deck(directory_path: str, name: str) -> Optional[Tuple[List[Dict[str, Any]], DeckPayload]]:
+    """Return the joined cards and payload of a foray, joining again only if a source changed.
+
+    Args:
+        directory_path: Path of the directory containing the sibling decks
+        name: Foray name, e.g. "2024-07-14-NorthYarmouth"
+
+    Returns:
+        The joined cards and their serialized payload, or None if a source deck is missing
+    """
+    paths = source_paths(directory_path, name)
+    # Capture identities before reading so a concurrent rewrite is not cached
+    identities = tuple(file_identity(path) for path in paths)
+    if any(identity is None for identity in identities):
+        return None
+
+    key = (os.path.abspath(directory_path), name)
+    with _joined_lock:
+        entry = _joined.get(key)
+    if entry is not None and entry[0] == identities:
+        return entry[1], entry[2]
+
+    cards = join_decks(paths)
+    payload = DeckPayload(cards)
+    logger.info(f"Joined {len(cards)} cards for {name} from {len(paths)} decks")
+    with _joined_lock:
+        _joined[key] = (identities, cards, payload)
+    return cards, payload
+
+
+def _on_deck_invalidated(file_path: str) -> None:
+    """Drop materialized joins that use a written or deleted deck."""
+    directory_path, filename = os.path.split(os.path.abspath(file_path))
+    for source in JOIN_SOURCES:
+        suffix = f"-{source}.csv"
+        if filename.endswith(suffix):
+            with _joined_lock:
+                _joined.pop((directory_path, filename[:-len(suffix)]), None)
+
+
+add_invalidation_listener(_on_deck_invalidated)
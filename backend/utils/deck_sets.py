@@ -0,0 +1,143 @@
+"""Utilities for set operations across decks, served as virtual decks."""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+from config import Config
+from models.deck_payload import DeckPayload
+from utils.csv_utils import DATA_DIRECTORIES, load_csv_data
+from utils.deck_catalog import get_deck_catalog
+from utils.name_matching import card_normal_form
+
+logger = logging.getLogger(__name__)
+
+# Directory name under which /load_cards serves set-operation results
+VIRTUAL_DIRECTORY = "virtual"
+
+OPERATIONS = ("union", "intersection", "difference")
+
+# Number of set-operation results kept in memory
+RESULT_CACHE_SIZE = 64
+
+# Results by (operation, content hash of every input deck)
+_results: "OrderedDict[Tuple[str, Tuple[str, ...]], Tuple[List[Dict[str, Any]], DeckPayload]]" = OrderedDict()
+_results_lock = threading.Lock()
+
+
+def virtual_deck_name(operation: str, decks: List[Tuple[str, str]]) -> str:
+    """Return the virtual deck filename of an operation, e.g. "difference:mmaforays/a.csv,mmaforays/b.csv"."""
+    return f"{operation}:" + ",".join(f"{directory}/{filename}" for directory, filename in decks)
+
+
+def parse_virtual_deck_name(name: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """Split a virtual deck filename into its operation and (directory, filename) inputs.
+
+    Raises:
+        ValueError: If the name is malformed, the operation is unknown, a directory
+            is not one of DATA_DIRECTORIES or a filename is unsafe
+    """
+    operation, _, deck_list = name.partition(":")
+    if operation not in OPERATIONS:
+        raise ValueError(f"Operation must be one of {', '.join(OPERATIONS)}")
+
+    decks = []
+    for deck in deck_list.split(","):
+        directory, _, filename = deck.partition("/")
+        if (directory not in DATA_DIRECTORIES or not filename or "/" in filename
+                or filename.startswith(".") or not filename.endswith(".csv")):
+            raise ValueError(f"Invalid deck: {deck}")
+        decks.append((directory, filename))
+    if len(decks) < 2:
+        raise ValueError("At least two decks are required")
+    return operation, decks
+
+
+def species_key(card: Dict[str, Any]) -> str:
+    """Return the key cards are compared on: the normalized scientific name."""
+    return card_normal_form(card["scientific_name"])
+
+
+def combine_decks(operation: str, decks: List[Any]) -> List[Dict[str, Any]]:
+    """Apply a set operation to decks, comparing cards by species.
+
+    union keeps the first card of every species, intersection the cards of
+    the first deck whose species is in every other deck, and difference the
+    cards of the first deck whose species is in none of the others.
+
+    Args:
+        operation: "union", "intersection" or "difference"
+        decks: Sequences of card dictionaries
+
+    Returns:
+        The resulting cards in the order of their decks, one per species
+    """
+    if operation == "union":
+        candidates = [card for deck in decks for card in deck]
+    else:
+        other_keys = [{species_key(card) for card in deck} for deck in decks[1:]]
+        if operation == "intersection":
+            keep = set.intersection(*other_keys)
+            candidates = [card for card in decks[0] if species_key(card) in keep]
+        else:
+            drop = set().union(*other_keys)
+            candidates = [card for card in decks[0] if species_key(card) not in drop]
+
+    seen = set()
+    results = []
+    for card in candidates:
+        key = species_key(card)
+        if key not in seen:
+            seen.add(key)
+            results.append(dict(card))
+    return results
+
+
+def load_virtual_deck(name: str) -> Tuple[List[Dict[str, Any]], DeckPayload]:
+    """Return the cards and payload of a virtual deck, reusing a cached result if no input changed.
+
+    Args:
+        name: Virtual deck filename (see virtual_deck_name)
+
+    Returns:
+        The resulting cards and their serialized payload
+
+    Raises:
+        ValueError: If the name is invalid
+        FileNotFoundError: If an input deck does not exist or cannot be loaded
+    """
+    operation, decks = parse_virtual_deck_name(name)
+
+    hashes = []
+    for directory, filename in decks:
+        entries = {
+            entry["filename"]: entry
+            for entry in get_deck_catalog(os.path.join(Config.BASE_DATA_DIR, directory)).entries()
+        }
+        if filename not in entries:
+            raise FileNotFoundError(f"{directory}/{filename}")
+        hashes.append(entries[filename]["hash"])
+
+    key = (operation, tuple(hashes))
+    with _results_lock:
+        result = _results.get(key)
+        if result is not None:
+            _results.move_to_end(key)
+            return result
+
+    inputs = []
+    for directory, filename in decks:
+        data = load_csv_data(os.path.join(Config.BASE_DATA_DIR, directory, filename))
+        if data is None:
+            raise FileNotFoundError(f"{directory}/{filename}")
+        inputs.append(data)
+
+    cards = combine_decks(operation, inputs)
+    result = (cards, DeckPayload(cards))
+    logger.info(f"Computed {operation} of {len(decks)} decks: {len(cards)} cards")
+    with _results_lock:
+        _results[key] = result
+        if len(_results) > RESULT_CACHE_SIZE:
+            _results.popitem(last=False)
+    return result
@@ -0,0 +1,218 @@
+"""Utilities for watching data files and invalidating in-process caches."""
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from config import Config
+from models.deck_cache import file_identity, invalidate_path
+from models.pronunciation import pronunciation_cache
+
+logger = logging.getLogger(__name__)
+
+# inotify event masks from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_CREATE
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_inotify() -> Optional[ctypes.CDLL]:
+    """Return libc if it provides inotify, otherwise None."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, "inotify_init1") or not hasattr(libc, "inotify_add_watch"):
+        return None
+    return libc
+
+
+class FileWatcher:
+    """Background watcher that publishes the paths of changed files to subscribers.
+
+    Uses inotify where available and falls back to polling file mtimes.
+    Directories are watched non-recursively; a path filter decides which
+    changed files are published.
+    """
+
+    def __init__(self, directories: Sequence[str], path_filter: Callable[[str], bool],
+                 poll_interval: float = 2.0, backend: Optional[str] = None) -> None:
+        """Initialize a stopped watcher.
+
+        Args:
+            directories: Directories whose entries are watched
+            path_filter: Returns True for file paths that should be published
+            poll_interval: Seconds between scans when polling, and the stop
+                check interval for inotify
+            backend: "inotify" or "poll" (default: inotify when available)
+        """
+        self.directories = [os.path.abspath(d) for d in directories]
+        self.path_filter = path_filter
+        self.poll_interval = poll_interval
+        self._subscribers: List[Callable[[str], None]] = []
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._libc = _load_inotify() if backend in (None, "inotify") else None
+        self.backend = "inotify" if self._libc is not None else "poll"
+
+    def subscribe(self, callback: Callable[[str], None]) -> None:
+        """Register a callback to run with the absolute path of every change."""
+        self._subscribers.append(callback)
+
+    def start(self) -> None:
+        """Start watching in a daemon thread and wait until changes are being tracked."""
+        if self._thread is not None:
+            return
+        target = self._run_inotify if self.backend == "inotify" else self._run_poll
+        self._thread = threading.Thread(target=target, name="file-watcher", daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout=5)
+        logger.info(f"File watcher started ({self.backend}) on {', '.join(self.directories)}")
+
+    def stop(self) -> None:
+        """Stop the watcher thread and wait for it to exit."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+    def _publish(self, path: str) -> None:
+        """Send one change to every subscriber."""
+        if not self.path_filter(path):
+            return
+        logger.info(f"Detected change to {path}")
+        for callback in self._subscribers:
+            try:
+                callback(path)
+            except Exception as e:
+                logger.error(f"Error handling change to {path}: {str(e)}")
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        """Return the identities of every filtered file in the watched directories."""
+        snapshot = {}
+        for directory in self.directories:
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                path = os.path.join(directory, name)
+                if self.path_filter(path):
+                    identity = file_identity(path)
+                    if identity is not None:
+                        snapshot[path] = identity
+        return snapshot
+
+    def _run_poll(self) -> None:
+        """Publish changes found by comparing periodic directory snapshots."""
+        previous = self._snapshot()
+        self._ready.set()
+        while not self._stop.wait(self.poll_interval):
+            current = self._snapshot()
+            for path in set(previous) | set(current):
+                if previous.get(path) != current.get(path):
+                    self._publish(path)
+            previous = current
+
+    def _run_inotify(self) -> None:
+        """Publish changes reported by inotify, falling back to polling on error."""
+        fd = self._libc.inotify_init1(IN_CLOEXEC)
+        if fd < 0:
+            logger.warning(f"inotify_init1 failed (errno {ctypes.get_errno()}), polling instead")
+            self.backend = "poll"
+            return self._run_poll()
+
+        try:
+            directories_by_wd = {}
+            for directory in self.directories:
+                wd = self._libc.inotify_add_watch(fd, directory.encode(), _WATCH_MASK)
+                if wd < 0:
+                    logger.warning(f"Cannot watch {directory} (errno {ctypes.get_errno()})")
+                    continue
+                directories_by_wd[wd] = directory
+            self._ready.set()
+
+            while not self._stop.is_set():
+                readable, _, _ = select.select([fd], [], [], self.poll_interval)
+                if not readable:
+                    continue
+                for path in self._read_events(fd, directories_by_wd):
+                    self._publish(path)
+        finally:
+            os.close(fd)
+
+    def _read_events(self, fd: int, directories_by_wd: Dict[int, str]) -> List[str]:
+        """Read pending inotify events and return the changed paths in order."""
+        buffer = os.read(fd, 64 * 1024)
+        paths: List[str] = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buffer):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped, so treat every watched file as changed
+                paths.extend(path for path in self._snapshot() if path not in paths)
+                continue
+            directory = directories_by_wd.get(wd)
+            if directory is not None and name:
+                path = os.path.join(directory, name)
+                if path not in paths:
+                    paths.append(path)
+        return paths
+
+
+def _is_watched_file(path: str) -> bool:
+    """Return True for decks and the pronunciation cache file."""
+    return path.endswith(".csv") and not os.path.basename(path).startswith(".")
+
+
+def _invalidate_caches(path: str) -> None:
+    """Invalidate every in-process cache derived from a changed file."""
+    if path == os.path.abspath(Config.PRONUNCIATION_CACHE_FILE):
+        pronunciation_cache.reload()
+    else:
+        invalidate_path(path)
+
+
+_watcher: Optional[FileWatcher] = None
+
+
+def start_file_watcher() -> Optional[FileWatcher]:
+    """Start the process-wide watcher over the deck directories and pronunciation cache.
+
+    Returns:
+        The running watcher, or None if watching is disabled in the config
+    """
+    global _watcher
+    if not Config.FILE_WATCHER_ENABLED:
+        logger.info("File watcher disabled")
+        return None
+    if _watcher is None:
+        directories = {
+            Config.SPECIES_DATA_DIR,
+            Config.UPLOADS_DIR,
+            os.path.dirname(os.path.abspath(Config.PRONUNCIATION_CACHE_FILE)),
+        }
+        _watcher = FileWatcher(sorted(directories), _is_watched_file, Config.FILE_WATCHER_POLL_INTERVAL)
+        _watcher.subscribe(_invalidate_caches)
+        _watcher.start()
+    return _watcher
@@ -0,0 +1,280 @@
+"""Pooled HTTP client with timeouts, retries and circuit breaking for upstream APIs."""
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Every client created, for stats reporting
+_registered_clients: List["UpstreamClient"] = []
+
+
+def _new_counters() -> Dict[str, Any]:
+    """Return zeroed request counters."""
+    return {
+        "requests": 0,
+        "errors": 0,
+        "retries": 0,
+        "short_circuited": 0,
+        "latency_total": 0.0,
+        "latency_max": 0.0,
+    }
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+
+class UpstreamClient:
+    """HTTP client for one upstream API.
+
+    Requests share a keep-alive connection pool, so repeated lookups skip the
+    TCP and TLS handshakes. Each request has connect and read timeouts, and
+    429/5xx responses and connection errors are retried with jittered
+    exponential backoff. After failure_threshold consecutive failed calls the
+    circuit opens and calls fail fast with CircuitOpenError until
+    reset_timeout has passed; then one trial call decides whether it closes.
+
+    The session is created per process, so workers forked after import do
+    not share sockets. get_json_async applies the same policy, and shares
+    the circuit and counters, for calls made through an aiohttp session.
+    """
+
+    def __init__(self, name: str, connect_timeout: float = 3.05, read_timeout: float = 10.0,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0, pool_size: int = 16) -> None:
+        """Initialize a client; the session is created on first use.
+
+        Args:
+            name: Upstream name reported in stats
+            connect_timeout: Seconds to wait for a connection
+            read_timeout: Seconds to wait between bytes of the response
+            max_retries: Retries after the first attempt
+            backoff_base: Backoff ceiling in seconds before the first retry, doubled per retry
+            backoff_max: Maximum backoff ceiling in seconds
+            failure_threshold: Consecutive failed calls that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial call
+            pool_size: Connections kept alive to the upstream
+        """
+        self.name = name
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.pool_size = pool_size
+        self._session: Optional[requests.Session] = None
+        self._session_pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+        self._counters = _new_counters()
+        _registered_clients.append(self)
+
+    @property
+    def session(self) -> requests.Session:
+        """Return this process's pooled session, creating it if needed."""
+        pid = os.getpid()
+        if self._session is None or self._session_pid != pid:
+            with self._lock:
+                if self._session is None or self._session_pid != pid:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount("https://", adapter)
+                    session.mount("http://", adapter)
+                    self._session = session
+                    self._session_pid = pid
+        return self._session
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        """GET a URL, retrying transient failures.
+
+        Returns:
+            The last response, which may still have a retryable status
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            requests.RequestException: If the last attempt failed without a response
+        """
+        self._before_call()
+        attempt = 0
+        while True:
+            response = None
+            error: Optional[Exception] = None
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            except Exception:
+                self._abort_attempt(started)
+                raise
+            failed = error is not None or response.status_code in RETRY_STATUSES
+            delay = self._end_attempt(attempt, started, failed, error or response.status_code,
+                                      response.headers.get("Retry-After", "") if response is not None else "")
+
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+            attempt += 1
+            time.sleep(delay)
+
+    async def get_json_async(self, session: Any, url: str, params: Optional[Dict[str, Any]] = None,
+                             transient_errors: Tuple[Type[BaseException], ...] = (OSError, asyncio.TimeoutError)
+                             ) -> Tuple[int, Any]:
+        """GET a URL through an aiohttp session, retrying transient failures like get.
+
+        The session should be created with this client's timeouts.
+
+        Args:
+            session: aiohttp.ClientSession to send the request with
+            url: URL to request
+            params: Query parameters
+            transient_errors: Exceptions that count as a failed attempt and are retried
+
+        Returns:
+            The status of the last response and its JSON body, or None as the body if the status is not 200
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            Exception: One of transient_errors, if the last attempt failed without a response
+        """
+        self._before_call()
+        attempt = 0
+        while True:
+            status = None
+            body = None
+            retry_after = ""
+            error: Optional[BaseException] = None
+            started = time.monotonic()
+            try:
+                async with session.get(url, params=params) as response:
+                    status = response.status
+                    retry_after = response.headers.get("Retry-After", "")
+                    if status == 200:
+                        body = await response.json()
+            except transient_errors as e:
+                error = e
+            except Exception:
+                self._abort_attempt(started)
+                raise
+            failed = error is not None or status in RETRY_STATUSES
+            delay = self._end_attempt(attempt, started, failed, error or status, retry_after)
+
+            if delay is None:
+                if error is not None:
+                    raise error
+                return status, body
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the circuit state and latency and error counters."""
+        with self._lock:
+            counters = dict(self._counters)
+            state = self._state()
+            failures = self._failures
+        requests_made = counters.pop("requests")
+        latency_total = counters.pop("latency_total")
+        return {
+            "name": self.name,
+            "state": state,
+            "consecutive_failures": failures,
+            "requests": requests_made,
+            **counters,
+            "latency_avg": latency_total / requests_made if requests_made else 0.0,
+        }
+
+    def reset(self) -> None:
+        """Close the circuit and clear the counters."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+            self._counters = _new_counters()
+
+    def _state(self) -> str:
+        """Return "closed", "open" or "half_open"; the caller holds the lock."""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def _before_call(self) -> None:
+        """Fail fast if the circuit is open, letting one trial call through once it may close."""
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return
+            if state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return
+            self._counters["short_circuited"] += 1
+        raise CircuitOpenError(f"{self.name} circuit is open")
+
+    def _after_call(self, success: bool) -> None:
+        """Update the circuit with the outcome of a call."""
+        with self._lock:
+            self._trial_running = False
+            if success:
+                self._failures = 0
+                self._opened_at = None
+                return
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.error(f"{self.name} circuit opened after {self._failures} failed calls")
+                self._opened_at = time.monotonic()
+
+    def _end_attempt(self, attempt: int, started: float, failed: bool, reason: Any, retry_after: str) -> Optional[float]:
+        """Count a finished attempt and return the delay before retrying it, or None if the call is over."""
+        self._record(time.monotonic() - started, failed)
+        if not failed or attempt >= self.max_retries:
+            self._after_call(success=not failed)
+            return None
+        with self._lock:
+            self._counters["retries"] += 1
+        delay = self._backoff(attempt + 1, retry_after)
+        logger.warning(f"{self.name} request failed ({reason}), retry {attempt + 1} in {delay:.2f}s")
+        return delay
+
+    def _abort_attempt(self, started: float) -> None:
+        """Count an attempt that raised an unexpected error."""
+        # Not an upstream failure, so the circuit is left as it was
+        self._record(time.monotonic() - started, failed=True)
+        with self._lock:
+            self._trial_running = False
+
+    def _record(self, elapsed: float, failed: bool) -> None:
+        """Count one attempt and its latency."""
+        with self._lock:
+            self._counters["requests"] += 1
+            self._counters["latency_total"] += elapsed
+            self._counters["latency_max"] = max(self._counters["latency_max"], elapsed)
+            if failed:
+                self._counters["errors"] += 1
+
+    def _backoff(self, attempt: int, retry_after: str = "") -> float:
+        """Return the delay before a retry: the Retry-After header if given, else full jitter."""
+        if retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+
+def all_upstream_stats() -> List[Dict[str, Any]]:
+    """Return the stats of every upstream client."""
+    return [client.stats() for client in _registered_clients]
@@ -0,0 +1,140 @@
+"""Utilities for scientific name autocompletion."""
+import bisect
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from models.pronunciation import pronunciation_cache
+from utils.species_index import get_species_index
+
+logger = logging.getLogger(__name__)
+
+# Number of (prefix, limit) results kept by the autocomplete cache
+PREFIX_CACHE_SIZE = 4096
+
+
+class NameIndex:
+    """Sorted array of lowercase name keys answering prefix queries with bisect.
+
+    Each name is keyed by the full name and by every later word, so "bisp"
+    completes "Amanita bisporigera" as well as "amanita b" does.
+    """
+
+    def __init__(self, names: Iterable[str]) -> None:
+        """Build the index.
+
+        Args:
+            names: Scientific names to complete
+        """
+        entries = set()
+        for name in names:
+            name = name.strip()
+            if not name:
+                continue
+            words = name.lower().split()
+            for i in range(len(words)):
+                # Full-name keys sort before word keys of the same text
+                entries.add((" ".join(words[i:]), i > 0, name))
+        ordered = sorted(entries)
+        self._keys = [key for key, _, _ in ordered]
+        self._names = [name for _, _, name in ordered]
+        self.size = len(set(self._names))
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Return up to limit names with a word starting with prefix.
+
+        Names that match from their first word come before epithet matches.
+
+        Args:
+            prefix: Text typed so far, matched case-insensitively
+            limit: Maximum number of names to return
+
+        Returns:
+            Matching names in order
+        """
+        prefix = " ".join(prefix.lower().split())
+        if not prefix:
+            return []
+        start = bisect.bisect_left(self._keys, prefix)
+        end = bisect.bisect_left(self._keys, prefix + "\uffff", start)
+
+        full_matches: List[str] = []
+        word_matches: List[str] = []
+        for i in range(start, end):
+            name = self._names[i]
+            if self._keys[i] == name.lower():
+                full_matches.append(name)
+                if len(full_matches) >= limit:
+                    break
+            elif len(word_matches) < limit:
+                word_matches.append(name)
+
+        results = full_matches
+        seen = set(full_matches)
+        for name in word_matches:
+            if len(results) >= limit:
+                break
+            if name not in seen:
+                seen.add(name)
+                results.append(name)
+        return results
+
+
+class Autocompleter:
+    """Name index over every deck and the pronunciation cache, with a prefix result cache.
+
+    The index and cache are rebuilt when a deck changes or the pronunciation cache is
+    added to or reloaded.
+    """
+
+    def __init__(self, cache_size: int = PREFIX_CACHE_SIZE) -> None:
+        """Initialize an autocompleter; the index is built on first use."""
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._index: Optional[NameIndex] = None
+        self._source_version: Optional[Tuple[int, int, int]] = None
+        self._cache: "OrderedDict[Tuple[str, int], List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Return up to limit scientific names matching prefix."""
+        species_index = get_species_index()
+        source_version = (id(species_index), species_index.version, pronunciation_cache.version)
+        key = (" ".join(prefix.lower().split()), limit)
+
+        with self._lock:
+            if source_version != self._source_version:
+                names = species_index.scientific_names() | set(pronunciation_cache.cache)
+                self._index = NameIndex(names)
+                self._source_version = source_version
+                self._cache.clear()
+                logger.info(f"Built autocomplete index of {self._index.size} names")
+
+            results = self._cache.get(key)
+            if results is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return results
+
+            self.misses += 1
+            results = self._index.complete(prefix, limit)
+            self._cache[key] = results
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return results
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the index size and prefix cache counters."""
+        with self._lock:
+            return {
+                "names": self._index.size if self._index is not None else 0,
+                "cached_prefixes": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# Singleton instance
+autocompleter = Autocompleter()
@@ -0,0 +1,118 @@
+"""Utilities for tolerant matching of scientific names."""
+import functools
+import logging
+import re
+import unicodedata
+from typing import Any, Iterable, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+# Words that introduce an infraspecific or infrageneric name, which is kept
+RANK_MARKERS = {"var", "subsp", "ssp", "f", "forma", "sect", "subg", "subgen", "subsect", "ser", "cf", "aff"}
+
+# Answers longer than this are truncated, so grading cost stays bounded
+MAX_NAME_LENGTH = 120
+
+_PUNCTUATION = re.compile(r"[^\w\s-]")
+
+
+def _strip_diacritics(text: str) -> str:
+    """Remove accents, e.g. "Mycena galericulata Quél." -> "Mycena galericulata Quel."."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def normal_form(name: str) -> str:
+    """Return the comparable form of a scientific name.
+
+    Diacritics and punctuation are removed, whitespace is collapsed, the
+    name is lowercased and a trailing authority such as "(L.) Lam." or
+    "Pers. 1801" is dropped: the genus and species epithet are always kept,
+    later words only while they are lowercase, and a rank marker such as
+    "var." keeps the word after it. A parenthesized word always starts the
+    authority.
+
+    Args:
+        name: A scientific name or user answer
+
+    Returns:
+        The normal form, e.g. "amanita muscaria" for "Amanita muscaria (L.) Lam."
+    """
+    words = _strip_diacritics(name[:MAX_NAME_LENGTH]).split()
+    kept = []
+    keep_next = True
+    for word in words:
+        bare = _PUNCTUATION.sub("", word)
+        if not bare:
+            continue
+        if kept and word.startswith("("):
+            break
+        if not keep_next and not bare[0].islower():
+            break
+        kept.append(bare.lower())
+        keep_next = len(kept) < 2 or kept[-1] in RANK_MARKERS
+    return " ".join(kept)
+
+
+@functools.lru_cache(maxsize=65536)
+def card_normal_form(scientific_name: str) -> str:
+    """Return the normal form of a card's scientific name, cached across requests.
+
+    User answers go through normal_form instead, so arbitrary input cannot
+    evict the names of the decks being studied.
+    """
+    return normal_form(scientific_name)
+
+
+def precompute_normal_forms(records: Iterable[Mapping[str, Any]]) -> None:
+    """Compute the normal form of every card's scientific name ahead of grading."""
+    for record in records:
+        scientific_name = record.get("scientific_name")
+        if scientific_name:
+            card_normal_form(scientific_name)
+
+
+def bounded_levenshtein(a: str, b: str, max_distance: int) -> Optional[int]:
+    """Return the edit distance between a and b if it is at most max_distance.
+
+    Only a diagonal band of width 2 * max_distance + 1 is computed and
+    stored, and the computation stops as soon as every cell of a row exceeds
+    the bound, so the cost is O(max_distance * len(a)) time and
+    O(max_distance) memory.
+
+    Returns:
+        The distance, or None if it exceeds max_distance
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    if len(a) > len(b):
+        a, b = b, a
+
+    too_far = max_distance + 1
+    width = 2 * max_distance + 1
+    # Cell d of row i holds the distance between a[:i] and b[:i + d - max_distance]
+    previous = [j if 0 <= j <= len(b) else too_far for j in range(-max_distance, max_distance + 1)]
+    current = [too_far] * width
+    for i in range(1, len(a) + 1):
+        row_min = too_far
+        for d in range(width):
+            j = i + d - max_distance
+            if j < 0 or j > len(b):
+                value = too_far
+            elif j == 0:
+                value = i
+            else:
+                # Substitution is the diagonal neighbour, deletion the cell above, insertion the one to the left
+                value = previous[d] + (a[i - 1] != b[j - 1])
+                if d + 1 < width:
+                    value = min(value, previous[d + 1] + 1)
+                if d > 0:
+                    value = min(value, current[d - 1] + 1)
+            current[d] = value if value <= max_distance else too_far
+            row_min = min(row_min, current[d])
+        if row_min > max_distance:
+            return None
+        previous, current = current, previous
+
+    distance = previous[len(b) - len(a) + max_distance]
+    return distance if distance <= max_distance else None
@@ -0,0 +1,214 @@
+"""Utilities for the cross-deck species search index."""
+import bisect
+import logging
+import os
+import re
+import threading
+import traceback
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from config import Config
+from models.deck_cache import add_invalidation_listener
+from utils.csv_utils import DeckFormatError, iter_csv_records
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class SpeciesIndex:
+    """Inverted index from name tokens to the deck rows that contain them.
+
+    Every card contributes its scientific name tokens (genus and epithets) and
+    its common-name tokens. Postings map a token to {deck id: [row, ...]}, so
+    a deck can be re-indexed or dropped without touching the other decks. A
+    sorted token list answers prefix queries with two binary searches.
+    """
+
+    def __init__(self, base_dir: str) -> None:
+        """Initialize an empty index.
+
+        Args:
+            base_dir: Data directory whose subdirectories hold the decks
+        """
+        self.base_dir = base_dir
+        self._deck_ids: Dict[Tuple[str, str], int] = {}
+        self._decks: Dict[int, Tuple[str, str]] = {}
+        self._rows: Dict[int, List[Tuple[str, str]]] = {}
+        self._postings: Dict[str, Dict[int, List[int]]] = {}
+        self._sorted_tokens: Optional[List[str]] = None
+        self._next_id = 0
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def build(self) -> None:
+        """Index every deck in the subdirectories of the data directory."""
+        try:
+            directories = sorted(
+                name for name in os.listdir(self.base_dir)
+                if not name.startswith(".") and os.path.isdir(os.path.join(self.base_dir, name)))
+        except OSError as e:
+            logger.error(f"Error listing data directory {self.base_dir}: {str(e)}")
+            return
+
+        for directory in directories:
+            directory_path = os.path.join(self.base_dir, directory)
+            for filename in sorted(os.listdir(directory_path)):
+                if filename.endswith(".csv") and not filename.startswith("."):
+                    self.update_deck(directory, filename)
+
+    def update_deck(self, directory: str, filename: str) -> None:
+        """Re-index one deck, or drop it if it no longer exists or is not a valid deck."""
+        file_path = os.path.join(self.base_dir, directory, filename)
+        try:
+            rows = [(record["scientific_name"], record["common_name"]) for record in iter_csv_records(file_path)]
+        except FileNotFoundError:
+            self.remove_deck(directory, filename)
+            return
+        except (DeckFormatError, UnicodeDecodeError, ValueError) as e:
+            logger.warning(f"Not indexing invalid deck {file_path}: {str(e)}")
+            self.remove_deck(directory, filename)
+            return
+        except Exception as e:
+            logger.error(f"Error indexing {file_path}: {str(e)}")
+            logger.error(traceback.format_exc())
+            return
+
+        postings: Dict[str, List[int]] = {}
+        for row, (scientific_name, common_name) in enumerate(rows):
+            for token in set(tokenize(scientific_name)) | set(tokenize(common_name)):
+                postings.setdefault(token, []).append(row)
+
+        with self._lock:
+            self._remove(directory, filename)
+            deck_id = self._next_id
+            self._next_id += 1
+            self._deck_ids[(directory, filename)] = deck_id
+            self._decks[deck_id] = (directory, filename)
+            self._rows[deck_id] = rows
+            for token, token_rows in postings.items():
+                if token not in self._postings:
+                    self._postings[token] = {}
+                    self._sorted_tokens = None
+                self._postings[token][deck_id] = token_rows
+            self.version += 1
+
+    def remove_deck(self, directory: str, filename: str) -> None:
+        """Drop a deck from the index."""
+        with self._lock:
+            if (directory, filename) in self._deck_ids:
+                self._remove(directory, filename)
+                self.version += 1
+
+    def scientific_names(self) -> Set[str]:
+        """Return the distinct scientific names of every indexed deck."""
+        with self._lock:
+            return {scientific_name for rows in self._rows.values() for scientific_name, _ in rows}
+
+    def search(self, query: str, limit: int = 20) -> Dict[str, Any]:
+        """Find the species whose names contain every query token as a word prefix.
+
+        Args:
+            query: Words to match, e.g. "amanita bis" or "death cap"
+            limit: Maximum number of species to return
+
+        Returns:
+            Dictionary with the matching species, each listing the deck rows it
+            appears in, and the total number of matching species
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return {"results": [], "total": 0}
+
+        with self._lock:
+            matches: Optional[Set[Tuple[int, int]]] = None
+            for token in tokens:
+                token_matches: Set[Tuple[int, int]] = set()
+                for word in self._prefix_tokens(token):
+                    for deck_id, rows in self._postings[word].items():
+                        token_matches.update((deck_id, row) for row in rows)
+                matches = token_matches if matches is None else matches & token_matches
+                if not matches:
+                    return {"results": [], "total": 0}
+
+            species: Dict[str, Dict[str, Any]] = {}
+            for deck_id, row in sorted(matches):
+                scientific_name, common_name = self._rows[deck_id][row]
+                directory, filename = self._decks[deck_id]
+                entry = species.setdefault(scientific_name, {
+                    "scientific_name": scientific_name,
+                    "common_name": common_name,
+                    "decks": [],
+                })
+                entry["decks"].append({"directory": directory, "filename": filename, "row": row})
+
+        results = sorted(species.values(), key=lambda entry: entry["scientific_name"].lower())
+        return {"results": results[:limit], "total": len(results)}
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of indexed decks, rows and distinct tokens."""
+        with self._lock:
+            return {
+                "decks": len(self._decks),
+                "rows": sum(len(rows) for rows in self._rows.values()),
+                "tokens": len(self._postings),
+            }
+
+    def _prefix_tokens(self, prefix: str) -> List[str]:
+        """Return indexed tokens starting with prefix; the caller must hold the lock."""
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self._postings)
+        start = bisect.bisect_left(self._sorted_tokens, prefix)
+        end = bisect.bisect_left(self._sorted_tokens, prefix + "\uffff", start)
+        return self._sorted_tokens[start:end]
+
+    def _remove(self, directory: str, filename: str) -> None:
+        """Drop a deck's postings; the caller must hold the lock."""
+        deck_id = self._deck_ids.pop((directory, filename), None)
+        if deck_id is None:
+            return
+        del self._decks[deck_id]
+        for scientific_name, common_name in self._rows.pop(deck_id):
+            for token in tokenize(scientific_name) + tokenize(common_name):
+                token_postings = self._postings.get(token)
+                if token_postings is None:
+                    continue
+                token_postings.pop(deck_id, None)
+                if not token_postings:
+                    del self._postings[token]
+                    self._sorted_tokens = None
+
+
+# Index of Config.BASE_DATA_DIR, built on first use
+_species_index: Optional[SpeciesIndex] = None
+_species_index_lock = threading.Lock()
+
+
+def get_species_index() -> SpeciesIndex:
+    """Return the species index of the data directory, building it on first use."""
+    global _species_index
+    with _species_index_lock:
+        if _species_index is None or _species_index.base_dir != Config.BASE_DATA_DIR:
+            index = SpeciesIndex(Config.BASE_DATA_DIR)
+            index.build()
+            _species_index = index
+        return _species_index
+
+
+def _on_deck_invalidated(file_path: str) -> None:
+    """Re-index a written or deleted deck, if it belongs to the built index."""
+    index = _species_index
+    if index is None or not file_path.endswith(".csv"):
+        return
+    directory_path, filename = os.path.split(os.path.abspath(file_path))
+    base_dir, directory = os.path.split(directory_path)
+    if base_dir == os.path.abspath(index.base_dir):
+        index.update_deck(directory, filename)
+
+
+add_invalidation_listener(_on_deck_invalidated)